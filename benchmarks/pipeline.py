@@ -0,0 +1,57 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Benchmark of the fused PreprocessPipeline against the sequential preprocessing calls
+# Description   :-> Run from the project root with: python -m benchmarks.pipeline [--repeat N] [--workers D M U]
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import glob
+import time
+import argparse
+import cv2 as cv
+from benchmarks.undistort import test_data, load_lut
+from visual_odometry_pkg.data_preprocessor import DataPreprocessor, PreprocessPipeline, Undistorter
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def run(repeat: int = 4, workers: tuple = (2, 2, 2)) -> dict:
+    """
+    Preprocesses the test_data/ frames repeat times sequentially and through the pipeline, prints frames/sec and the
+    per-stage timings of the pipeline.
+    """
+    files = sorted(glob.glob(test_data + '*.png')) * repeat
+    shape = cv.imread(files[0], 0).shape
+    undistorter = Undistorter(load_lut(shape), shape)
+
+    start = time.perf_counter()
+    for file in files:
+        undistorter.undistort(DataPreprocessor.convert_bayer_gr2bgr(cv.imread(file, 0)))
+    sequential_fps = len(files) / (time.perf_counter() - start)
+
+    pipeline = PreprocessPipeline.from_config(undistorter, 'gr', workers)
+    for _ in pipeline.run(files):
+        pass
+    stats = pipeline.stats()
+
+    print(f'frames: {len(files)} at {shape}')
+    print(f'sequential calls  : {sequential_fps:8.2f} frames/sec')
+    print(f'PreprocessPipeline: {stats["fps"]:8.2f} frames/sec with workers {tuple(workers)}')
+    for name, milliseconds in stats['stage_ms'].items():
+        print(f'    {name:<10}: {milliseconds:8.2f} ms/frame')
+    return {'sequential': sequential_fps, 'pipeline': stats['fps']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Preprocessing pipeline benchmark on test_data/')
+    parser.add_argument('--repeat', type=int, default=4, help='passes over the test frames')
+    parser.add_argument('--workers', type=int, nargs=3, default=(2, 2, 2), help='decode, demosaic, undistort workers')
+    arguments = parser.parse_args()
+    run(arguments.repeat, arguments.workers)
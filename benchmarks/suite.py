@@ -0,0 +1,281 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Benchmark suite of the preprocessing entry points with regression tracking against a baseline
+# Description   :-> Run from the project root with: python -m benchmarks.suite [--scales 1 2] [--frames N]
+#                   [--output results.json] [--baseline benchmarks/baseline.json] [--save-baseline]
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import resource
+import multiprocessing
+import concurrent.futures as cf
+import cv2 as cv
+import numpy as np
+from benchmarks.undistort import test_data
+from tests.synthetic_data import synthetic_lut
+from visual_odometry_pkg.camera import Camera
+from visual_odometry_pkg.data_preprocessor import DataPreprocessor, FrameStream, Undistorter
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+CASES = ('read_camera_model', 'undistort_image', 'undistorter', 'load_frames', 'convert_bayer', 'frames_to_video')
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Allowed relative change against the baseline before a case counts as a regression
+TOLERANCES = {'fps': 0.25, 'p99_ms': 0.5, 'peak_rss_mb': 0.25}
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def mosaic(image: np.array) -> np.array:
+    """
+    Samples a bgr image back into a GR bayer mosaic.
+    """
+    bayer = np.empty(image.shape[:2], image.dtype)
+    bayer[0::2, 0::2] = image[0::2, 0::2, 1]
+    bayer[0::2, 1::2] = image[0::2, 1::2, 2]
+    bayer[1::2, 0::2] = image[1::2, 0::2, 0]
+    bayer[1::2, 1::2] = image[1::2, 1::2, 1]
+    return bayer
+
+
+def make_dataset(folder: str, scale: float = 1.0, frames: int = 16) -> dict:
+    """
+    Writes a synthetic sequence into folder: the test_data/ frames rescaled and re-mosaiced to scale times their
+    resolution, repeated (as links) up to the frame count, and a camera model with a matching radial LUT.
+
+    Returns: dict
+        model_dir, files, shape (height, width) and scale of the dataset
+    """
+    sources = sorted(glob.glob(test_data + '*.png'))
+    base = []
+    for position, file in enumerate(sources):
+        bayer = cv.imread(file, 0)
+        if scale != 1.0:
+            color = cv.cvtColor(bayer, cv.COLOR_BAYER_GR2BGR)
+            size = (int(round(bayer.shape[1] * scale / 2)) * 2, int(round(bayer.shape[0] * scale / 2)) * 2)
+            bayer = mosaic(cv.resize(color, size, interpolation=cv.INTER_LINEAR))
+        # ---> png content under another extension, so only the linked frames match the *.png globs <--- #
+        path = os.path.join(folder, f'base_{position}.frame')
+        cv.imencode('.png', bayer, [cv.IMWRITE_PNG_COMPRESSION, 1])[1].tofile(path)
+        base.append(path)
+    files = []
+    for index in range(frames):
+        path = os.path.join(folder, f'{index:06d}.png')
+        try:
+            os.symlink(base[index % len(base)], path)
+        except OSError:
+            shutil.copyfile(base[index % len(base)], path)
+        files.append(path)
+
+    height, width = bayer.shape
+    intrinsics = np.loadtxt(test_data + 'intrinsic_parameters.txt')
+    intrinsics[0, :4] *= scale
+    np.savetxt(os.path.join(folder, 'intrinsic_parameters.txt'), intrinsics)
+    lut = synthetic_lut(height, width, k1=-0.1, fx=intrinsics[0, 0], fy=intrinsics[0, 1])
+    np.ascontiguousarray(lut.T).tofile(os.path.join(folder, 'lut.bin'))
+    return {'model_dir': folder + os.sep, 'files': files, 'shape': (height, width), 'scale': scale}
+
+
+def _summary(latencies: list, units: int, seconds: float) -> dict:
+    latencies = np.asarray(latencies) * 1e3
+    return {'units': units, 'seconds': seconds, 'fps': units / seconds if seconds else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99))}
+
+
+def _measure(step: callable, count: int, rounds: int, units: int = 1) -> dict:
+    """
+    Times count calls of step(index) per round after one warm-up call, and keeps the fastest round.
+    """
+    step(0)  # lazy imports, first-touch allocations and the page cache
+    best = None
+    for _ in range(rounds):
+        latencies = []
+        start = time.perf_counter()
+        for index in range(count):
+            begin = time.perf_counter()
+            step(index)
+            latencies.append(time.perf_counter() - begin)
+        summary = _summary(latencies, count * units, time.perf_counter() - start)
+        if best is None or summary['fps'] > best['fps']:
+            best = summary
+    return best
+
+
+def run_case(case: str, dataset: dict, repeat: int = 3, rounds: int = 3) -> dict:
+    """
+    Runs one benchmark case over a dataset, warmed up and repeated for rounds, the fastest round is reported.
+
+    Latencies are per frame for the frame cases and per call for read_camera_model and frames_to_video, fps is the
+    number of frames (calls for read_camera_model) per second of the whole round.
+
+    Returns: dict
+        units, seconds, fps, p50_ms, p99_ms, peak_rss_mb of the process and rss_growth_mb during the case
+    """
+    files, shape = dataset['files'], dataset['shape']
+    rss_before = _peak_rss_mb()
+    if case == 'read_camera_model':
+        result = _measure(lambda index: Camera().read_camera_model(dataset['model_dir']), repeat, rounds)
+    elif case in ('undistort_image', 'undistorter', 'convert_bayer'):
+        bayers = [cv.imread(file, 0) for file in files[:min(len(files), 8)]]
+        frames = [cv.cvtColor(bayer, cv.COLOR_BAYER_GR2BGR) for bayer in bayers]
+        camera = Camera()
+        camera.read_camera_model(dataset['model_dir'])
+        undistorter = Undistorter.from_camera(camera, shape)
+        if case == 'undistort_image':  # the reference implementation is slow, one pass over the distinct frames
+            result = _measure(lambda index: DataPreprocessor.undistort_image(frames[index], camera.LUT),
+                              len(frames), rounds)
+        elif case == 'undistorter':
+            result = _measure(lambda index: undistorter.undistort(frames[index % len(frames)]), len(files), rounds)
+        else:
+            result = _measure(lambda index: DataPreprocessor.convert_bayer(bayers[index % len(bayers)],
+                                                                           ('bg', 'gb', 'rg', 'gr')[index % 4]),
+                              len(files), rounds)
+    elif case == 'load_frames':
+        latencies = []
+
+        def stream(index: int) -> None:
+            del latencies[:]
+            begin = time.perf_counter()
+            with FrameStream(files) as frames:
+                for _ in frames:
+                    now = time.perf_counter()
+                    latencies.append(now - begin)
+                    begin = now
+
+        result = _measure(stream, 1, rounds, len(files))
+        result.update(_summary(latencies, len(files), result['seconds']))  # per frame instead of per stream
+    elif case == 'frames_to_video':
+        source = os.path.dirname(files[0]) + os.sep
+        with tempfile.TemporaryDirectory() as destination:
+            result = _measure(lambda index: DataPreprocessor.frames_to_video(source, destination + os.sep, 'DIVX'),
+                              repeat, rounds, len(files))
+    else:
+        raise ValueError(f'Unknown benchmark case {case!r}, expected one of {CASES}')
+    result['peak_rss_mb'] = _peak_rss_mb()
+    result['rss_growth_mb'] = result['peak_rss_mb'] - rss_before
+    return result
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+def _isolated_case(case: str, scale: float, frames: int, repeat: int, rounds: int) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        return run_case(case, make_dataset(folder, scale, frames), repeat, rounds)
+
+
+def run(cases: tuple = CASES, scales: tuple = (1.0,), frames: int = 16, repeat: int = 3, rounds: int = 3,
+        isolated: bool = True) -> dict:
+    """
+    Runs the cases at every scale, each one in a fresh process when isolated so the peak RSS is the case's own.
+
+    Returns: dict
+        {'machine': {...}, 'settings': {...}, 'results': {'<case>@<scale>x': {...}}}
+    """
+    results = {}
+    for scale in scales:
+        for case in cases:
+            if isolated:
+                context = multiprocessing.get_context('spawn')
+                with cf.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(_isolated_case, case, scale, frames, repeat, rounds).result()
+            else:
+                result = _isolated_case(case, scale, frames, repeat, rounds)
+            name = f'{case}@{scale:g}x'
+            results[name] = result
+            print(f'{name:<26}: {result["fps"]:9.2f} fps   p50 {result["p50_ms"]:9.2f} ms   '
+                  f'p99 {result["p99_ms"]:9.2f} ms   peak RSS {result["peak_rss_mb"]:8.1f} MB')
+    settings = {'frames': frames, 'repeat': repeat, 'rounds': rounds, 'scales': list(scales)}
+    return {'machine': machine(), 'settings': settings, 'results': results}
+
+
+def machine() -> dict:
+    """
+    Returns: dict
+        platform, cpu count and library versions the results were measured with
+    """
+    return {'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count(),
+            'python': platform.python_version(), 'numpy': np.__version__, 'opencv': cv.__version__}
+
+
+def compare(report: dict, baseline: dict, tolerances: dict = None) -> list:
+    """
+    Compares a report against a baseline report, case by case.
+
+    Args:
+        report: dict
+            output of run()
+        baseline: dict
+            stored output of run()
+        tolerances: dict
+            allowed relative change per metric, TOLERANCES by default
+
+    Returns: list
+        regression messages, empty when every case is within the tolerances
+    """
+    tolerances = TOLERANCES if tolerances is None else tolerances
+    regressions = []
+    for name, result in report['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        if 'fps' in tolerances and result['fps'] < reference['fps'] * (1 - tolerances['fps']):
+            regressions.append(f'{name}: {result["fps"]:.2f} fps against {reference["fps"]:.2f} in the baseline')
+        for metric in ('p99_ms', 'peak_rss_mb'):
+            if metric in tolerances and result[metric] > reference[metric] * (1 + tolerances[metric]):
+                regressions.append(f'{name}: {metric} {result[metric]:.2f} against {reference[metric]:.2f} in the '
+                                   f'baseline')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Preprocessing benchmark suite on test_data/')
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=CASES)
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0], help='resolution scales of the frames')
+    parser.add_argument('--frames', type=int, default=16, help='frames per sequence')
+    parser.add_argument('--repeat', type=int, default=3, help='calls of the per-call cases')
+    parser.add_argument('--rounds', type=int, default=3, help='timed rounds per case, the fastest is kept')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='scales the allowed regressions of TOLERANCES')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=baseline_path, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--in-process', action='store_true', help='run the cases in this process')
+    arguments = parser.parse_args()
+
+    report = run(tuple(arguments.cases), tuple(arguments.scales), arguments.frames, arguments.repeat, arguments.rounds,
+                 not arguments.in_process)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if arguments.save_baseline:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Baseline saved to {arguments.baseline}')
+    elif os.path.isfile(arguments.baseline):
+        with open(arguments.baseline) as file:
+            failures = compare(report, json.load(file),
+                               {metric: value * arguments.tolerance for metric, value in TOLERANCES.items()})
+        for failure in failures:
+            print(f'REGRESSION {failure}')
+        if failures:
+            sys.exit(1)
+        print('No regression against the baseline')
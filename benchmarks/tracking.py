@@ -0,0 +1,52 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Benchmark of the FeatureTracker front end
+# Description   :-> Run from the project root with: python -m benchmarks.tracking [--repeat N] [--detector NAME]
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import glob
+import argparse
+import cv2 as cv
+import numpy as np
+from benchmarks.undistort import test_data
+from visual_odometry_pkg.algorithms import FeatureTracker
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def run(repeat: int = 3, detector: str = 'gftt', max_features: int = 1000) -> dict:
+    """
+    Tracks through the test_data/ frames (forwards then backwards, repeat times) and prints tracks/sec and the per-frame
+    latency.
+    """
+    files = sorted(glob.glob(test_data + '*.png'))
+    frames = [cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2GRAY) for file in files]
+    sequence = (frames + frames[::-1]) * repeat
+    tracker = FeatureTracker(max_features=max_features, min_features=max_features // 2, detector=detector)
+    for frame in sequence:
+        tracker.track(frame)
+    stats = tracker.stats()
+    latency = np.asarray(tracker.frame_times)[1:] * 1e3
+
+    print(f'frames: {len(sequence)} at {frames[0].shape}, detector {detector}, {max_features} features')
+    print(f'tracks/sec          : {stats["tracks_per_sec"]:10.0f}')
+    print(f'latency p50 / p99   : {np.percentile(latency, 50):6.2f} / {np.percentile(latency, 99):6.2f} ms')
+    print(f'features detected   : {tracker.next_id}')
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Feature tracking benchmark on test_data/')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the test frames')
+    parser.add_argument('--detector', default='gftt', choices=('gftt', 'fast', 'orb'))
+    parser.add_argument('--features', type=int, default=1000, help='maximum number of features')
+    arguments = parser.parse_args()
+    run(arguments.repeat, arguments.detector, arguments.features)
@@ -0,0 +1,90 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Benchmark of DataPreprocessor.undistort_image() against the precomputed Undistorter
+# Description   :-> Run from the project root with: python -m benchmarks.undistort [--repeat N]
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import glob
+import time
+import argparse
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg.camera import Camera
+from visual_odometry_pkg.data_preprocessor import DataPreprocessor, Undistorter
+from tests.synthetic_data import synthetic_lut
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_data') + os.sep
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def load_lut(shape: tuple) -> np.array:
+    """
+    Reads the LUT from test_data/lut.bin when present, otherwise builds a synthetic radial LUT of the frame shape.
+    """
+    if os.path.isfile(test_data + 'lut.bin'):
+        return Camera().read_camera_model(test_data)[5]
+    print('test_data/lut.bin not found, using a synthetic radial LUT')
+    return synthetic_lut(*shape, k1=-0.1)
+
+
+def run(repeat: int = 3, bands: int = 4) -> dict:
+    """
+    Undistorts every frame in test_data/ repeat times with both implementations, and with the remap split into row
+    bands, and prints frames/sec for each.
+
+    Returns: dict
+        frames/sec of the reference, the remap and the banded remap implementation
+    """
+    frames = [cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2BGR) for file in sorted(glob.glob(test_data + '*.png'))]
+    lut = load_lut(frames[0].shape[:2])
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            DataPreprocessor.undistort_image(frame, lut)
+    reference_fps = repeat * len(frames) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    undistorter = Undistorter(lut, frames[0].shape[:2])
+    build_time = time.perf_counter() - start
+    out = np.empty_like(frames[0])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            undistorter.undistort(frame, out=out)
+    remap_fps = repeat * len(frames) / (time.perf_counter() - start)
+
+    banded = Undistorter(lut, frames[0].shape[:2], bands=bands)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            banded.undistort(frame, out=out)
+    banded_fps = repeat * len(frames) / (time.perf_counter() - start)
+
+    print(f'frames: {len(frames)} x {repeat} at {frames[0].shape}')
+    print(f'undistort_image()      : {reference_fps:8.2f} frames/sec')
+    print(f'Undistorter.undistort(): {remap_fps:8.2f} frames/sec (tables built once in {build_time * 1e3:.1f} ms)')
+    print(f'{f"{bands} row bands":<23}: {banded_fps:8.2f} frames/sec on {os.cpu_count()} cpus')
+    print(f'speedup                : {remap_fps / reference_fps:8.2f}x')
+    return {'undistort_image': reference_fps, 'undistorter': remap_fps, 'bands': banded_fps}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Undistortion benchmark on test_data/')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the test frames')
+    parser.add_argument('--bands', type=int, default=4, help='row bands of the banded remap')
+    arguments = parser.parse_args()
+    run(arguments.repeat, arguments.bands)
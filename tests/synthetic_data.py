@@ -0,0 +1,92 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Synthetic test data helpers for the test modules
+# Description   :-> test_data/ ships without lut.bin, so the tests that need a LUT build one from a radial model
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import numpy as np
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def synthetic_lut(height: int, width: int, k1: float = 0.0, fx: float = 964.828979, fy: float = 964.828979,
+                  cx: float = None, cy: float = None) -> np.array:
+    """
+    Builds an undistortion LUT of shape (w x h, 2) from a single coefficient radial distortion model.
+
+    Args:
+        height: int
+            frame height
+        width: int
+            frame width
+        k1: float
+            radial distortion coefficient, 0 gives an identity LUT
+        fx, fy, cx, cy: float
+            pinhole intrinsics, the principal point defaults to the frame centre
+
+    Returns: np.array
+        LUT laid out like Camera.LUT, a (u, v) pair in the distorted image for each undistorted pixel
+    """
+    cx = (width - 1) / 2 if cx is None else cx
+    cy = (height - 1) / 2 if cy is None else cy
+    u, v = np.meshgrid(np.arange(width, dtype=np.double), np.arange(height, dtype=np.double))
+    x, y = (u - cx) / fx, (v - cy) / fy
+    scale = 1 + k1 * (x * x + y * y)
+    return np.stack([(x * scale * fx + cx).ravel(), (y * scale * fy + cy).ravel()], axis=1)
+
+
+def textured_plane(shape: tuple, position: tuple, depth: float = 10.0, f: float = 400.0, cx: float = None,
+                   cy: float = None, texel: float = 0.01, seed: int = 0) -> np.array:
+    """
+    Renders a fronto-parallel random textured plane z = depth seen by a pinhole camera at position (x, y, z) looking
+    along z, bilinearly sampled. Cameras of the same seed see the same plane, so stereo pairs and camera motions can
+    be rendered exactly.
+
+    Args:
+        shape: tuple
+            (height, width) of the frame
+        position: tuple
+            (x, y, z) camera position in metres, below the plane
+        depth: float
+            z of the plane
+        f: float
+            focal length in pixels
+        cx, cy: float
+            principal point, the frame centre by default
+        texel: float
+            size in metres of a texture pixel, the texture is 2000 texels wide and centred on the origin
+        seed: int
+            random generator seed of the texture
+
+    Returns: np.array
+        uint8 grayscale frame
+    """
+    height, width = shape[0], shape[1]
+    cx = (width - 1) / 2 if cx is None else cx
+    cy = (height - 1) / 2 if cy is None else cy
+    rng = np.random.default_rng(seed)
+    texture = rng.random((250, 250))
+    # ---> Smooth texture: the coarse noise magnified 8 times bilinearly is trackable at every scale used <--- #
+    texture = np.kron(texture, np.ones((8, 8)))
+    for axis in (0, 1):
+        texture = (np.roll(texture, 2, axis) + 2 * np.roll(texture, 1, axis) + 3 * texture +
+                   2 * np.roll(texture, -1, axis) + np.roll(texture, -2, axis)) / 9
+    distance = depth - position[2]
+    u, v = np.meshgrid(np.arange(width, dtype=np.double), np.arange(height, dtype=np.double))
+    x = ((u - cx) * distance / f + position[0]) / texel + 1000
+    y = ((v - cy) * distance / f + position[1]) / texel + 1000
+    x0 = np.clip(np.floor(x).astype(int), 0, 1998)
+    y0 = np.clip(np.floor(y).astype(int), 0, 1998)
+    ax, ay = np.clip(x - x0, 0, 1), np.clip(y - y0, 0, 1)
+    image = ((1 - ay) * ((1 - ax) * texture[y0, x0] + ax * texture[y0, x0 + 1]) +
+             ay * ((1 - ax) * texture[y0 + 1, x0] + ax * texture[y0 + 1, x0 + 1]))
+    image = (image - image.min()) / max(image.max() - image.min(), 1e-12)
+    return np.round(image * 255).astype(np.uint8)
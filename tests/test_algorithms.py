@@ -0,0 +1,309 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for algorithms.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import logging
+import unittest
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import algorithms
+from visual_odometry_pkg import camera
+from visual_odometry_pkg import data_preprocessor
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = '../test_data/'
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def shifted(image: np.array, dx: float, dy: float) -> np.array:
+    """
+    Translates an image by (dx, dy) pixels.
+    """
+    return cv.warpAffine(image, np.float32([[1, 0, dx], [0, 1, dy]]), image.shape[::-1])
+
+
+def intrinsic_camera() -> camera.Camera:
+    """
+    Camera with the test_data intrinsics and no LUT.
+    """
+    cam = camera.Camera()
+    cam.fx, cam.fy, cam.cx, cam.cy = 964.828979, 964.828979, 643.788025, 484.40799
+    return cam
+
+
+def synthetic_matches(cam: camera.Camera, rotation: np.array, translation: np.array, count: int = 400,
+                      outliers: float = 0.3, noise: float = 0.3, seed: int = 0) -> tuple:
+    """
+    Projects random 3D points into two views related by x_2 = R x_1 + t, then replaces a fraction of the matches
+    by random outliers.
+
+    Returns: tuple
+        (previous, current, outlier mask) pixel arrays
+    """
+    rng = np.random.default_rng(seed)
+    points = np.column_stack([rng.uniform(-4, 4, count), rng.uniform(-3, 3, count), rng.uniform(6, 30, count)])
+    k = np.array([[cam.fx, 0, cam.cx], [0, cam.fy, cam.cy], [0, 0, 1]])
+
+    def project(p: np.array) -> np.array:
+        pixels = p @ k.T
+        return pixels[:, :2] / pixels[:, 2:] + rng.normal(0, noise, (count, 2))
+
+    previous, current = project(points), project(points @ rotation.T + translation)
+    bad = rng.random(count) < outliers
+    current[bad] = rng.uniform([0, 0], [1280, 960], (bad.sum(), 2))
+    return previous, current, bad
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestFeatureTracker(unittest.TestCase):
+    """
+    Test class for the KLT feature tracker
+    """
+
+    def setUp(self) -> None:
+        bgr = cv.cvtColor(cv.imread(test_data + '1.png', 0), cv.COLOR_BAYER_GR2BGR)
+        self.gray = cv.cvtColor(bgr, cv.COLOR_BGR2GRAY)
+
+    def test_track_translation(self) -> None:
+        """
+        Test Condition:
+            Input   :-> frame and the same frame shifted by (3, -2) pixels
+            Output  :-> tracks with a median displacement of (3, -2) and stable ids
+        """
+        for detector in ('gftt', 'fast', 'orb'):
+            tracker = algorithms.FeatureTracker(max_features=300, min_features=100, detector=detector)
+            previous, current, ids = tracker.track(self.gray)
+            self.assertEqual(len(ids), 0)
+            first_ids = tracker.ids[:tracker.count].copy()
+            previous, current, ids = tracker.track(shifted(self.gray, 3, -2))
+            self.assertGreater(len(ids), 50)
+            np.testing.assert_allclose(np.median(current - previous, axis=0), [3, -2], atol=0.2)
+            self.assertTrue(np.isin(ids, first_ids).all())
+            self.assertEqual(tracker.stats()['frames'], 2)
+        log.info(f' FeatureTracker.track() passed!')
+
+    def test_replenish_below_threshold(self) -> None:
+        """
+        Test Condition:
+            Input   :-> three frames with enough surviving tracks
+            Output  :-> no new ids issued after the first detection
+        """
+        tracker = algorithms.FeatureTracker(max_features=200, min_features=50)
+        tracker.track(self.gray)
+        issued = tracker.next_id
+        tracker.track(shifted(self.gray, 1, 1))
+        tracker.track(shifted(self.gray, 2, 2))
+        self.assertEqual(tracker.next_id, issued)
+        self.assertLessEqual(tracker.count, 200)
+        log.info(f' FeatureTracker replenishment passed!')
+
+    def test_bounded_timings(self) -> None:
+        """
+        Test Condition:
+            Input   :-> tracker keeping the timings of 2 frames, 4 frames tracked
+            Output  :-> 2 latencies kept, the frame count and the tracks/sec over all 4 frames
+        """
+        kept = algorithms.TIMINGS_KEPT
+        algorithms.TIMINGS_KEPT = 2
+        try:
+            tracker = algorithms.FeatureTracker(max_features=200, min_features=50)
+        finally:
+            algorithms.TIMINGS_KEPT = kept
+        for shift in range(4):
+            tracker.track(shifted(self.gray, shift, 0))
+        self.assertEqual(len(tracker.frame_times), 2)
+        stats = tracker.stats()
+        self.assertEqual(stats['frames'], 4)
+        self.assertAlmostEqual(stats['tracks_per_sec'], tracker.tracked / tracker.elapsed)
+        self.assertGreater(tracker.elapsed, sum(tracker.frame_times))
+        log.info(f' FeatureTracker bounded timings passed!')
+
+    def test_replenish_edge_point(self) -> None:
+        """
+        Test Condition:
+            Input   :-> live features in the last half pixel of the right and bottom edges of a 100 x 100 frame
+            Output  :-> replenishment masks them at the border instead of indexing out of the frame
+        """
+        tracker = algorithms.FeatureTracker(max_features=50, min_features=50)
+        tracker.points[:2] = [[99.7, 50], [50, 99.6]]
+        tracker.ids[:2] = [0, 1]
+        tracker.count, tracker.next_id = 2, 2
+        tracker._replenish(np.ascontiguousarray(self.gray[:100, :100]))
+        self.assertGreater(tracker.count, 2)
+        np.testing.assert_allclose(tracker.points[:2], [[99.7, 50], [50, 99.6]], atol=1e-4)
+        log.info(f' FeatureTracker edge replenishment passed!')
+
+    def test_track_pyramid(self) -> None:
+        """
+        Test Condition:
+            Input   :-> ImagePyramid of a bgr frame and of the frame shifted by (2, 1) pixels
+            Output  :-> the same tracks as from the grayscale frames
+        """
+        bgr = cv.cvtColor(self.gray, cv.COLOR_GRAY2BGR)
+        pyramid = data_preprocessor.ImagePyramid(self.gray.shape, 3)
+        from_gray, from_pyramid = algorithms.FeatureTracker(), algorithms.FeatureTracker()
+        from_gray.track(self.gray)
+        from_pyramid.track(pyramid.build(bgr))
+        expected = [array.copy() for array in from_gray.track(shifted(self.gray, 2, 1))]
+        result = from_pyramid.track(pyramid.build(cv.cvtColor(shifted(self.gray, 2, 1), cv.COLOR_GRAY2BGR)))
+        for array, expected_array in zip(result, expected):
+            np.testing.assert_array_equal(array, expected_array)
+        log.info(f' FeatureTracker pyramid input passed!')
+
+    def test_bucket_select(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 1000 candidates packed in one corner plus one per other cell, 2 x 2 grid, count 4
+            Output  :-> one point per cell
+        """
+        rng = np.random.default_rng(0)
+        corner = rng.uniform(0, 40, (1000, 2)).astype(np.float32)
+        others = np.float32([[150, 20], [20, 150], [150, 150]])
+        points = np.concatenate([corner, others])
+        scores = np.concatenate([rng.uniform(1, 2, 1000), [0.1, 0.1, 0.1]])
+        selected = algorithms.bucket_select(points, scores, (200, 200), (2, 2), 4)
+        cells = {(int(y // 100), int(x // 100)) for x, y in selected}
+        self.assertEqual(len(cells), 4)
+        log.info(f' bucket_select() passed!')
+
+
+class TestMotionEstimator(unittest.TestCase):
+    """
+    Test class for the batched RANSAC essential matrix pose estimation
+    """
+
+    def setUp(self) -> None:
+        self.cam = intrinsic_camera()
+        self.rotation = cv.Rodrigues(np.array([0.02, -0.05, 0.01]))[0]
+        self.translation = np.array([0.2, -0.05, 1.0])
+
+    def test_estimate(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 400 noisy matches with 30 % outliers
+            Output  :-> R and the direction of t recovered, outliers rejected, early termination
+        """
+        previous, current, bad = synthetic_matches(self.cam, self.rotation, self.translation)
+        estimator = algorithms.MotionEstimator(self.cam, seed=1)
+        rotation, translation, inliers = estimator.estimate(previous, current)
+        np.testing.assert_allclose(rotation, self.rotation, atol=5e-3)
+        np.testing.assert_allclose(translation.ravel(), self.translation / np.linalg.norm(self.translation), atol=5e-2)
+        self.assertLess((inliers & bad).sum(), 5)
+        self.assertGreater((inliers & ~bad).sum(), 0.9 * (~bad).sum())
+        self.assertLess(estimator.iterations, estimator.max_iterations)
+        log.info(f' MotionEstimator.estimate() passed!')
+
+    def test_time_budget(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 90 % outliers with a zero time budget
+            Output  :-> a single batch is scored and the timeout is reported
+        """
+        previous, current, _ = synthetic_matches(self.cam, self.rotation, self.translation, outliers=0.9)
+        estimator = algorithms.MotionEstimator(self.cam, batch_size=16, time_budget=0.0, seed=1)
+        estimator.estimate(previous, current)
+        self.assertEqual(estimator.iterations, 16)
+        self.assertTrue(estimator.timed_out)
+        log.info(f' MotionEstimator time budget passed!')
+
+    def test_too_few_matches(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 5 matches
+            Output  :-> no pose, empty inlier mask
+        """
+        rotation, translation, inliers = algorithms.MotionEstimator(self.cam).estimate(np.zeros((5, 2)),
+                                                                                      np.zeros((5, 2)))
+        self.assertIsNone(rotation)
+        self.assertFalse(inliers.any())
+        log.info(f' MotionEstimator degenerate input passed!')
+
+
+class TestBundleAdjustment(unittest.TestCase):
+    """
+    Test class for the keyframe manager and the sliding-window bundle adjuster
+    """
+
+    def setUp(self) -> None:
+        """
+        Five keyframes moving forward along z and observing 300 landmarks, projected with 0.5 px noise
+        """
+        self.cam = intrinsic_camera()
+        rng = np.random.default_rng(0)
+        landmarks = np.column_stack([rng.uniform(-8, 8, 300), rng.uniform(-4, 4, 300), rng.uniform(12, 40, 300)])
+        k = np.array([[self.cam.fx, 0, self.cam.cx], [0, self.cam.fy, self.cam.cy], [0, 0, 1]])
+        self.truth, self.keyframes = [], []
+        for index in range(5):
+            pose = np.eye(4)
+            pose[:3, :3] = cv.Rodrigues(np.array([0.0, 0.02 * index, 0.0]))[0]
+            pose[:3, 3] = [0.1 * index, 0.0, 1.0 * index]
+            self.truth.append(pose)
+            world_to_camera = np.linalg.inv(pose)
+            pixels = (landmarks @ world_to_camera[:3, :3].T + world_to_camera[:3, 3]) @ k.T
+            pixels = pixels[:, :2] / pixels[:, 2:] + rng.normal(0, 0.5, (300, 2))
+            noisy = pose.copy()
+            if index:
+                noisy[:3, :3] = noisy[:3, :3] @ cv.Rodrigues(rng.normal(0, 0.01, 3))[0]
+                noisy[:3, 3] += rng.normal(0, 0.05, 3)
+            self.keyframes.append(algorithms.Keyframe(index, noisy, np.arange(300), pixels))
+
+    def test_adjust(self) -> None:
+        """
+        Test Condition:
+            Input   :-> keyframes with perturbed poses
+            Output  :-> reprojection error down to the noise level, rotations closer to the truth, report filled
+        """
+        def rotation_error() -> float:
+            return max(np.linalg.norm(cv.Rodrigues(keyframe.pose[:3, :3].T @ truth[:3, :3])[0])
+                       for keyframe, truth in zip(self.keyframes, self.truth))
+
+        before = rotation_error()
+        adjuster = algorithms.BundleAdjuster(self.cam)
+        report = adjuster.adjust(self.keyframes)
+        self.assertLess(report['final_rms'], 1.0)
+        self.assertLess(report['final_rms'], report['initial_rms'])
+        self.assertLess(rotation_error(), before)
+        np.testing.assert_array_equal(self.keyframes[0].pose, self.truth[0])
+        self.assertGreater(report['landmarks'], 270)
+        self.assertGreater(report['iterations'], 0)
+        self.assertNotIn('points', adjuster.reports[-1])
+        log.info(f' BundleAdjuster.adjust() passed!')
+
+    def test_keyframe_promotion(self) -> None:
+        """
+        Test Condition:
+            Input   :-> first frame, small motion, large motion, track loss
+            Output  :-> promoted, not promoted, promoted, promoted
+        """
+        manager = algorithms.KeyframeManager(window=3, min_parallax=10, min_track_ratio=0.5)
+        ids, points = np.arange(100), np.zeros((100, 2))
+        self.assertTrue(manager.update(0, np.eye(4), ids, points))
+        self.assertFalse(manager.update(1, np.eye(4), ids, points + 2))
+        self.assertTrue(manager.update(2, np.eye(4), ids, points + 20))
+        self.assertTrue(manager.update(3, np.eye(4), ids[:40], points[:40] + 20))
+        self.assertEqual([keyframe.index for keyframe in manager], [0, 2, 3])
+        log.info(f' KeyframeManager.update() passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
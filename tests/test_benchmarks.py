@@ -0,0 +1,83 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for the benchmarks/suite.py benchmark suite
+# Description   :-> Runs every case on a tiny synthetic dataset, the timings themselves are checked by the suite
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import json
+import logging
+import unittest
+import tempfile
+import cv2 as cv
+from benchmarks import suite
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestBenchmarkSuite(unittest.TestCase):
+    """
+    Test class for the benchmark suite and its baseline comparison
+    """
+
+    def test_dataset(self) -> None:
+        """
+        Test Condition:
+            Input   :-> half scale, 10 frames
+            Output  :-> 10 readable frames of half the test_data/ resolution and a matching camera model
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            dataset = suite.make_dataset(folder, 0.5, 10)
+            self.assertEqual(len(dataset['files']), 10)
+            self.assertEqual(cv.imread(dataset['files'][9], 0).shape, dataset['shape'])
+            self.assertEqual(dataset['shape'], (480, 640))
+            self.assertTrue(os.path.isfile(os.path.join(folder, 'lut.bin')))
+        log.info(f' benchmark dataset passed!')
+
+    def test_cases(self) -> None:
+        """
+        Test Condition:
+            Input   :-> every case at a quarter of the resolution, in this process, one round
+            Output  :-> JSON serialisable results with fps, p50 / p99 latency and peak RSS
+        """
+        report = suite.run(scales=(0.25,), frames=4, repeat=1, rounds=1, isolated=False)
+        self.assertEqual(set(report['results']), {f'{case}@0.25x' for case in suite.CASES})
+        for name, result in report['results'].items():
+            self.assertGreater(result['fps'], 0, name)
+            self.assertGreaterEqual(result['p99_ms'], result['p50_ms'], name)
+            self.assertGreater(result['peak_rss_mb'], 0, name)
+        json.dumps(report)
+        log.info(f' benchmark cases passed!')
+
+    def test_compare(self) -> None:
+        """
+        Test Condition:
+            Input   :-> results within the tolerances, then 40 % slower and with twice the p99 of the baseline
+            Output  :-> no regression, then one fps and one p99 regression
+        """
+        baseline = {'results': {'undistorter@1x': {'fps': 100.0, 'p99_ms': 10.0, 'peak_rss_mb': 100.0}}}
+        report = {'results': {'undistorter@1x': {'fps': 90.0, 'p99_ms': 12.0, 'peak_rss_mb': 110.0},
+                              'load_frames@1x': {'fps': 1.0, 'p99_ms': 1.0, 'peak_rss_mb': 1.0}}}
+        self.assertEqual(suite.compare(report, baseline), [])
+        report['results']['undistorter@1x'].update(fps=60.0, p99_ms=20.0)
+        regressions = suite.compare(report, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(message.startswith('undistorter@1x') for message in regressions))
+        log.info(f' benchmark baseline comparison passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
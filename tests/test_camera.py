@@ -11,10 +11,14 @@
 # ==================================================================================================================== #
 # Import Section
 # ==================================================================================================================== #
+import os
+import shutil
 import unittest
 import logging
+import tempfile
 import numpy as np
 from visual_odometry_pkg import camera
+from tests.synthetic_data import synthetic_lut
 
 # ==================================================================================================================== #
 # Logger setup section
@@ -97,5 +101,144 @@ class TestCamera(unittest.TestCase):
         log.info(f' get_camera_model() passed')
 
 
+class TestCameraCache(unittest.TestCase):
+    """
+        Test class for the memory-mapped, cached camera model loading
+    """
+
+    def setUp(self) -> None:
+        """
+        Writes a small camera model (test intrinsics, synthetic 40 x 30 LUT) to a temporary model folder
+        """
+        self.root = tempfile.mkdtemp()
+        self.model_dir = os.path.join(self.root, 'model') + os.sep
+        self.cache_dir = os.path.join(self.root, 'cache')
+        os.makedirs(self.model_dir)
+        shutil.copy(test_data + 'intrinsic_parameters.txt', self.model_dir)
+        self.lut = synthetic_lut(30, 40, k1=-0.2, fx=30, fy=30)
+        self.lut.T.tofile(self.model_dir + 'lut.bin')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_mmap_read(self) -> None:
+        """
+        Test Condition:
+            Input   :-> mmap=True
+            Output  :-> memory-mapped LUT equal to the plain read
+        """
+        cam = camera.Camera()
+        cam.read_camera_model(self.model_dir, mmap=True)
+        self.assertIsInstance(cam.LUT.base, np.memmap)
+        np.testing.assert_array_equal(cam.LUT, self.lut)
+        log.info(f' read_camera_model(mmap=True) passed')
+
+    def test_cached_read(self) -> None:
+        """
+        Test Condition:
+            Input   :-> cache_dir, read twice then with a changed lut.bin
+            Output  :-> contiguous memory-mapped LUT, same cache entry for the same files, new entry after the change
+        """
+        first, second = camera.Camera(), camera.Camera()
+        first.read_camera_model(self.model_dir, cache_dir=self.cache_dir)
+        second.read_camera_model(self.model_dir, cache_dir=self.cache_dir)
+        np.testing.assert_array_equal(second.LUT, self.lut)
+        self.assertTrue(second.LUT.flags['C_CONTIGUOUS'])
+        self.assertIsInstance(second.LUT, np.memmap)
+        self.assertEqual(first.model_hash, second.model_hash)
+
+        (self.lut + 1).T.tofile(self.model_dir + 'lut.bin')
+        third = camera.Camera()
+        third.read_camera_model(self.model_dir, cache_dir=self.cache_dir)
+        self.assertNotEqual(third.model_hash, first.model_hash)
+        np.testing.assert_array_equal(third.LUT, self.lut + 1)
+        log.info(f' read_camera_model(cache_dir) passed')
+
+    def test_remap_tables(self) -> None:
+        """
+        Test Condition:
+            Input   :-> cached model, frame shape
+            Output  :-> remap tables stored in the cache entry and memory-mapped on the next call
+        """
+        cam = camera.Camera()
+        cam.read_camera_model(self.model_dir, cache_dir=self.cache_dir)
+        map1, map2 = cam.remap_tables((30, 40))
+        self.assertEqual(map1.shape, (30, 40, 2))
+        self.assertTrue(os.path.isfile(os.path.join(cam.cache_dir, 'map1_30x40.npy')))
+        cached1, cached2 = cam.remap_tables((30, 40))
+        self.assertIsInstance(cached1, np.memmap)
+        np.testing.assert_array_equal(cached2, map2)
+        log.info(f' remap_tables() passed')
+
+
+class TestCameraRegistry(unittest.TestCase):
+    """
+        Test class for the lazily loading, shared camera registry
+    """
+
+    def setUp(self) -> None:
+        """
+        Writes two small camera models with 9600 byte LUTs to a temporary folder
+        """
+        self.root = tempfile.mkdtemp()
+        self.model_dirs = []
+        for name in ('left', 'right'):
+            model_dir = os.path.join(self.root, name) + os.sep
+            os.makedirs(model_dir)
+            shutil.copy(test_data + 'intrinsic_parameters.txt', model_dir)
+            synthetic_lut(20, 30, fx=20, fy=20).T.tofile(model_dir + 'lut.bin')
+            self.model_dirs.append(model_dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_lazy_shared_load(self) -> None:
+        """
+        Test Condition:
+            Input   :-> registered name requested twice, unregistered model path
+            Output  :-> read once and shared, paths work as names
+        """
+        registry = camera.CameraRegistry()
+        registry.register('left', self.model_dirs[0])
+        self.assertEqual(registry.loads, 0)
+        self.assertIs(registry.get('left'), registry.get('left'))
+        self.assertEqual(registry.loads, 1)
+        self.assertEqual(registry.get(self.model_dirs[1]).fx, 964.828979)
+        self.assertEqual(set(registry.names()), {'left', self.model_dirs[1]})
+        log.info(f' CameraRegistry.get() passed')
+
+    def test_lru_eviction(self) -> None:
+        """
+        Test Condition:
+            Input   :-> memory budget of one LUT, two cameras used alternately
+            Output  :-> least recently used model evicted, the budget holds
+        """
+        registry = camera.CameraRegistry(memory_budget=9600)
+        registry.register('left', self.model_dirs[0])
+        registry.register('right', self.model_dirs[1])
+        left = registry.get('left')
+        registry.get('right')
+        self.assertEqual(registry.evictions, 1)
+        self.assertLessEqual(registry.memory_used(), 9600)
+        self.assertIsNot(registry.get('left'), left)
+        self.assertEqual(registry.loads, 3)
+        log.info(f' CameraRegistry eviction passed')
+
+    def test_extrinsics(self) -> None:
+        """
+        Test Condition:
+            Input   :-> two registered cameras, none loaded
+            Output  :-> G_camera_image of both without reading a LUT
+        """
+        registry = camera.CameraRegistry()
+        registry.register('left', self.model_dirs[0])
+        registry.register('right', self.model_dirs[1])
+        extrinsics = registry.extrinsics()
+        self.assertEqual(set(extrinsics), {'left', 'right'})
+        self.assertEqual(extrinsics['right'].shape, (4, 4))
+        self.assertEqual(registry.loads, 0)
+        log.info(f' CameraRegistry.extrinsics() passed')
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -12,11 +12,17 @@
 # Import Section
 # ==================================================================================================================== #
 import os
+import glob
+import time
 import logging
+import tempfile
+import threading
 import unittest
 import cv2 as cv
+import numpy as np
 from visual_odometry_pkg import data_preprocessor as dp
 from visual_odometry_pkg import camera
+from tests.synthetic_data import synthetic_lut
 
 # ==================================================================================================================== #
 # Logger setup section
@@ -150,5 +156,547 @@ class TestDataPreprocessor(unittest.TestCase):
         log.info(f' convert_bayer_rg2bgr() passed!')
 
 
+class TestUndistorter(unittest.TestCase):
+    """
+    Test class for the precomputed remap undistorter
+    """
+
+    def setUp(self) -> None:
+        """
+        Loads a colour test frame and builds a synthetic LUT for it (test_data has no lut.bin)
+        """
+        self.image = cv.cvtColor(cv.imread(test_data + '1.png', 0), cv.COLOR_BAYER_GR2BGR)
+        self.shape = self.image.shape[:2]
+        self.lut = synthetic_lut(*self.shape, k1=-0.1)
+
+    def test_identity_lut(self) -> None:
+        """
+        Test Condition:
+            Input   :-> identity LUT
+            Output  :-> frame unchanged
+        """
+        undistorter = dp.Undistorter(synthetic_lut(*self.shape), self.shape)
+        np.testing.assert_array_equal(undistorter.undistort(self.image), self.image)
+        log.info(f' Undistorter identity passed!')
+
+    def test_matches_undistort_image(self) -> None:
+        """
+        Test Condition:
+            Input   :-> radial LUT, colour frame and a preallocated output buffer
+            Output  :-> the buffer is filled and agrees with undistort_image() up to interpolation rounding
+        """
+        out = np.empty_like(self.image)
+        result = dp.Undistorter(self.lut, self.shape).undistort(self.image, out=out)
+        self.assertIs(result, out)
+        reference = dp.DataPreprocessor.undistort_image(self.image, self.lut)
+        diff = np.abs(result[8:-8, 8:-8].astype(np.int16) - reference[8:-8, 8:-8])
+        self.assertLessEqual(diff.max(), 3)
+        self.assertLess(diff.mean(), 0.1)
+        log.info(f' Undistorter matches undistort_image() passed!')
+
+    def test_shape_mismatch(self) -> None:
+        """
+        Test Condition:
+            Input   :-> LUT or buffer that does not match the frame
+            Output  :-> ValueError
+        """
+        with self.assertRaises(ValueError):
+            dp.Undistorter(self.lut, (self.shape[0] // 2, self.shape[1]))
+        with self.assertRaises(ValueError):
+            dp.Undistorter(self.lut, self.shape).undistort(self.image, out=np.empty(self.shape, np.uint8))
+        log.info(f' Undistorter shape checks passed!')
+
+    def test_bands(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 4 row bands undistorted in parallel, fixed-point and float maps
+            Output  :-> the same frame as the single band undistortion
+        """
+        for fixed_point in [True, False]:
+            expected = dp.Undistorter(self.lut, self.shape, fixed_point).undistort(self.image)
+            banded = dp.Undistorter(self.lut, self.shape, fixed_point, bands=4)
+            self.assertEqual(len(banded.bands), 4)
+            np.testing.assert_array_equal(banded.undistort(self.image), expected)
+        self.assertEqual(dp.row_bands(10, 3), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(dp.row_bands(2, 8), [(0, 1), (1, 2)])
+        log.info(f' Undistorter row bands passed!')
+
+    def test_roi(self) -> None:
+        """
+        Test Condition:
+            Input   :-> central half roi, with and without bands, out of frame roi
+            Output  :-> the crop of the full undistorted frame, ValueError for the bad roi
+        """
+        roi = dp.central_roi(self.shape, 0.5)
+        x, y, width, height = roi
+        self.assertEqual((width, height), (self.shape[1] // 2, self.shape[0] // 2))
+        full = dp.Undistorter(self.lut, self.shape).undistort(self.image)
+        for bands in [1, 3]:
+            undistorter = dp.Undistorter(self.lut, self.shape, roi=roi, bands=bands)
+            self.assertEqual(undistorter.output_shape, (height, width))
+            np.testing.assert_array_equal(undistorter.undistort(self.image), full[y:y + height, x:x + width])
+        with self.assertRaises(ValueError):
+            dp.Undistorter(self.lut, self.shape, roi=(x, y, self.shape[1], height))
+        log.info(f' Undistorter roi passed!')
+
+    def test_undistort_image_tiles(self) -> None:
+        """
+        Test Condition:
+            Input   :-> undistort_image() with 3 worker bands, and with a roi into a preallocated buffer
+            Output  :-> the single threaded result and its crop
+        """
+        image = self.image[:240, :320].copy()
+        lut = synthetic_lut(240, 320, k1=-0.2)
+        expected = dp.DataPreprocessor.undistort_image(image, lut)
+        np.testing.assert_array_equal(dp.DataPreprocessor.undistort_image(image, lut, workers=3), expected)
+        out = np.empty((100, 120, 3), np.uint8)
+        result = dp.DataPreprocessor.undistort_image(image, lut, out=out, workers=2, roi=(40, 60, 120, 100))
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, expected[60:160, 40:160])
+        log.info(f' undistort_image() tiles and roi passed!')
+
+
+class TestFrameStream(unittest.TestCase):
+    """
+    Test class for the bounded-memory streaming frame source
+    """
+
+    def setUp(self) -> None:
+        self.files = sorted(glob.glob(source + '*.png'))
+
+    def test_load_frames_order(self) -> None:
+        """
+        Test Condition:
+            Input   :-> sorted list of png files
+            Output  :-> frames identical to cv.imread(file, 0) in the same order, one decode time per frame
+        """
+        frames_stream = dp.DataPreprocessor.load_frames(self.files, read_ahead=3, workers=2)
+        frames = list(frames_stream)
+        self.assertEqual(len(frames), len(self.files))
+        for file, frame in zip(self.files, frames):
+            np.testing.assert_array_equal(frame, cv.imread(file, 0))
+        self.assertEqual(frames_stream.stats()['frames'], len(self.files))
+        log.info(f' load_frames() streaming order passed!')
+
+    def test_bounded_read_ahead(self) -> None:
+        """
+        Test Condition:
+            Input   :-> slow consumer, read_ahead = 2
+            Output  :-> never more than read_ahead frames decoded ahead of the consumer
+        """
+        decoded = []
+        lock = threading.Lock()
+
+        def loader(file: str) -> str:
+            with lock:
+                decoded.append(file)
+            return file
+
+        stream = dp.FrameStream(list(range(20)), read_ahead=2, workers=2, loader=loader)
+        for consumed, _ in enumerate(stream, start=1):
+            time.sleep(0.01)
+            with lock:
+                self.assertLessEqual(len(decoded), consumed + 2)
+        log.info(f' FrameStream read ahead bound passed!')
+
+    def test_bounded_timings(self) -> None:
+        """
+        Test Condition:
+            Input   :-> stream of 20 frames keeping the timings of 5
+            Output  :-> 5 decode times kept, 20 frames counted
+        """
+        kept = dp.TIMINGS_KEPT
+        dp.TIMINGS_KEPT = 5
+        try:
+            stream = dp.FrameStream(list(range(20)), read_ahead=2, workers=1, loader=lambda file: file)
+        finally:
+            dp.TIMINGS_KEPT = kept
+        self.assertEqual(list(stream), list(range(20)))
+        self.assertEqual(len(stream.decode_times), 5)
+        self.assertEqual(stream.stats()['frames'], 20)
+        log.info(f' FrameStream bounded timings passed!')
+
+    def test_early_close(self) -> None:
+        """
+        Test Condition:
+            Input   :-> consumer stops after the first frame
+            Output  :-> remaining decodes are cancelled and the stream is exhausted
+        """
+        with dp.FrameStream(self.files, read_ahead=2, workers=1) as stream:
+            next(stream)
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.stats()['buffered'], 0)
+        log.info(f' FrameStream early close passed!')
+
+
+class TestPreprocessPipeline(unittest.TestCase):
+    """
+    Test class for the fused decode -> demosaic -> undistort pipeline
+    """
+
+    def setUp(self) -> None:
+        self.files = sorted(glob.glob(source + '*.png'))
+        shape = cv.imread(self.files[0], 0).shape
+        self.undistorter = dp.Undistorter(synthetic_lut(*shape, k1=-0.1), shape)
+
+    def test_in_order_output(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames, gr pattern, radial LUT, several workers per stage
+            Output  :-> same frames as the separate calls, in input order, with timings for every stage
+        """
+        pipeline = dp.PreprocessPipeline.from_config(self.undistorter, 'gr', workers=(3, 2, 2), buffers=4)
+        count = 0
+        for file, frame in zip(self.files, pipeline.run(self.files)):
+            expected = self.undistorter.undistort(cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2BGR))
+            np.testing.assert_array_equal(frame, expected)
+            count += 1
+        self.assertEqual(count, len(self.files))
+        stats = pipeline.stats()
+        self.assertEqual(stats['frames'], len(self.files))
+        self.assertEqual(set(stats['stage_ms']), {'decode', 'demosaic', 'undistort'})
+        log.info(f' PreprocessPipeline order passed!')
+
+    def test_stats_per_run(self) -> None:
+        """
+        Test Condition:
+            Input   :-> pipeline keeping the timings of 4 frames, run twice over the test frames
+            Output  :-> the counts of the last run only, 4 timings kept per stage
+        """
+        kept = dp.TIMINGS_KEPT
+        dp.TIMINGS_KEPT = 4
+        try:
+            pipeline = dp.PreprocessPipeline.from_config(self.undistorter, 'gr', buffers=2)
+        finally:
+            dp.TIMINGS_KEPT = kept
+        for _ in range(2):
+            for _ in pipeline.run(self.files):
+                pass
+        self.assertEqual(pipeline.stats()['frames'], len(self.files))
+        self.assertEqual({name: len(times) for name, times in pipeline.stage_times.items()},
+                         {'decode': 4, 'demosaic': 4, 'undistort': 4})
+        log.info(f' PreprocessPipeline per run stats passed!')
+
+    def test_stage_error(self) -> None:
+        """
+        Test Condition:
+            Input   :-> a stage raising on the third frame, consumer stops there
+            Output  :-> the first two frames are yielded, then the error reaches the consumer
+        """
+        def check(item: int, slot: dict) -> int:
+            if item == 2:
+                raise RuntimeError('bad frame')
+            return item
+
+        pipeline = dp.PreprocessPipeline([dp.PipelineStage('check', check, 2)], buffers=2)
+        frames = []
+        with self.assertRaises(RuntimeError):
+            for frame in pipeline.run(range(10)):
+                frames.append(frame)
+        self.assertEqual(frames, [0, 1])
+        log.info(f' PreprocessPipeline error propagation passed!')
+
+    def test_unknown_pattern(self) -> None:
+        """
+        Test Condition:
+            Input   :-> unknown bayer pattern
+            Output  :-> ValueError
+        """
+        with self.assertRaises(ValueError):
+            dp.PreprocessPipeline.from_config(bayer_pattern='xy')
+        log.info(f' PreprocessPipeline pattern check passed!')
+
+    def test_frames_to_video_range(self) -> None:
+        """
+        Test Condition:
+            Input   :-> undistorter, every second frame from the second one
+            Output  :-> out.avi with 4 frames and the throughput report
+        """
+        with tempfile.TemporaryDirectory() as root:
+            out = root + os.sep
+            report = dp.DataPreprocessor.frames_to_video(source, out, 'DIVX', 1, undistorter=self.undistorter,
+                                                         start=1, stride=2, buffers=2)
+            self.assertTrue(os.path.isfile(out + 'out.avi'))
+            self.assertEqual(report['frames'], 4)
+            self.assertIn('undistort', report['stage_ms'])
+            video = cv.VideoCapture(out + 'out.avi')
+            self.assertEqual(int(video.get(cv.CAP_PROP_FRAME_COUNT)), 4)
+            video.release()
+        log.info(f' frames_to_video() streaming range passed!')
+
+    def test_frames_to_video_output_shape(self) -> None:
+        """
+        Test Condition:
+            Input   :-> undistorter with a roi crop, then one built for half resolution frames, then one for frames of
+                        another shape
+            Output  :-> videos of the undistorted size holding every frame, the mismatched undistorter refused
+        """
+        height, width = self.undistorter.shape
+        lut = synthetic_lut(height, width, k1=-0.1)
+        undistorters = [dp.Undistorter(lut, (height, width), roi=(100, 50, 640, 480)),
+                        dp.Undistorter(dp.downscale_lut(lut, (height, width), 0.5)[0], (height // 2, width // 2))]
+        for undistorter in undistorters:
+            with tempfile.TemporaryDirectory() as root:
+                out = root + os.sep
+                report = dp.DataPreprocessor.frames_to_video(source, out, 'DIVX', 1, undistorter=undistorter)
+                self.assertEqual(report['frames'], 8)
+                video = cv.VideoCapture(out + 'out.avi')
+                self.assertEqual(int(video.get(cv.CAP_PROP_FRAME_COUNT)), 8)
+                self.assertEqual((int(video.get(cv.CAP_PROP_FRAME_HEIGHT)), int(video.get(cv.CAP_PROP_FRAME_WIDTH))),
+                                 undistorter.output_shape)
+                video.release()
+        with tempfile.TemporaryDirectory() as root:
+            with self.assertRaises(ValueError):
+                dp.DataPreprocessor.frames_to_video(source, root + os.sep, 'DIVX', 1,
+                                                    undistorter=dp.Undistorter(synthetic_lut(300, 300), (300, 300)))
+        log.info(f' frames_to_video() undistorted output size passed!')
+
+
+class TestFramePool(unittest.TestCase):
+    """
+    Test class for the reusable frame buffer pool and the out= API
+    """
+
+    def setUp(self) -> None:
+        self.files = sorted(glob.glob(source + '*.png'))
+        self.bayer = cv.imread(self.files[0], 0)
+
+    def test_acquire_release(self) -> None:
+        """
+        Test Condition:
+            Input   :-> two buffers acquired, released and acquired again
+            Output  :-> the same buffers are returned, hits, allocations and high-water mark are counted
+        """
+        pool = dp.FramePool()
+        first, second = pool.acquire((4, 5, 3)), pool.acquire((4, 5, 3))
+        pool.release(first)
+        pool.release(second)
+        again = [pool.acquire((4, 5, 3)) for _ in range(2)]
+        self.assertEqual({id(buffer) for buffer in again}, {id(first), id(second)})
+        self.assertEqual(pool.acquire((4, 5), np.float32).dtype, np.float32)
+        stats = pool.stats()
+        self.assertEqual((stats['requests'], stats['hits'], stats['allocations']), (5, 2, 3))
+        self.assertEqual(stats['allocations_avoided'], 2)
+        self.assertEqual(stats['high_water'], 3)
+        self.assertEqual(stats['in_use'], 3)
+        log.info(f' FramePool acquire / release passed!')
+
+    def test_out_api(self) -> None:
+        """
+        Test Condition:
+            Input   :-> pooled output buffers for imread, convert_bayer_* and undistort_image
+            Output  :-> results written into the buffers, identical to the allocating calls
+        """
+        pool = dp.FramePool()
+        preprocessor = dp.DataPreprocessor()
+        raw = pool.acquire(self.bayer.shape)
+        self.assertIs(preprocessor.imread(self.files[0], 0, out=raw), raw)
+        np.testing.assert_array_equal(raw, self.bayer)
+        self.assertIsNone(preprocessor.imread(source + 'missing.png', 0, out=raw))
+        color = pool.acquire(self.bayer.shape + (3,))
+        for name in ['bg', 'gb', 'rg', 'gr']:
+            convert = getattr(preprocessor, f'convert_bayer_{name}2bgr')
+            self.assertIs(convert(raw, out=color), color)
+            np.testing.assert_array_equal(color, convert(raw))
+        self.assertIs(preprocessor.convert_bayer(raw, 'gr', out=color), color)
+        image = color[:120, :160].copy()
+        lut = synthetic_lut(120, 160, k1=-0.2)
+        undistorted = pool.acquire(image.shape)
+        self.assertIs(preprocessor.undistort_image(image, lut, out=undistorted), undistorted)
+        np.testing.assert_array_equal(undistorted, preprocessor.undistort_image(image, lut))
+        with self.assertRaises(ValueError):
+            preprocessor.undistort_image(image, lut, out=pool.acquire((120, 160)))
+        log.info(f' out= API passed!')
+
+    def test_frame_stream_recycling(self) -> None:
+        """
+        Test Condition:
+            Input   :-> pooled FrameStream over the test frames, read_ahead = 2
+            Output  :-> correct frames, at most read_ahead + 2 buffers ever allocated, later decodes hit the pool
+        """
+        pool = dp.FramePool()
+        with dp.DataPreprocessor.load_frames(self.files * 3, read_ahead=2, workers=2, pool=pool) as stream:
+            for file, frame in zip(self.files * 3, stream):
+                np.testing.assert_array_equal(frame, cv.imread(file, 0))
+        stats = pool.stats()
+        self.assertLessEqual(stats['allocations'], 4)
+        self.assertGreater(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['in_use'], 0)
+        with self.assertRaises(ValueError):
+            dp.FrameStream(self.files, loader=lambda file: file, pool=pool)
+        log.info(f' FrameStream recycling passed!')
+
+    def test_pipeline_reuse(self) -> None:
+        """
+        Test Condition:
+            Input   :-> two runs of a pooled pipeline over the test frames
+            Output  :-> identical frames, the second run takes its stage buffers from the pool
+        """
+        pool = dp.FramePool()
+        undistorter = dp.Undistorter(synthetic_lut(*self.bayer.shape, k1=-0.1), self.bayer.shape)
+        pipeline = dp.PreprocessPipeline.from_config(undistorter, 'gr', workers=(1, 1, 1), buffers=2, pool=pool)
+        first = [frame.copy() for frame in pipeline.run(self.files)]
+        allocations = pool.stats()['allocations']
+        second = [frame.copy() for frame in pipeline.run(self.files)]
+        for before, after in zip(first, second):
+            np.testing.assert_array_equal(before, after)
+        self.assertEqual(pool.stats()['allocations'], allocations)
+        self.assertGreater(pool.stats()['hits'], 0)
+        log.info(f' PreprocessPipeline pool reuse passed!')
+
+    def test_pipeline_early_stop(self) -> None:
+        """
+        Test Condition:
+            Input   :-> pooled pipelines with a motion gate, left after 2 frames or stopped by a failing stage
+            Output  :-> every stage buffer handed back to the pool
+        """
+        pool = dp.FramePool()
+        undistorter = dp.Undistorter(synthetic_lut(*self.bayer.shape, k1=-0.1), self.bayer.shape)
+        pipeline = dp.PreprocessPipeline.from_config(undistorter, 'gr', workers=(2, 2, 2), buffers=4, pool=pool,
+                                                     gate=dp.MotionGate(threshold=0))
+        for index, frame in enumerate(pipeline.run(self.files * 2)):
+            if index == 1:
+                break
+        self.assertGreater(pool.stats()['allocations'], 0)
+        self.assertEqual(pool.in_use, 0)
+
+        def fail(frame: np.array, slot: dict) -> np.array:
+            raise RuntimeError('stage failure')
+
+        stages = pipeline.stages + [dp.PipelineStage('fail', fail)]
+        with self.assertRaises(RuntimeError):
+            list(dp.PreprocessPipeline(stages, buffers=4, pool=pool).run(self.files))
+        self.assertEqual(pool.in_use, 0)
+        log.info(f' PreprocessPipeline early stop passed!')
+
+
+class TestImagePyramid(unittest.TestCase):
+    """
+    Test class for the preallocated image pyramid and the reduced resolution undistortion
+    """
+
+    def setUp(self) -> None:
+        self.image = cv.cvtColor(cv.imread(test_data + '1.png', 0), cv.COLOR_BAYER_GR2BGR)
+        self.shape = self.image.shape[:2]
+
+    def test_build(self) -> None:
+        """
+        Test Condition:
+            Input   :-> bgr test frame, 4 levels, built twice
+            Output  :-> the cv.pyrDown() chain of the grayscale frame in read-only levels, same buffers both builds
+        """
+        pyramid = dp.ImagePyramid(self.shape, 4)
+        pyramid.build(self.image)
+        buffers = [level.base for level in pyramid.levels]
+        expected = cv.cvtColor(self.image, cv.COLOR_BGR2GRAY)
+        for level in pyramid.levels:
+            np.testing.assert_array_equal(level, expected)
+            self.assertFalse(level.flags.writeable)
+            expected = cv.pyrDown(expected)
+        self.assertEqual(len(pyramid), 4)
+        self.assertEqual(pyramid[3].shape, ((self.shape[0] + 7) // 8, (self.shape[1] + 7) // 8))
+        pyramid.build(self.image[::-1].copy())
+        self.assertTrue(all(level.base is buffer for level, buffer in zip(pyramid.levels, buffers)))
+        self.assertEqual(pyramid.builds, 2)
+        with self.assertRaises(ValueError):
+            pyramid.build(self.image[:100])
+        log.info(f' ImagePyramid.build() passed!')
+
+    def test_pipeline_stage(self) -> None:
+        """
+        Test Condition:
+            Input   :-> pipeline with a 3 level pyramid stage after the undistortion
+            Output  :-> pyramids of the undistorted frames, built into the slot pyramids
+        """
+        files = sorted(glob.glob(source + '*.png'))
+        undistorter = dp.Undistorter(synthetic_lut(*self.shape, k1=-0.1), self.shape)
+        pipeline = dp.PreprocessPipeline.from_config(undistorter, 'gr', workers=(1, 1, 1), buffers=2,
+                                                     pyramid_levels=3)
+        pyramids = set()
+        for file, pyramid in zip(files, pipeline.run(files)):
+            frame = undistorter.undistort(cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2BGR))
+            np.testing.assert_array_equal(pyramid.image, frame)
+            np.testing.assert_array_equal(pyramid[2], cv.pyrDown(cv.pyrDown(cv.cvtColor(frame, cv.COLOR_BGR2GRAY))))
+            pyramids.add(id(pyramid))
+        self.assertLessEqual(len(pyramids), 2)
+        self.assertIn('pyramid', pipeline.stats()['stage_ms'])
+        log.info(f' PreprocessPipeline pyramid stage passed!')
+
+    def test_downscaled_undistortion(self) -> None:
+        """
+        Test Condition:
+            Input   :-> half scale LUT derived from the full resolution LUT, half size frames
+            Output  :-> close to the full resolution undistortion resized to half size
+        """
+        lut = synthetic_lut(*self.shape, k1=-0.1)
+        small_lut, small = dp.downscale_lut(lut, self.shape, 0.5)
+        self.assertEqual(small, (self.shape[0] // 2, self.shape[1] // 2))
+        np.testing.assert_allclose(small_lut, synthetic_lut(*small, k1=-0.1, fx=964.828979 / 2, fy=964.828979 / 2),
+                                   atol=0.05)
+        cam = camera.Camera()
+        cam.LUT = lut
+        undistorter = dp.Undistorter.from_camera(cam, self.shape, scale=0.5)
+        self.assertEqual(undistorter.shape, small)
+        resized = cv.resize(self.image, small[::-1], interpolation=cv.INTER_AREA)
+        expected = cv.resize(dp.Undistorter(lut, self.shape).undistort(self.image), small[::-1],
+                             interpolation=cv.INTER_AREA)
+        difference = np.abs(undistorter.undistort(resized).astype(int) - expected)
+        self.assertLess(difference[20:-20, 20:-20].mean(), 3)
+        pipeline = dp.PreprocessPipeline.from_config(undistorter, 'gr', workers=(1, 1, 1), buffers=2, scale=0.5)
+        frame = next(pipeline.run([test_data + '1.png']))
+        np.testing.assert_array_equal(frame, undistorter.undistort(resized))
+        with self.assertRaises(ValueError):
+            dp.downscale_lut(lut, self.shape, 2.0)
+        log.info(f' downscaled LUT undistortion passed!')
+
+
+class TestMotionGate(unittest.TestCase):
+    """
+    Test class for the motion pre-check skipping still frames
+    """
+
+    def setUp(self) -> None:
+        self.files = sorted(glob.glob(source + '*.png'))
+        self.bayer = cv.imread(self.files[0], 0)
+
+    def test_check(self) -> None:
+        """
+        Test Condition:
+            Input   :-> a frame repeated, then shifted by 8 pixels; a gate letting through at most 2 skips in a row
+            Output  :-> repeats skipped, the shifted frame let through, every third repeat forced through
+        """
+        gate = dp.MotionGate()
+        self.assertEqual([gate.check(self.bayer) for _ in range(3)], [True, False, False])
+        self.assertTrue(gate.check(np.roll(self.bayer, 8, axis=1)))
+        self.assertEqual(gate.stats(), {'frames': 4, 'skipped': 2, 'skip_rate': 0.5})
+        gate = dp.MotionGate(max_skip=2)
+        self.assertEqual([gate.check(self.bayer) for _ in range(7)], [True, False, False, True, False, False, True])
+        gate.reset()
+        self.assertEqual(gate.stats()['frames'], 0)
+        self.assertTrue(gate.check(self.bayer))
+        log.info(f' MotionGate.check() passed!')
+
+    def test_pipeline_gate(self) -> None:
+        """
+        Test Condition:
+            Input   :-> each test frame three times in a row, through a gated pipeline with several decode workers
+            Output  :-> the first of each three processed in order, None for the repeats
+        """
+        files = [file for file in self.files for _ in range(3)]
+        undistorter = dp.Undistorter(synthetic_lut(*self.bayer.shape, k1=-0.1), self.bayer.shape)
+        pipeline = dp.PreprocessPipeline.from_config(undistorter, 'gr', workers=(3, 1, 1), buffers=4,
+                                                     gate=dp.MotionGate(threshold=0.5))
+        frames = [None if frame is None else frame.copy() for frame in pipeline.run(files)]
+        self.assertEqual([frame is not None for frame in frames], [True, False, False] * len(self.files))
+        for file, frame in zip(self.files, frames[::3]):
+            expected = undistorter.undistort(cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2BGR))
+            np.testing.assert_array_equal(frame, expected)
+        stats = pipeline.stats()
+        self.assertEqual((stats['frames'], stats['skipped']), (len(self.files), 2 * len(self.files)))
+        with self.assertRaises(ValueError):
+            dp.PipelineStage('gate', lambda frame, slot: frame, workers=2, ordered=True)
+        log.info(f' PreprocessPipeline motion gate passed!')
+
+
 if __name__ == '__main__':
     unittest.main()
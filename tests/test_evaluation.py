@@ -0,0 +1,157 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for evaluation.py module
+# Description   :-> Synthetic trajectories with known errors
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import json
+import logging
+import unittest
+import numpy as np
+from visual_odometry_pkg import evaluation
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def yaw(angles: np.array) -> np.array:
+    """
+    (n, 3, 3) rotations about the y axis.
+    """
+    rotations = np.zeros((len(angles), 3, 3))
+    rotations[:, 0, 0] = rotations[:, 2, 2] = np.cos(angles)
+    rotations[:, 0, 2] = np.sin(angles)
+    rotations[:, 2, 0] = -np.sin(angles)
+    rotations[:, 1, 1] = 1
+    return rotations
+
+
+def drive(count: int, seed: int = 0) -> np.array:
+    """
+    Ground truth of a car driving 1 m per frame with a random smooth heading.
+    """
+    heading = np.cumsum(np.random.default_rng(seed).normal(0, 0.02, count))
+    poses = np.tile(np.eye(4), (count, 1, 1))
+    poses[:, :3, :3] = yaw(heading)
+    poses[:, :3, 3] = np.cumsum(np.column_stack([np.sin(heading), np.zeros(count), np.cos(heading)]), axis=0)
+    return poses
+
+
+def transformed(poses: np.array, rotation: np.array, translation: np.array, scale: float) -> np.array:
+    """
+    Poses expressed in another world frame: rotation, translation and scale applied to every pose.
+    """
+    result = poses.copy()
+    result[:, :3, :3] = rotation @ poses[:, :3, :3]
+    result[:, :3, 3] = scale * poses[:, :3, 3] @ rotation.T + translation
+    return result
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestEvaluation(unittest.TestCase):
+    """
+    Test class for the trajectory alignment and the ATE / RPE metrics
+    """
+
+    def setUp(self) -> None:
+        self.truth = drive(500)
+        self.rotation = yaw([0.7])[0] @ np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0.0]])
+
+    def test_umeyama(self) -> None:
+        """
+        Test Condition:
+            Input   :-> points and their similarity transform, then a reflection-prone planar set
+            Output  :-> the transform recovered, a proper rotation in both cases
+        """
+        points = np.random.default_rng(1).normal(size=(100, 3))
+        rotation, translation, scale = evaluation.umeyama(points, 2.5 * points @ self.rotation.T + [1, -2, 3], True)
+        np.testing.assert_allclose(rotation, self.rotation, atol=1e-10)
+        np.testing.assert_allclose(translation, [1, -2, 3], atol=1e-10)
+        self.assertAlmostEqual(scale, 2.5)
+        planar = points * [1, 1, 0]
+        rotation, _, scale = evaluation.umeyama(planar, planar, False)
+        np.testing.assert_allclose(rotation, np.eye(3), atol=1e-10)
+        self.assertEqual(scale, 1.0)
+        with self.assertRaises(ValueError):
+            evaluation.umeyama(points[:2], points[:2])
+        log.info(f' umeyama() passed!')
+
+    def test_absolute_trajectory_error(self) -> None:
+        """
+        Test Condition:
+            Input   :-> ground truth in another frame at a third of the scale, then one pose moved by 2 m
+            Output  :-> zero ATE after Sim(3) alignment but not SE(3), the moved pose as the largest error
+        """
+        estimated = transformed(self.truth, self.rotation, np.array([5.0, 1, -3]), 1 / 3)
+        ate = evaluation.absolute_trajectory_error(estimated, self.truth, 'sim3')
+        self.assertLess(ate['translation']['max'], 1e-8)
+        self.assertLess(ate['rotation']['max'], 1e-5)
+        self.assertAlmostEqual(ate['scale'], 3.0)
+        self.assertGreater(evaluation.absolute_trajectory_error(estimated, self.truth, 'se3')['translation']['rmse'], 1)
+        estimated = self.truth.copy()
+        estimated[250, :3, 3] += [2, 0, 0]
+        ate = evaluation.absolute_trajectory_error(estimated, self.truth, 'none')
+        self.assertEqual(int(np.argmax(ate['errors'])), 250)
+        self.assertAlmostEqual(ate['translation']['max'], 2.0)
+        self.assertAlmostEqual(ate['translation']['rmse'], np.sqrt(4 / 500))
+        log.info(f' absolute_trajectory_error() passed!')
+
+    def test_relative_pose_error(self) -> None:
+        """
+        Test Condition:
+            Input   :-> estimate turning 0.001 rad per frame more than the ground truth, in another world frame
+            Output  :-> rotation error of delta x 0.001 rad per pair, distance segments with one pair per start pose
+        """
+        drift = self.truth.copy()
+        drift[:, :3, :3] = drift[:, :3, :3] @ yaw(0.001 * np.arange(500))
+        estimated = transformed(drift, self.rotation, np.array([5.0, 1, -3]), 1.0)
+        rpe = evaluation.relative_pose_error(estimated, self.truth, deltas=(1, 10, 1000))
+        self.assertEqual(rpe[1]['pairs'], 499)
+        self.assertAlmostEqual(rpe[1]['rotation']['mean'], np.degrees(0.001), places=6)
+        self.assertAlmostEqual(rpe[10]['rotation']['median'], np.degrees(0.01), places=6)
+        self.assertEqual(rpe[1000]['pairs'], 0)
+        rpe = evaluation.relative_pose_error(self.truth, self.truth, lengths=(50.0,))
+        self.assertEqual(rpe[50.0]['pairs'], 450)
+        self.assertLess(rpe[50.0]['translation_percent']['max'], 1e-8)
+        rpe = evaluation.relative_pose_error(transformed(self.truth, np.eye(3), np.zeros(3), 0.1), self.truth,
+                                             alignment='sim3')
+        self.assertLess(rpe[10]['translation']['max'], 1e-8)
+        log.info(f' relative_pose_error() passed!')
+
+    def test_evaluate_and_associate(self) -> None:
+        """
+        Test Condition:
+            Input   :-> estimate timestamps 5 ms late with one frame missing from the ground truth
+            Output  :-> the matching pairs only, a JSON serialisable evaluation
+        """
+        times = np.arange(10) * 0.1
+        truth_times = np.delete(times, 4)
+        estimated_index, truth_index = evaluation.associate(times + 0.005, truth_times, 0.01)
+        np.testing.assert_array_equal(estimated_index, [0, 1, 2, 3, 5, 6, 7, 8, 9])
+        np.testing.assert_array_equal(truth_times[truth_index], times[estimated_index])
+        report = evaluation.evaluate(self.truth, self.truth, 'se3', deltas=(1, 5))
+        self.assertEqual(set(report['rpe']), {'1', '5'})
+        json.dumps(report)
+        with self.assertRaises(ValueError):
+            evaluation.absolute_trajectory_error(self.truth[:10], self.truth)
+        with self.assertRaises(ValueError):
+            evaluation.align_trajectory(self.truth, self.truth, 'affine')
+        log.info(f' evaluate() and associate() passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
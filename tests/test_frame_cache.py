@@ -0,0 +1,140 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for frame_cache.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import glob
+import time
+import shutil
+import logging
+import unittest
+import tempfile
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import camera
+from visual_odometry_pkg import frame_cache
+from tests.synthetic_data import synthetic_lut
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = '../test_data/'
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestFrameCache(unittest.TestCase):
+    """
+    Test class for the preprocessed frame cache
+    """
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.files = sorted(glob.glob(test_data + '*.png'))
+        self.cam = camera.Camera()
+        self.cam.LUT = synthetic_lut(960, 1280, k1=-0.1)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_open(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames with a camera LUT, opened twice
+            Output  :-> memory-mapped demosaiced, undistorted frames by index; the second open is a hit
+        """
+        cache = frame_cache.FrameCache(self.root)
+        frames = cache.open(self.files, self.cam)
+        self.assertEqual(len(frames), 8)
+        self.assertIsInstance(frames.frames, np.memmap)
+        expected = cv.remap(cv.cvtColor(cv.imread(self.files[5], 0), cv.COLOR_BAYER_GR2BGR),
+                            *cv.convertMaps(*[self.cam.LUT[:, axis].reshape(960, 1280).astype(np.float32)
+                                              for axis in (0, 1)], cv.CV_16SC2), cv.INTER_LINEAR)
+        np.testing.assert_array_equal(frames[5], expected)
+        self.assertEqual(cache.open(self.files, self.cam).path, frames.path)
+        self.assertEqual(len(cache.entries()), 1)
+        log.info(f' FrameCache.open() passed!')
+
+    def test_open_grayscale(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames without bayer pattern, with and without a camera LUT
+            Output  :-> single channel frames as read, undistorted with the LUT
+        """
+        cache = frame_cache.FrameCache(self.root)
+        frames = cache.open(self.files[:2], bayer_pattern=None)
+        self.assertEqual(frames.frames.shape, (2, 960, 1280))
+        np.testing.assert_array_equal(frames[1], cv.imread(self.files[1], 0))
+        undistorted = cache.open(self.files[:2], self.cam, bayer_pattern=None)
+        self.assertEqual(undistorted.frames.shape, (2, 960, 1280))
+        self.assertEqual(len(cache.entries()), 2)
+        log.info(f' FrameCache.open() grayscale passed!')
+
+    def test_partial_entries(self) -> None:
+        """
+        Test Condition:
+            Input   :-> a build failing on an unreadable frame, then partial entries of a dead and of a live process
+            Output  :-> the failed build leaves nothing, reopening the cache deletes the dead process entry only
+        """
+        broken = os.path.join(self.root, 'broken.png')
+        with open(broken, 'w') as file:
+            file.write('not a frame')
+        cache = frame_cache.FrameCache(os.path.join(self.root, 'cache'))
+        with self.assertRaises(Exception):
+            cache.open(self.files[:2] + [broken])
+        self.assertEqual(os.listdir(cache.cache_dir), [])
+        dead, live = f'{"0" * 40}.999999999.tmp', f'{"1" * 40}.{os.getpid()}.tmp'
+        for name in (dead, live):
+            os.makedirs(os.path.join(cache.cache_dir, name))
+        frame_cache.FrameCache(cache.cache_dir)
+        self.assertEqual(os.listdir(cache.cache_dir), [live])
+        log.info(f' FrameCache partial entries passed!')
+
+    def test_key(self) -> None:
+        """
+        Test Condition:
+            Input   :-> same files with another pattern, another LUT, a subset of the files
+            Output  :-> distinct keys
+        """
+        keys = {frame_cache.FrameCache.key(self.files, self.cam, 'gr'),
+                frame_cache.FrameCache.key(self.files, self.cam, 'bg'),
+                frame_cache.FrameCache.key(self.files, None, 'gr'),
+                frame_cache.FrameCache.key(self.files[:4], self.cam, 'gr')}
+        self.assertEqual(len(keys), 4)
+        log.info(f' FrameCache.key() passed!')
+
+    def test_lru_eviction(self) -> None:
+        """
+        Test Condition:
+            Input   :-> budget of one 2-frame sequence, three sequences opened in turn
+            Output  :-> only the most recent entry is kept
+        """
+        cache = frame_cache.FrameCache(self.root, max_bytes=2 * 960 * 1280 * 3 + 1024)
+        first = cache.open(self.files[:2]).path
+        second = cache.open(self.files[2:4]).path
+        self.assertFalse(os.path.isdir(first))
+        time.sleep(0.01)
+        third = cache.open(self.files[4:6]).path
+        self.assertEqual([entry[0] for entry in cache.entries()], [third])
+        self.assertFalse(os.path.isdir(second))
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+        log.info(f' FrameCache eviction passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for handler.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import glob
+import time
+import shutil
+import asyncio
+import logging
+import unittest
+import tempfile
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import camera
+from visual_odometry_pkg import algorithms
+from visual_odometry_pkg import frame_cache
+from visual_odometry_pkg import data_preprocessor
+from visual_odometry_pkg import handler
+from visual_odometry_pkg import sources
+from visual_odometry_pkg import visualizer
+from visual_odometry_pkg.metrics import default_metrics
+from tests.synthetic_data import synthetic_lut, textured_plane
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = '../test_data/'
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestImplementVO(unittest.TestCase):
+    """
+    Test class for the VO driver
+    """
+
+    def setUp(self) -> None:
+        """
+        Writes a camera model with the test intrinsics and a synthetic LUT of the test frame size
+        """
+        self.root = tempfile.mkdtemp()
+        self.model_dir = os.path.join(self.root, 'model') + os.sep
+        os.makedirs(self.model_dir)
+        shutil.copy(test_data + 'intrinsic_parameters.txt', self.model_dir)
+        synthetic_lut(960, 1280, k1=-0.05).T.tofile(self.model_dir + 'lut.bin')
+        self.vo = handler.ImplementVO(registry=camera.CameraRegistry())
+        self.vo.import_data(self.model_dir, test_data)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_import_data_shares_model(self) -> None:
+        """
+        Test Condition:
+            Input   :-> a second pipeline importing the same model with the same registry
+            Output  :-> the same camera object, read once
+        """
+        other = handler.ImplementVO(registry=self.vo.registry)
+        other.import_data(self.model_dir, test_data)
+        self.assertIs(other.cam, self.vo.cam)
+        self.assertEqual(self.vo.registry.loads, 1)
+        log.info(f' import_data() shared model passed!')
+
+    def test_run(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames directory, no deadline, window of 3 poses
+            Output  :-> one valid pose per frame, the window bounded, no drops
+        """
+        results = list(self.vo.run(window=3))
+        self.assertEqual([result['frame'] for result in results], list(range(8)))
+        for result in results:
+            np.testing.assert_allclose(result['pose'][:3, :3] @ result['pose'][:3, :3].T, np.eye(3), atol=1e-6)
+        self.assertGreater(results[-1]['tracks'], 0)
+        self.assertLessEqual(len(self.vo.poses), 3)
+        self.assertEqual(self.vo.drops, [])
+        self.assertEqual(self.vo.stats['processed'], 8)
+        log.info(f' run() passed!')
+
+    def test_run_bundle_adjustment(self) -> None:
+        """
+        Test Condition:
+            Input   :-> keyframe on every frame, bundle adjuster
+            Output  :-> one adjusted window per keyframe from the third one, with timings and iterations reported
+        """
+        adjuster = algorithms.BundleAdjuster(self.vo.cam, max_iterations=5)
+        keyframes = algorithms.KeyframeManager(window=4, min_parallax=0.0, min_track_ratio=1.1)
+        results = list(self.vo.run(keyframes=keyframes, adjuster=adjuster))
+        self.assertTrue(all(result['keyframe'] for result in results))
+        self.assertEqual(len(adjuster.reports), 6)
+        self.assertTrue(all(report['keyframes'] <= 4 for report in adjuster.reports))
+        self.assertIn('iterations', adjuster.reports[-1])
+        log.info(f' run() with bundle adjustment passed!')
+
+    def test_run_frame_cache(self) -> None:
+        """
+        Test Condition:
+            Input   :-> frame cache set, run twice
+            Output  :-> one cache entry built, same poses from the cached frames
+        """
+        self.vo.frame_cache = frame_cache.FrameCache(os.path.join(self.root, 'frames'))
+        first = [result['pose'].copy() for result in
+                 self.vo.run(estimator=algorithms.MotionEstimator(self.vo.cam, seed=0))]
+        second = [result['pose'].copy() for result in
+                  self.vo.run(estimator=algorithms.MotionEstimator(self.vo.cam, seed=0))]
+        self.assertEqual(len(self.vo.frame_cache.entries()), 1)
+        np.testing.assert_allclose(first, second)
+        log.info(f' run() with frame cache passed!')
+
+    def test_run_deadline(self) -> None:
+        """
+        Test Condition:
+            Input   :-> deadline far below the frame processing time
+            Output  :-> frames dropped and recorded, processed + dropped covers the sequence
+        """
+        results = list(self.vo.run(deadline=1e-4))
+        self.assertGreater(len(self.vo.drops), 0)
+        self.assertEqual(len(results) + len(self.vo.drops), 8)
+        self.assertFalse(set(self.vo.drops) & {result['frame'] for result in results})
+        log.info(f' run() deadline drops passed!')
+
+    def test_run_deadline_before_preprocessing(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames 3 times over, deadline far below the frame processing time, metrics enabled
+            Output  :-> drops decided after the decode, fewer frames demosaiced and undistorted than decoded
+        """
+        files = sorted(glob.glob(test_data + '*.png')) * 3
+        enabled = default_metrics.enabled
+        default_metrics.reset()
+        default_metrics.enable()
+        try:
+            results = list(self.vo.run(files, deadline=1e-4))
+            timers = default_metrics.snapshot()['timers']
+        finally:
+            default_metrics.enabled = enabled
+            default_metrics.reset()
+        self.assertEqual(len(results) + len(self.vo.drops), len(files))
+        self.assertGreaterEqual(timers['decode']['count'], len(files))
+        self.assertLess(timers['demosaic']['count'], len(files) - 8)
+        self.assertEqual(timers['demosaic']['count'], timers['undistort']['count'])
+        log.info(f' run() deadline drops before preprocessing passed!')
+
+    def test_run_motion_gate(self) -> None:
+        """
+        Test Condition:
+            Input   :-> motion gate skipping every frame it may, at most 2 in a row
+            Output  :-> every third frame processed, the others recorded as skipped and in the skip rate
+        """
+        results = list(self.vo.run(gate=data_preprocessor.MotionGate(threshold=256, max_skip=2)))
+        self.assertEqual([result['frame'] for result in results], [0, 3, 6])
+        self.assertEqual(self.vo.skips, [1, 2, 4, 5, 7])
+        self.assertEqual(self.vo.stats['skipped'], 5)
+        self.assertAlmostEqual(self.vo.stats['skip_rate'], 5 / 8)
+        log.info(f' run() motion gate passed!')
+
+    def test_run_async(self) -> None:
+        """
+        Test Condition:
+            Input   :-> DirectorySource of the test frames at 10 fps, consumed while another coroutine ticks
+            Output  :-> the poses of run() with their timestamps, the event loop kept running meanwhile
+        """
+        expected = [result['pose'].copy() for result in
+                    self.vo.run(estimator=algorithms.MotionEstimator(self.vo.cam, seed=0))]
+
+        async def consume() -> tuple:
+            ticks = []
+
+            async def ticker() -> None:
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.001)
+
+            task = asyncio.create_task(ticker())
+            results = [dict(result, pose=result['pose'].copy()) async for result in self.vo.run_async(
+                sources.DirectorySource(test_data, fps=10), estimator=algorithms.MotionEstimator(self.vo.cam, seed=0))]
+            task.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(consume())
+        self.assertEqual([result['frame'] for result in results], list(range(8)))
+        np.testing.assert_allclose([result['timestamp'] for result in results], np.arange(8) / 10)
+        np.testing.assert_allclose([result['pose'] for result in results], expected)
+        self.assertGreater(len(ticks), 8)
+        self.assertEqual(self.vo.stats['processed'], 8)
+        log.info(f' run_async() passed!')
+
+    def test_run_visualize(self) -> None:
+        """
+        Test Condition:
+            Input   :-> started headless visualizer rendering every other frame
+            Output  :-> every pose recorded in its path, PNG snapshots written
+        """
+        output = os.path.join(self.root, 'view')
+        self.vo.visualize = visualizer.Visualize(output, size=120, every=2).start()
+        list(self.vo.run())
+        self.vo.visualize.close()
+        self.assertEqual(self.vo.visualize.path.total, 8)
+        self.assertGreater(len(os.listdir(output)), 0)
+        log.info(f' run() with the visualizer passed!')
+
+    def test_run_video(self) -> None:
+        """
+        Test Condition:
+            Input   :-> video file of the test frames
+            Output  :-> one result per video frame
+        """
+        self.vo.data_preprocessor.frames_to_video(test_data, self.root + os.sep, 'DIVX', 1)
+        results = list(self.vo.run(os.path.join(self.root, 'out.avi')))
+        self.assertEqual(len(results), 8)
+        log.info(f' run() video source passed!')
+
+    def test_run_stereo(self) -> None:
+        """
+        Test Condition:
+            Input   :-> left / right models 0.5 m apart and png pairs of a textured plane, the rig moving 0.2 m forward
+                        per frame, then one right frame missing
+            Output  :-> metric poses, every pair processed, mismatched streams refused
+        """
+        directories = {}
+        for side, offset in (('left', 0.0), ('right', 0.5)):
+            model_dir = os.path.join(self.root, f'{side}_model') + os.sep
+            os.makedirs(model_dir)
+            intrinsics = np.zeros((5, 4))
+            intrinsics[0] = 400.0, 400.0, 319.5, 239.5
+            intrinsics[1:] = [[0, 0, 1, 0], [1, 0, 0, offset], [0, 1, 0, 0], [0, 0, 0, 1]]
+            np.savetxt(model_dir + 'intrinsic_parameters.txt', intrinsics)
+            synthetic_lut(480, 640, fx=400.0, fy=400.0).T.tofile(model_dir + 'lut.bin')
+            frames_dir = os.path.join(self.root, side)
+            os.makedirs(frames_dir)
+            for index in range(4):
+                cv.imwrite(os.path.join(frames_dir, f'{index:03d}.png'),
+                           textured_plane((480, 640), (offset, 0, 0.2 * index)))
+            directories[side] = (model_dir, frames_dir)
+        self.vo.import_data(*directories['left'])
+        results = list(self.vo.run_stereo(directories['right'][0], directories['right'][1], bayer_pattern=None))
+        self.assertEqual([result['frame'] for result in results], list(range(4)))
+        np.testing.assert_allclose([result['pose'][:3, 3] for result in results],
+                                   [[0, 0, 0.2 * index] for index in range(4)], atol=0.02)
+        self.assertEqual(self.vo.stats['processed'], 4)
+        self.assertEqual(len(self.vo.poses), 4)
+        right_files = sorted(os.path.join(directories['right'][1], name)
+                             for name in os.listdir(directories['right'][1]))
+        with self.assertRaises(ValueError):
+            list(self.vo.run_stereo(directories['right'][0], right_files[:-1], bayer_pattern=None))
+        log.info(f' run_stereo() passed!')
+
+
+class TestBatchRunner(unittest.TestCase):
+    """
+    Test class for the multi-process, checkpointed batch runner
+    """
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.model_dir = os.path.join(self.root, 'model') + os.sep
+        os.makedirs(self.model_dir)
+        shutil.copy(test_data + 'intrinsic_parameters.txt', self.model_dir)
+        synthetic_lut(960, 1280, k1=-0.05).T.tofile(self.model_dir + 'lut.bin')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_chunks(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 10 frames, chunks of 4 overlapping by 2
+            Output  :-> ranges covering every frame, consecutive ranges sharing 2 frames
+        """
+        runner = handler.BatchRunner(self.model_dir, chunk_size=4, overlap=2)
+        self.assertEqual(runner.chunks(10), [(0, 4), (2, 6), (4, 8), (6, 10)])
+        self.assertEqual(runner.chunks(3), [(0, 3)])
+        log.info(f' BatchRunner.chunks() passed!')
+
+    def test_stitch_chunks(self) -> None:
+        """
+        Test Condition:
+            Input   :-> straight trajectory split in two chunks, the second one at half scale
+            Output  :-> the stitched trajectory recovers the original
+        """
+        truth = np.tile(np.eye(4), (6, 1, 1))
+        truth[:, 0, 3] = np.arange(6)
+        second = np.tile(np.eye(4), (4, 1, 1))
+        second[:, 0, 3] = np.arange(4) * 0.5
+        poses = handler.stitch_chunks([(0, 4), (2, 6)], [truth[:4], second], 6)
+        np.testing.assert_allclose(poses, truth)
+        log.info(f' stitch_chunks() passed!')
+
+    def test_run_and_resume(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test frames in chunks of 5 overlapping by 2 on 2 processes, then the same batch again
+            Output  :-> a pose per frame, the second run resumes both chunks from the checkpoints
+        """
+        runner = handler.BatchRunner(self.model_dir, chunk_size=5, overlap=2, workers=2,
+                                     checkpoint_dir=os.path.join(self.root, 'checkpoints'),
+                                     cache_dir=os.path.join(self.root, 'cache'))
+        first = runner.run(test_data)
+        self.assertEqual(first['poses'].shape, (8, 4, 4))
+        self.assertEqual(first['resumed'], 0)
+        second = runner.run(test_data)
+        self.assertEqual(second['resumed'], 2)
+        np.testing.assert_allclose(second['poses'], first['poses'])
+        log.info(f' BatchRunner.run() passed!')
+
+    def test_resume_configuration(self) -> None:
+        """
+        Test Condition:
+            Input   :-> checkpointed batch run again with other run options, another chunk geometry, a changed model
+            Output  :-> no checkpoint of another configuration resumed, the unchanged batch resumed
+        """
+        def batch(**options) -> handler.BatchRunner:
+            config = dict(chunk_size=5, overlap=2, workers=1, checkpoint_dir=os.path.join(self.root, 'checkpoints'))
+            config.update(options)
+            return handler.BatchRunner(self.model_dir, **config)
+
+        files = sorted(glob.glob(test_data + '*.png'))[:5]
+        self.assertEqual(batch().run(files)['resumed'], 0)
+        self.assertEqual(batch(run_options={'window': 3}).run(files)['resumed'], 0)
+        self.assertEqual(batch(chunk_size=6, overlap=3).run(files)['resumed'], 0)
+        self.assertEqual(batch().run(files)['resumed'], 1)
+        with open(self.model_dir + 'intrinsic_parameters.txt', 'a') as file:
+            file.write('\n')
+        self.assertEqual(batch().run(files)['resumed'], 0)
+        log.info(f' BatchRunner checkpoint configuration passed!')
+
+    def test_run_empty(self) -> None:
+        """
+        Test Condition:
+            Input   :-> empty frames directory, then an empty chunk given to the worker function
+            Output  :-> empty (0, 4, 4) poses and no chunk run
+        """
+        empty = os.path.join(self.root, 'empty')
+        os.makedirs(empty)
+        result = handler.BatchRunner(self.model_dir, chunk_size=5, overlap=2, workers=1).run(empty)
+        self.assertEqual(result['poses'].shape, (0, 4, 4))
+        self.assertEqual(result['chunks'], 0)
+        self.assertEqual(handler.run_chunk(self.model_dir, []).shape, (0, 4, 4))
+        log.info(f' BatchRunner.run() empty source passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
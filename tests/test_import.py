@@ -0,0 +1,131 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for the package import cost and side effects
+# Description   :-> Imports run in a fresh interpreter from an empty folder, their times are logged, not asserted
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import sys
+import json
+import logging
+import unittest
+import tempfile
+import subprocess
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+probe = '''
+import sys, json, time, logging
+start = time.perf_counter()
+import numpy
+numpy_seconds = time.perf_counter() - start
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+handlers = [type(handler).__name__ for name in list(logging.root.manager.loggerDict) + ['']
+            for handler in getattr(logging.getLogger(name), 'handlers', [])]
+print(json.dumps({{'numpy': numpy_seconds, 'seconds': seconds, 'handlers': handlers,
+                  'modules': [name for name in ('cv2', 'scipy') if name in sys.modules]}}))
+'''
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def import_report(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter started in an empty folder.
+
+    Returns: dict
+        numpy and module import seconds, logging handlers installed, heavy modules loaded and files created
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        environment = dict(os.environ, PYTHONPATH=package_root)
+        environment.pop('VO_METRICS', None)
+        output = subprocess.run([sys.executable, '-c', probe.format(module=module)], cwd=folder, env=environment,
+                                capture_output=True, text=True, check=True)
+        report = json.loads(output.stdout)
+        report['files'] = os.listdir(folder)
+        report['stderr'] = output.stderr
+    return report
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestImport(unittest.TestCase):
+    """
+    Test class for a fast, side-effect-free package import
+    """
+
+    def test_package(self) -> None:
+        """
+        Test Condition:
+            Input   :-> import visual_odometry_pkg
+            Output  :-> no OpenCV or scipy, no handlers but the NullHandler, nothing written; the import time is logged
+        """
+        report = import_report('visual_odometry_pkg')
+        self.assertEqual(report['modules'], [])
+        self.assertEqual(report['handlers'], ['NullHandler'])
+        self.assertEqual(report['files'], [])
+        log.info(f' package import took {report["seconds"] * 1e3:.1f} ms')
+
+    def test_camera(self) -> None:
+        """
+        Test Condition:
+            Input   :-> import the camera, frame cache, pose store, evaluation and manifest modules from a folder
+                        without ./logs
+            Output  :-> the import succeeds silently without OpenCV or scipy; the time on top of numpy is logged
+        """
+        for module in ['visual_odometry_pkg.camera', 'visual_odometry_pkg.frame_cache',
+                       'visual_odometry_pkg.pose_store', 'visual_odometry_pkg.evaluation',
+                       'visual_odometry_pkg.manifest']:
+            report = import_report(module)
+            self.assertEqual(report['modules'], [], module)
+            self.assertEqual(report['files'], [], module)
+            self.assertEqual(report['stderr'], '', module)
+            log.info(f' {module} import took {report["seconds"] * 1e3:.1f} ms')
+
+    def test_data_preprocessor(self) -> None:
+        """
+        Test Condition:
+            Input   :-> import visual_odometry_pkg.data_preprocessor from a folder without ./logs
+            Output  :-> the import succeeds silently without scipy
+        """
+        report = import_report('visual_odometry_pkg.data_preprocessor')
+        self.assertNotIn('scipy', report['modules'])
+        self.assertEqual(report['files'], [])
+        self.assertEqual(report['stderr'], '')
+        log.info(f' data_preprocessor import took {report["seconds"] * 1e3:.1f} ms')
+
+    def test_lazy_names(self) -> None:
+        """
+        Test Condition:
+            Input   :-> package level names
+            Output  :-> resolved to the classes of their modules, unknown names raise AttributeError
+        """
+        import visual_odometry_pkg
+        from visual_odometry_pkg import camera
+        self.assertIs(visual_odometry_pkg.Camera, camera.Camera)
+        self.assertIn('ImplementVO', dir(visual_odometry_pkg))
+        with self.assertRaises(AttributeError):
+            getattr(visual_odometry_pkg, 'missing')
+        log.info(f' lazy package names passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
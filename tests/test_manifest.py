@@ -0,0 +1,164 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for manifest.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import zlib
+import shutil
+import asyncio
+import logging
+import unittest
+import tempfile
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import manifest
+from visual_odometry_pkg import sources
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestFrameManifest(unittest.TestCase):
+    """
+    Test class for the frame manifest of a sequence directory
+    """
+
+    def setUp(self) -> None:
+        """
+        Writes frames 1, 2, 3, 10 and 11, then truncates frame 3, flips a byte of frame 11 and adds a text file
+        named like a frame
+        """
+        self.root = tempfile.mkdtemp()
+        self.image = (np.random.default_rng(0).random((48, 64)) * 255).astype(np.uint8)
+        for number in (1, 2, 3, 10, 11):
+            cv.imwrite(self.path(f'{number}.png'), self.image)
+        with open(self.path('3.png'), 'r+b') as file:
+            file.truncate(os.path.getsize(self.path('3.png')) // 2)
+        with open(self.path('11.png'), 'r+b') as file:
+            file.seek(100)
+            value = file.read(1)[0]
+            file.seek(100)
+            file.write(bytes([value ^ 0xff]))
+        with open(self.path('notes.png'), 'w') as file:
+            file.write('not a frame')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def test_build(self) -> None:
+        """
+        Test Condition:
+            Input   :-> the sequence directory scanned with 2 threads
+            Output  :-> numeric order, shapes, bayer patterns and checksums recorded, the damaged files flagged
+        """
+        frames = manifest.FrameManifest.build(self.root, workers=2)
+        self.assertEqual(frames.names, ['1.png', '2.png', '3.png', '10.png', '11.png', 'notes.png'])
+        np.testing.assert_array_equal(frames.records['number'], [1, 2, 3, 10, 11, -1])
+        self.assertEqual([manifest.STATUS[status] for status in frames.records['status']],
+                         ['ok', 'ok', 'truncated', 'ok', 'bad_crc', 'not_png'])
+        good = frames.records[frames.good]
+        np.testing.assert_array_equal(good['height'], 48)
+        np.testing.assert_array_equal(good['width'], 64)
+        np.testing.assert_array_equal(good['channels'], 1)
+        np.testing.assert_array_equal(good['bayer'], manifest.BAYER_PATTERNS.index('gr'))
+        with open(self.path('10.png'), 'rb') as file:
+            self.assertEqual(frames.records['checksum'][3], zlib.crc32(file.read()))
+        self.assertEqual(frames.files(), [self.path(name) for name in ('1.png', '2.png', '10.png')])
+        self.assertEqual(len(frames.files(skip_bad=False)), 6)
+        self.assertEqual(frames.stats()['ok'], 3)
+        with self.assertRaises(ValueError):
+            manifest.FrameManifest.build(self.root, bayer_pattern='xy')
+        log.info(f' FrameManifest.build() passed!')
+
+    def test_open(self) -> None:
+        """
+        Test Condition:
+            Input   :-> manifest opened twice, then a frame added to the directory
+            Output  :-> built and saved once then loaded as is, rebuilt on the change reading the new frame only,
+                        list_frames() following the manifest and listing the directory while it is stale
+        """
+        frames = manifest.FrameManifest.open(self.root)
+        self.assertTrue(os.path.isfile(self.path(manifest.MANIFEST_NAME)))
+        loaded = manifest.FrameManifest.open(self.root)
+        self.assertTrue(loaded.is_fresh())
+        self.assertEqual(loaded.names, frames.names)
+        np.testing.assert_array_equal(loaded.records, frames.records)
+        self.assertEqual(manifest.list_frames(self.root), frames.files())
+
+        cv.imwrite(self.path('20.png'), self.image)
+        self.assertFalse(manifest.FrameManifest.load(self.path(manifest.MANIFEST_NAME)).is_fresh())
+        self.assertEqual(len(manifest.list_frames(self.root)), 7)
+        inspected = []
+        inspect_frame = manifest.inspect_frame
+        manifest.inspect_frame = lambda path, decode=False: inspected.append(path) or inspect_frame(path, decode)
+        try:
+            rebuilt = manifest.FrameManifest.open(self.root)
+        finally:
+            manifest.inspect_frame = inspect_frame
+        self.assertEqual(inspected, [self.path('20.png')])
+        self.assertEqual(rebuilt.names[-2], '20.png')
+        self.assertEqual(manifest.list_frames(self.root), rebuilt.files())
+        log.info(f' FrameManifest.open() passed!')
+
+    def test_time_order(self) -> None:
+        """
+        Test Condition:
+            Input   :-> frames named by their capture time in nanoseconds, of different name lengths
+            Output  :-> time order, seek and time ranges on the timestamps, seek by frame number
+        """
+        times = [9_500_000_000, 10_000_000_000, 10_050_000_000, 99_000_000]
+        directory = self.path('timed')
+        os.makedirs(directory)
+        for value in times:
+            cv.imwrite(os.path.join(directory, f'{value}.png'), self.image)
+        frames = manifest.FrameManifest.build(directory, time_scale=1e-9)
+        np.testing.assert_allclose(frames.records['timestamp'], [0.099, 9.5, 10.0, 10.05])
+        self.assertEqual(frames.seek(timestamp=9.6), 2)
+        self.assertEqual(frames.seek(timestamp=11), 4)
+        self.assertEqual(frames.time_range(9.5, 10.01), (1, 3))
+        self.assertEqual(frames.seek(frame=10_000_000_000), 2)
+        with self.assertRaises(KeyError):
+            frames.seek(frame=7)
+        with self.assertRaises(ValueError):
+            frames.seek()
+        np.testing.assert_allclose(manifest.FrameManifest.build(directory, fps=20).records['timestamp'],
+                                   np.arange(4) / 20)
+        log.info(f' FrameManifest time order and seek passed!')
+
+    def test_directory_source(self) -> None:
+        """
+        Test Condition:
+            Input   :-> DirectorySource of a manifest at 10 fps
+            Output  :-> the good frames only, with the manifest timestamps
+        """
+        frames = manifest.FrameManifest.build(self.root, fps=10)
+
+        async def consume() -> list:
+            return [timed async for timed in sources.DirectorySource(frames, bayer_pattern=None)]
+
+        timed = asyncio.run(consume())
+        self.assertEqual(len(timed), 3)
+        np.testing.assert_allclose([frame.timestamp for frame in timed], [0.0, 0.1, 0.3])
+        np.testing.assert_array_equal(timed[2].image, self.image)
+        log.info(f' DirectorySource of a manifest passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
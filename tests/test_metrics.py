@@ -0,0 +1,129 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for metrics.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import json
+import glob
+import logging
+import unittest
+import cv2 as cv
+from visual_odometry_pkg import metrics
+from visual_odometry_pkg import data_preprocessor as dp
+from tests.synthetic_data import synthetic_lut
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = '../test_data/'
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestMetrics(unittest.TestCase):
+    """
+    Test class for the stage timers, counters and their exports
+    """
+
+    def test_disabled(self) -> None:
+        """
+        Test Condition:
+            Input   :-> disabled metrics, timed block, observation and increment
+            Output  :-> nothing recorded
+        """
+        registry = metrics.Metrics(enabled=False)
+        with registry.timer('decode'):
+            pass
+        registry.observe('decode', 0.1)
+        registry.increment('frames')
+        registry.timed('pose')(lambda: None)()
+        self.assertEqual(registry.snapshot(), {'timers': {}, 'counters': {}})
+        self.assertEqual(registry.to_prometheus(), '')
+        log.info(f' Metrics disabled passed!')
+
+    def test_snapshot(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 100 observations of 1 .. 100 ms, a decorated call and a counter
+            Output  :-> count, mean, max, quantiles and bucket counts in the JSON snapshot
+        """
+        registry = metrics.Metrics(enabled=True)
+        for milliseconds in range(1, 101):
+            registry.observe('undistort', milliseconds / 1e3)
+        registry.increment('frames', 3)
+        self.assertEqual(registry.timed('pose')(lambda value: value * 2)(21), 42)
+        snapshot = json.loads(registry.to_json())
+        undistort = snapshot['timers']['undistort']
+        self.assertEqual(undistort['count'], 100)
+        self.assertAlmostEqual(undistort['mean_ms'], 50.5)
+        self.assertAlmostEqual(undistort['max_ms'], 100.0)
+        self.assertAlmostEqual(undistort['p50_ms'], 51.0)
+        self.assertAlmostEqual(undistort['p99_ms'], 100.0)
+        self.assertEqual(undistort['buckets']['0.001'], 1)
+        self.assertEqual(sum(undistort['buckets'].values()), 100)
+        self.assertEqual(snapshot['timers']['pose']['count'], 1)
+        self.assertEqual(snapshot['counters'], {'frames': 3})
+        registry.reset()
+        self.assertEqual(registry.snapshot()['timers'], {})
+        log.info(f' Metrics snapshot passed!')
+
+    def test_prometheus(self) -> None:
+        """
+        Test Condition:
+            Input   :-> two observations and a counter
+            Output  :-> cumulative histogram buckets, sum, count and a _total counter in the text format
+        """
+        registry = metrics.Metrics(enabled=True)
+        registry.observe('decode', 0.002)
+        registry.observe('decode', 0.2)
+        registry.increment('frames_dropped')
+        lines = registry.to_prometheus().splitlines()
+        self.assertIn('# TYPE visual_odometry_decode_seconds histogram', lines)
+        self.assertIn('visual_odometry_decode_seconds_bucket{le="0.0025"} 1', lines)
+        self.assertIn('visual_odometry_decode_seconds_bucket{le="0.25"} 2', lines)
+        self.assertIn('visual_odometry_decode_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn('visual_odometry_decode_seconds_count 2', lines)
+        self.assertIn('visual_odometry_frames_dropped_total 1', lines)
+        log.info(f' Metrics prometheus export passed!')
+
+    def test_pipeline_stages(self) -> None:
+        """
+        Test Condition:
+            Input   :-> default metrics enabled around a decode -> demosaic -> undistort pipeline run
+            Output  :-> one decode, demosaic and undistort observation per frame
+        """
+        files = sorted(glob.glob(test_data + '*.png'))
+        shape = cv.imread(files[0], 0).shape
+        undistorter = dp.Undistorter(synthetic_lut(*shape, k1=-0.1), shape)
+        registry = metrics.default_metrics
+        enabled = registry.enabled
+        registry.reset()
+        registry.enable()
+        try:
+            for _ in dp.PreprocessPipeline.from_config(undistorter, 'gr').run(files):
+                pass
+            timers = registry.snapshot()['timers']
+        finally:
+            registry.enabled = enabled
+            registry.reset()
+        for stage in ['decode', 'demosaic', 'undistort']:
+            self.assertEqual(timers[stage]['count'], len(files))
+        log.info(f' Metrics pipeline stages passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for pose_store.py module
+# Description   :->
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import shutil
+import logging
+import unittest
+import tempfile
+import numpy as np
+from visual_odometry_pkg import pose_store
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def random_poses(count: int, seed: int = 0) -> np.array:
+    """
+    Random (count, 4, 4) rigid poses.
+    """
+    rng = np.random.default_rng(seed)
+    poses = np.tile(np.eye(4), (count, 1, 1))
+    for pose in poses:
+        rotation, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+        pose[:3, :3] = rotation * np.sign(np.linalg.det(rotation))
+        pose[:3, 3] = rng.normal(0, 10, 3)
+    return poses
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestPoseStore(unittest.TestCase):
+    """
+    Test class for the binary pose and track logs
+    """
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'poses.bin')
+        self.poses = random_poses(50)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 50 poses with covariances and inlier counts, staged 16 at a time
+            Output  :-> the same poses, covariances, frames, times and counts read back memory-mapped
+        """
+        covariance = np.diag(np.arange(1.0, 7.0))
+        covariance[0, 5] = covariance[5, 0] = 0.5
+        with pose_store.PoseWriter(self.path, flush_every=16) as writer:
+            for frame, pose in enumerate(self.poses):
+                writer.append(0.1 * frame, frame, pose, covariance, inliers=frame + 100)
+            self.assertEqual(writer.count, 50)
+        self.assertEqual(os.path.getsize(self.path), pose_store.HEADER_SIZE + 50 * pose_store.POSE_DTYPE.itemsize)
+        store = pose_store.PoseStore(self.path)
+        self.assertIsInstance(store.records, np.memmap)
+        self.assertEqual(len(store), 50)
+        np.testing.assert_allclose(store.poses(), self.poses, atol=1e-12)
+        np.testing.assert_allclose(store.covariances()[7], covariance, atol=1e-6)
+        np.testing.assert_array_equal(store.frames, np.arange(50))
+        np.testing.assert_allclose(store.timestamps, 0.1 * np.arange(50))
+        np.testing.assert_array_equal(store[10:12]['inliers'], [110, 111])
+        log.info(f' PoseWriter / PoseStore round trip passed!')
+
+    def test_range_queries(self) -> None:
+        """
+        Test Condition:
+            Input   :-> log written in order, then a log with its frames out of order
+            Output  :-> the records of the frame and time ranges, binary searched when in order
+        """
+        with pose_store.PoseWriter(self.path) as writer:
+            for frame, pose in enumerate(self.poses):
+                writer.append(100.0 + 0.5 * frame, frame, pose)
+        store = pose_store.PoseStore(self.path)
+        self.assertEqual(store.flags, 0)
+        np.testing.assert_array_equal(store.frame_range(10, 15)['frame'], np.arange(10, 15))
+        np.testing.assert_array_equal(store.time_range(101.0, 103.0)['frame'], [2, 3, 4, 5])
+        np.testing.assert_allclose(store.poses(store.frame_range(49, 100)), self.poses[49:], atol=1e-12)
+        self.assertEqual(len(store.time_range(0.0, 50.0)), 0)
+        path = os.path.join(self.root, 'shuffled.bin')
+        order = np.random.default_rng(1).permutation(50)
+        with pose_store.PoseWriter(path, flush_every=8) as writer:
+            for frame in order:
+                writer.append(float(frame), int(frame), self.poses[frame])
+        store = pose_store.PoseStore(path)
+        self.assertEqual(store.flags, 3)
+        records = store.frame_range(10, 15)
+        self.assertEqual(sorted(records['frame']), list(range(10, 15)))
+        np.testing.assert_allclose(store.poses(records), self.poses[records['frame']], atol=1e-12)
+        log.info(f' PoseStore range queries passed!')
+
+    def test_append_and_recover(self) -> None:
+        """
+        Test Condition:
+            Input   :-> log reopened to append, a partial record left at its end, a live reader refreshed
+            Output  :-> partial record ignored by the reader and cut off by the writer, appends in order
+        """
+        with pose_store.PoseWriter(self.path) as writer:
+            for frame in range(20):
+                writer.append(float(frame), frame, self.poses[frame])
+        with open(self.path, 'ab') as file:
+            file.write(b'\x01' * 10)
+        store = pose_store.PoseStore(self.path)
+        self.assertEqual(len(store), 20)
+        with pose_store.PoseWriter(self.path, flush_every=4) as writer:
+            self.assertEqual(writer.count, 20)
+            for frame in range(20, 30):
+                writer.append(float(frame), frame, self.poses[frame])
+            self.assertEqual(len(store.refresh()), 28)
+            writer.flush()
+            self.assertEqual(len(store.refresh()), 30)
+        self.assertEqual(store.flags, 0)
+        np.testing.assert_allclose(store.poses(), self.poses[:30], atol=1e-12)
+        with self.assertRaises(ValueError):
+            pose_store.TrackStore(self.path)
+        log.info(f' PoseWriter append and recovery passed!')
+
+    def test_results(self) -> None:
+        """
+        Test Condition:
+            Input   :-> ImplementVO style results without timestamps
+            Output  :-> NaN times, the time field flagged out of order, frame queries still binary searched
+        """
+        with pose_store.PoseWriter(self.path) as writer:
+            for frame in range(5):
+                writer.append_result({'frame': frame, 'pose': self.poses[frame], 'inliers': 7})
+        store = pose_store.PoseStore(self.path)
+        self.assertTrue(np.isnan(store.timestamps).all())
+        self.assertEqual(store.flags, 2)
+        np.testing.assert_array_equal(store.frame_range(1, 3)['inliers'], [7, 7])
+        log.info(f' PoseWriter.append_result() passed!')
+
+    def test_tracks(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 10 frames observing tracks frame // 2 ... frame // 2 + 4
+            Output  :-> per-frame observations and each track's frames and points in order
+        """
+        path = os.path.join(self.root, 'tracks.bin')
+        with pose_store.TrackWriter(path) as writer:
+            for frame in range(10):
+                ids = np.arange(frame // 2, frame // 2 + 5)
+                writer.append(frame, ids, np.column_stack([ids * 10.0, np.full(5, frame)]))
+        store = pose_store.TrackStore(path)
+        self.assertEqual(len(store), 50)
+        np.testing.assert_array_equal(store.frame_range(3, 4)['track'], np.arange(1, 6))
+        frames, points = store.track(4)
+        np.testing.assert_array_equal(frames, np.arange(0, 10))
+        np.testing.assert_array_equal(points[:, 1], np.arange(0, 10))
+        frames, _ = store.track(0)
+        np.testing.assert_array_equal(frames, [0, 1])
+        log.info(f' TrackWriter / TrackStore passed!')
+
+    def test_track_buffering(self) -> None:
+        """
+        Test Condition:
+            Input   :-> track log staging 16 records, frames of 5 records then a frame of 40
+            Output  :-> records written 16 at a time, nothing visible before the stage fills, the large frame spilled
+        """
+        path = os.path.join(self.root, 'tracks.bin')
+        writes = []
+        with pose_store.TrackWriter(path, flush_every=16) as writer:
+            write = writer._write
+            writer._write = lambda records: writes.append(len(records)) or write(records)
+            store = pose_store.TrackStore(path)
+            for frame in range(3):
+                writer.append(frame, np.arange(5), np.zeros((5, 2)))
+            self.assertEqual((writes, len(store.refresh())), ([], 0))
+            writer.append(3, np.arange(5), np.zeros((5, 2)))
+            self.assertEqual(writes, [16])
+            writer.append(4, np.arange(40), np.zeros((40, 2)))
+            self.assertEqual(writes, [16, 16, 16])
+            self.assertEqual(writer.count, 60)
+        self.assertEqual(writes, [16, 16, 16, 12])
+        store = pose_store.TrackStore(path)
+        np.testing.assert_array_equal(store.frame_range(4, 5)['track'], np.arange(40))
+        log.info(f' TrackWriter buffering passed!')
+
+    def test_quaternions(self) -> None:
+        """
+        Test Condition:
+            Input   :-> random rotations and the half turns about each axis
+            Output  :-> unit quaternions with w >= 0 converting back to the same rotations
+        """
+        rotations = np.concatenate([self.poses[:, :3, :3], [np.diag([1.0, -1, -1]), np.diag([-1.0, 1, -1]),
+                                                             np.diag([-1.0, -1, 1]), np.eye(3)]])
+        quaternions = pose_store.rotation_to_quaternion(rotations)
+        np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1)
+        self.assertTrue(np.all(quaternions[:, 0] >= 0))
+        np.testing.assert_allclose(pose_store.quaternion_to_rotation(quaternions), rotations, atol=1e-12)
+        np.testing.assert_allclose(pose_store.quaternion_to_rotation(quaternions[0]), rotations[0], atol=1e-12)
+        log.info(f' quaternion conversions passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
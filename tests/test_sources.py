@@ -0,0 +1,213 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for sources.py module
+# Description   :-> The stream sources are fed by tools/frame_producer.py and by in-process producers
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import io
+import os
+import sys
+import glob
+import shutil
+import asyncio
+import logging
+import unittest
+import tempfile
+import threading
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import sources
+from visual_odometry_pkg import data_preprocessor
+from tools import frame_producer
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+test_data = '../test_data/'
+package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+async def collect(source: sources.FrameSource) -> list:
+    """
+    Reads a whole source, copying the frames.
+    """
+    async with source:
+        return [sources.TimedFrame(frame.index, frame.timestamp, frame.image.copy()) async for frame in source]
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestFrameSources(unittest.TestCase):
+    """
+    Test class for the asyncio frame sources
+    """
+
+    def setUp(self) -> None:
+        self.files = sorted(glob.glob(test_data + '*.png'))
+        self.expected = [cv.cvtColor(cv.imread(file, 0), cv.COLOR_BAYER_GR2BGR) for file in self.files]
+
+    def test_directory_source(self) -> None:
+        """
+        Test Condition:
+            Input   :-> test_data folder at 10 fps
+            Output  :-> the demosaiced frames in order, timestamped index / 10
+        """
+        frames = asyncio.run(collect(sources.DirectorySource(test_data, fps=10)))
+        self.assertEqual([frame.index for frame in frames], list(range(len(self.files))))
+        np.testing.assert_allclose([frame.timestamp for frame in frames], np.arange(len(self.files)) / 10)
+        for frame, expected in zip(frames, self.expected):
+            np.testing.assert_array_equal(frame.image, expected)
+        log.info(f' DirectorySource passed!')
+
+    def test_video_source(self) -> None:
+        """
+        Test Condition:
+            Input   :-> video file of the test frames
+            Output  :-> one frame per video frame with increasing timestamps, the capture released on close
+        """
+        root = tempfile.mkdtemp()
+        try:
+            data_preprocessor.DataPreprocessor.frames_to_video(test_data, root + os.sep, 'DIVX', 5)
+            source = sources.open_source(os.path.join(root, 'out.avi'))
+            self.assertIsInstance(source, sources.VideoSource)
+            frames = asyncio.run(collect(source))
+            self.assertEqual(len(frames), len(self.files))
+            self.assertEqual(frames[0].image.shape, self.expected[0].shape)
+            self.assertTrue(np.all(np.diff([frame.timestamp for frame in frames]) > 0))
+            self.assertTrue(source.closed)
+        finally:
+            shutil.rmtree(root)
+        log.info(f' VideoSource passed!')
+
+    def test_base_source(self) -> None:
+        """
+        Test Condition:
+            Input   :-> the FrameSource base class, then a subclass without read()
+            Output  :-> neither can be instantiated
+        """
+        with self.assertRaises(TypeError):
+            sources.FrameSource()
+        with self.assertRaises(TypeError):
+            type('NoRead', (sources.FrameSource,), {})()
+        log.info(f' FrameSource abstract read() passed!')
+
+    def test_captured_frames_order(self) -> None:
+        """
+        Test Condition:
+            Input   :-> frames directory numbered 1, 2 and 10
+            Output  :-> the frames produced in numeric order, not in name order
+        """
+        root = tempfile.mkdtemp()
+        try:
+            for number in (1, 2, 10):
+                cv.imwrite(os.path.join(root, f'{number}.png'), np.full((4, 4), number, np.uint8))
+            frames = list(frame_producer.captured_frames(root, bayer_pattern=None))
+            self.assertEqual([frame[0, 0] for frame in frames], [1, 2, 10])
+        finally:
+            shutil.rmtree(root)
+        log.info(f' captured_frames() order passed!')
+
+    def test_producer_pipe(self) -> None:
+        """
+        Test Condition:
+            Input   :-> tools/frame_producer.py streaming 5 test frames on its stdout
+            Output  :-> the 5 demosaiced frames with their indices and wall clock timestamps
+        """
+        async def consume() -> list:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'tools.frame_producer', os.path.abspath(test_data), '--limit', '5',
+                cwd=package_root, stdout=asyncio.subprocess.PIPE)
+            frames = await collect(sources.StreamSource(process.stdout))
+            await process.wait()
+            return frames
+
+        frames = asyncio.run(consume())
+        self.assertEqual([frame.index for frame in frames], list(range(5)))
+        self.assertTrue(np.all(np.diff([frame.timestamp for frame in frames]) >= 0))
+        for frame, expected in zip(frames, self.expected):
+            np.testing.assert_array_equal(frame.image, expected)
+        log.info(f' StreamSource from the producer pipe passed!')
+
+    def test_socket_and_pipe(self) -> None:
+        """
+        Test Condition:
+            Input   :-> frames written by a TCP server, and by a thread into an os.pipe()
+            Output  :-> the same frames, grayscale and colour, read back through connect() and from_pipe()
+        """
+        gray = self.expected[0][:, :, 1].copy()
+
+        async def over_tcp() -> list:
+            async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+                for index, image in enumerate([self.expected[0], gray]):
+                    writer.write(sources.frame_header(index, 1.5 * index, image))
+                    writer.write(image.tobytes())
+                await writer.drain()
+                writer.close()
+
+            server = await asyncio.start_server(serve, '127.0.0.1', 0)
+            async with server:
+                return await collect(await sources.StreamSource.connect(*server.sockets[0].getsockname()[:2]))
+
+        async def over_pipe() -> list:
+            read, write = os.pipe()
+
+            def produce() -> None:
+                with os.fdopen(write, 'wb') as stream:
+                    sources.write_frame(stream, 7, 2.0, gray)
+
+            thread = threading.Thread(target=produce)
+            thread.start()
+            with os.fdopen(read, 'rb') as pipe:
+                frames = await collect(await sources.StreamSource.from_pipe(pipe))
+            thread.join()
+            return frames
+
+        frames = asyncio.run(over_tcp())
+        self.assertEqual([(frame.index, frame.timestamp) for frame in frames], [(0, 0.0), (1, 1.5)])
+        np.testing.assert_array_equal(frames[0].image, self.expected[0])
+        np.testing.assert_array_equal(frames[1].image, gray)
+        frames = asyncio.run(over_pipe())
+        self.assertEqual((frames[0].index, frames[0].timestamp), (7, 2.0))
+        np.testing.assert_array_equal(frames[0].image, gray)
+        log.info(f' StreamSource over TCP and a pipe passed!')
+
+    def test_truncated_stream(self) -> None:
+        """
+        Test Condition:
+            Input   :-> a stream ending inside a frame, a stream with a bad magic
+            Output  :-> ValueError
+        """
+        stream = io.BytesIO()
+        sources.write_frame(stream, 0, 0.0, self.expected[0])
+
+        async def read(data: bytes) -> list:
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await collect(sources.StreamSource(reader))
+
+        with self.assertRaises(ValueError):
+            asyncio.run(read(stream.getvalue()[:-10]))
+        with self.assertRaises(ValueError):
+            asyncio.run(read(b'XXXX' + stream.getvalue()[4:]))
+        log.info(f' StreamSource truncated stream passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for stereo.py module
+# Description   :-> Stereo pairs rendered from a textured plane, test_data has no right camera
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import logging
+import unittest
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import camera
+from visual_odometry_pkg import stereo
+from visual_odometry_pkg import data_preprocessor
+from tests.synthetic_data import synthetic_lut, textured_plane
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+shape = (480, 640)
+G_base = np.array([[0, 0, 1, 0], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1.0]])  # test_data image to base rotation
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def lens(offset: tuple = (0, 0, 0), lut: np.array = None) -> camera.Camera:
+    """
+    Camera of focal length 400 centred on the frame, offset in its image frame from the left lens.
+    """
+    cam = camera.Camera()
+    cam.fx, cam.fy, cam.cx, cam.cy = 400.0, 400.0, (shape[1] - 1) / 2, (shape[0] - 1) / 2
+    cam.G_camera_image = G_base.copy()
+    cam.G_camera_image[:3, 3] = G_base[:3, :3] @ np.asarray(offset, np.double)
+    cam.LUT = lut
+    return cam
+
+
+def pair(x: float, z: float, baseline: float = 0.5) -> tuple:
+    """
+    Left and right frames of the plane at depth 10 seen by the rig with its left lens at (x, 0, z).
+    """
+    return textured_plane(shape, (x, 0, z)), textured_plane(shape, (x + baseline, 0, z))
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestStereoRig(unittest.TestCase):
+    """
+    Test class for the rectification of a camera pair
+    """
+
+    def test_rig(self) -> None:
+        """
+        Test Condition:
+            Input   :-> lenses 0.5 m apart along the image x axis, then lenses stacked vertically or swapped
+            Output  :-> baseline 0.5, frames unchanged by the rectification of an aligned pair, the others refused
+        """
+        rig = stereo.StereoRig(lens(), lens((0.5, 0, 0)), shape)
+        self.assertAlmostEqual(rig.baseline, 0.5)
+        np.testing.assert_allclose(rig.camera_matrix, stereo.camera_matrix(lens()))
+        left, right = pair(0, 0)
+        rectified_left, rectified_right = rig.rectify(left, right)
+        np.testing.assert_array_equal(rectified_left, left)
+        np.testing.assert_array_equal(rectified_right, right)
+        with self.assertRaises(ValueError):
+            stereo.StereoRig(lens(), lens((0, 0.5, 0)), shape)
+        with self.assertRaises(ValueError):
+            stereo.StereoRig(lens(), lens((-0.5, 0, 0)), shape)
+        with self.assertRaises(ValueError):
+            stereo.StereoRig(camera.Camera(), lens((0.5, 0, 0)), shape)
+        log.info(f' StereoRig passed!')
+
+    def test_rig_lut(self) -> None:
+        """
+        Test Condition:
+            Input   :-> lenses with a radial distortion LUT, the right one toed in by 2 degrees
+            Output  :-> one remap matching the undistortion followed by the rectification
+        """
+        lut = synthetic_lut(shape[0], shape[1], k1=-0.05, fx=400.0, fy=400.0)
+        angle = np.radians(2)
+        toe = np.array([[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]])
+        right = lens((0.5, 0, 0), lut)
+        right.G_camera_image[:3, :3] = G_base[:3, :3] @ toe
+        rig = stereo.StereoRig(lens(lut=lut), right, shape, fixed_point=False)
+        right_plain = lens((0.5, 0, 0))
+        right_plain.G_camera_image[:3, :3] = right.G_camera_image[:3, :3]
+        plain = stereo.StereoRig(lens(), right_plain, shape, fixed_point=False)
+        raw = textured_plane(shape, (0, 0, 0))
+        undistorted = data_preprocessor.Undistorter(lut, shape, fixed_point=False).undistort(raw)
+        composed, _ = rig.rectify(raw, raw)
+        expected, _ = plain.rectify(undistorted, undistorted)
+        # ---> The two step reference is interpolated twice, compare the frames without their finest details <--- #
+        composed, expected = (cv.GaussianBlur(frame, (0, 0), 2).astype(int)[40:-40, 40:-40]
+                              for frame in (composed, expected))
+        self.assertLess(np.abs(composed - expected).mean(), 1.0)
+        log.info(f' StereoRig LUT composition passed!')
+
+
+class TestStereoOdometry(unittest.TestCase):
+    """
+    Test class for the sparse disparity, the triangulation and the PnP pose
+    """
+
+    def setUp(self) -> None:
+        self.rig = stereo.StereoRig(lens(), lens((0.5, 0, 0)), shape)
+        self.odometry = stereo.StereoOdometry(self.rig)
+
+    def test_disparity(self) -> None:
+        """
+        Test Condition:
+            Input   :-> features of a pair of the plane at 10 m, baseline 0.5 m and focal length 400
+            Output  :-> disparities of 20 pixels, points triangulated on the plane
+        """
+        left, right = pair(0, 0)
+        points = np.array([[x, y] for x in range(80, 600, 40) for y in range(60, 440, 40)], np.float32)
+        disparity, valid = self.odometry.disparity(left, right, points)
+        self.assertGreater(valid.mean(), 0.9)
+        np.testing.assert_allclose(disparity[valid], 20, atol=0.1)
+        xyz = self.odometry.triangulate(points[valid], disparity[valid])
+        np.testing.assert_allclose(xyz[:, 2], 10, rtol=0.01)
+        np.testing.assert_allclose(xyz[:, 0], (points[valid, 0] - self.rig.camera_matrix[0, 2]) / 40, atol=0.02)
+        empty, empty_valid = self.odometry.disparity(left, right, np.empty((0, 2), np.float32))
+        self.assertEqual((len(empty), len(empty_valid)), (0, 0))
+        log.info(f' disparity() and triangulate() passed!')
+
+    def test_track(self) -> None:
+        """
+        Test Condition:
+            Input   :-> rig moving 0.1 m right and 0.2 m forward per frame for 6 frames, then reset
+            Output  :-> metric positions within 2 cm, most tracks PnP inliers, identity pose after the reset
+        """
+        for index in range(6):
+            result = self.odometry.track(*self.rig.rectify(*pair(0.1 * index, 0.2 * index)))
+            np.testing.assert_allclose(result['pose'][:3, 3], [0.1 * index, 0, 0.2 * index], atol=0.02)
+            np.testing.assert_allclose(result['pose'][:3, :3], np.eye(3), atol=0.01)
+            if index:
+                self.assertGreater(result['inliers'], 0.9 * result['matched'])
+            self.assertGreater(result['landmarks'], 0.8 * self.odometry.tracker.count)
+        self.assertAlmostEqual(self.odometry.expected_disparity, 400 * 0.5 / 9, delta=0.2)
+        self.odometry.reset()
+        result = self.odometry.track(*self.rig.rectify(*pair(0, 0)))
+        np.testing.assert_array_equal(result['pose'], np.eye(4))
+        self.assertEqual(result['matched'], 0)
+        log.info(f' StereoOdometry.track() passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Test Module for visualizer.py module
+# Description   :-> Headless renders only, no window is opened
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import time
+import shutil
+import logging
+import unittest
+import tempfile
+import cv2 as cv
+import numpy as np
+from visual_odometry_pkg import visualizer
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def circle_pose(step: int) -> np.array:
+    """
+    Camera to world pose of a camera driving around a circle of radius 10 in the x / z plane.
+    """
+    pose = np.eye(4)
+    pose[:3, 3] = [10 * np.cos(step / 50), 0, 10 * np.sin(step / 50)]
+    return pose
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TestDecimatedPath(unittest.TestCase):
+    """
+    Test class for the level of detail trajectory history
+    """
+
+    def test_bounded(self) -> None:
+        """
+        Test Condition:
+            Input   :-> 100000 positions into a path of 64 history and 16 recent points
+            Output  :-> at most 80 points drawn, the first, the last 16 in full and the bounds of every position
+        """
+        path = visualizer.DecimatedPath(64, 16)
+        positions = np.column_stack([np.arange(100000.0), np.zeros(100000), -np.arange(100000.0)])
+        for position in positions:
+            path.append(position)
+        points = path.points
+        self.assertLessEqual(len(points), 80)
+        np.testing.assert_array_equal(points[0], positions[0])
+        np.testing.assert_array_equal(points[-16:], positions[-16:])
+        self.assertTrue(np.all(np.diff(points[:, 0]) > 0))
+        np.testing.assert_array_equal(path.low, [0, 0, -99999])
+        np.testing.assert_array_equal(path.high, [99999, 0, 0])
+        self.assertEqual(path.total, 100000)
+        path.clear()
+        self.assertEqual(len(path.points), 0)
+        log.info(f' DecimatedPath passed!')
+
+
+class TestVisualize(unittest.TestCase):
+    """
+    Test class for the threaded, headless trajectory visualizer
+    """
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.frame = np.random.default_rng(0).integers(0, 255, (96, 128, 3), np.uint8)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_render(self) -> None:
+        """
+        Test Condition:
+            Input   :-> poses around a circle with a frame and its tracks, rendered without the thread
+            Output  :-> trajectory panel next to the frame scaled to the render height, the path drawn
+        """
+        view = visualizer.Visualize(size=200, every=1)
+        self.assertEqual(view.render().shape, (200, 200, 3))
+        for step in range(300):
+            view.update(circle_pose(step), self.frame, np.float32([[10, 10], [60, 40]]), np.float32([[8, 9], [58, 41]]))
+        canvas = view.render()
+        self.assertEqual(canvas.shape, (200, 200 + 267, 3))
+        self.assertLess(canvas[:, :200].min(), 255)
+        self.assertFalse(view.running)
+        log.info(f' Visualize.render() passed!')
+
+    def test_headless_png(self) -> None:
+        """
+        Test Condition:
+            Input   :-> started visualizer writing PNG snapshots, 100 updates rendering every 10th
+            Output  :-> updates never wait for the renderer, at most 11 renders, snapshots readable
+        """
+        view = visualizer.Visualize(self.root, size=120, every=10).start()
+        start = time.perf_counter()
+        for step in range(100):
+            view.update(circle_pose(step), self.frame)
+        elapsed = time.perf_counter() - start
+        view.close()
+        self.assertLessEqual(view.renders, 12)
+        self.assertLess(elapsed, 1.0)
+        snapshots = sorted(os.listdir(self.root))
+        self.assertGreater(len(snapshots), 0)
+        self.assertEqual(cv.imread(os.path.join(self.root, snapshots[-1])).shape[0], 120)
+        self.assertIsNotNone(view.canvas)
+        log.info(f' Visualize headless PNG snapshots passed!')
+
+    def test_headless_video(self) -> None:
+        """
+        Test Condition:
+            Input   :-> visualizer used as a context manager writing a video, a render on every update
+            Output  :-> one readable video holding the renders
+        """
+        with visualizer.Visualize(self.root, size=120, every=1, video=True) as view:
+            for step in range(20):
+                view.update(circle_pose(step), self.frame)
+                time.sleep(0.005)
+        self.assertEqual(os.listdir(self.root), ['trajectory.avi'])
+        capture = cv.VideoCapture(os.path.join(self.root, 'trajectory.avi'))
+        frames = int(capture.get(cv.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        self.assertEqual(frames, view.renders)
+        log.info(f' Visualize headless video passed!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Stand-in for a live capture process, streams frames to a StreamSource
+# Description   :-> Run from the project root with: python -m tools.frame_producer test_data [--fps 10] [--port 5555]
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import sys
+import time
+import socket
+import argparse
+import cv2 as cv
+from typing import BinaryIO, Iterator
+from visual_odometry_pkg.data_preprocessor import bayer_code, video_frames
+from visual_odometry_pkg.manifest import list_frames
+from visual_odometry_pkg.sources import write_frame
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def captured_frames(source: str, bayer_pattern: str = 'gr') -> Iterator:
+    """
+    Yields the bgr frames of a frames directory (demosaiced with the bayer pattern) or of a video file.
+    """
+    if os.path.isdir(source):
+        code = bayer_code(bayer_pattern) if bayer_pattern else None
+        for file in list_frames(source):
+            image = cv.imread(file, 0 if code is not None else cv.IMREAD_UNCHANGED)
+            yield cv.cvtColor(image, code) if code is not None else image
+    else:
+        yield from video_frames(source)
+
+
+def produce(stream: BinaryIO, source: str, bayer_pattern: str = 'gr', fps: float = 0.0, limit: int = None) -> int:
+    """
+    Streams the frames of a source, timestamped with the wall clock when they are sent, like a live camera.
+
+    Args:
+        stream: BinaryIO
+            binary stream the frames are written to
+        source: str
+            frames directory or video file
+        bayer_pattern: str
+            bayer pattern of the png frames, None sends them raw
+        fps: float
+            paces the frames at this rate, 0 sends them as fast as the reader takes them
+        limit: int
+            maximum number of frames sent
+
+    Returns: int
+        number of frames sent
+    """
+    start = time.perf_counter()
+    count = 0
+    for image in captured_frames(source, bayer_pattern):
+        if limit is not None and count >= limit:
+            break
+        if fps:
+            time.sleep(max(0.0, start + count / fps - time.perf_counter()))
+        write_frame(stream, count, time.time(), image)
+        count += 1
+    stream.flush()
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Streams frames in the StreamSource wire format')
+    parser.add_argument('source', help='frames directory or video file')
+    parser.add_argument('--bayer-pattern', default='gr', help='bayer pattern of the png frames, "" sends them raw')
+    parser.add_argument('--fps', type=float, default=0.0, help='frame rate, 0 streams as fast as possible')
+    parser.add_argument('--limit', type=int, help='maximum number of frames')
+    parser.add_argument('--port', type=int, help='serve one TCP client on this port instead of writing to stdout')
+    arguments = parser.parse_args()
+
+    if arguments.port is None:
+        produce(sys.stdout.buffer, arguments.source, arguments.bayer_pattern, arguments.fps, arguments.limit)
+    else:
+        with socket.create_server(('127.0.0.1', arguments.port)) as server:
+            connection, _ = server.accept()
+            with connection, connection.makefile('wb') as stream:
+                produce(stream, arguments.source, arguments.bayer_pattern, arguments.fps, arguments.limit)
@@ -0,0 +1,53 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Package initialisation for visual_odometry_pkg
+# Description   :-> Importing the package has no side effects, the public names resolve their module on first access
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import logging
+import importlib
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+logging.getLogger(__name__).addHandler(logging.NullHandler())  # call log_config.configure_logging() to get logs
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+# Public name -> defining module, imported lazily so a worker only reading camera models never loads OpenCV or scipy
+_LAZY = {'Camera': 'camera', 'CameraRegistry': 'camera',
+         'DataPreprocessor': 'data_preprocessor', 'FramePool': 'data_preprocessor', 'FrameStream': 'data_preprocessor',
+         'ImagePyramid': 'data_preprocessor', 'MotionGate': 'data_preprocessor',
+         'PreprocessPipeline': 'data_preprocessor', 'Undistorter': 'data_preprocessor',
+         'FeatureTracker': 'algorithms', 'MotionEstimator': 'algorithms', 'KeyframeManager': 'algorithms',
+         'BundleAdjuster': 'algorithms', 'FrameCache': 'frame_cache', 'FrameManifest': 'manifest',
+         'ImplementVO': 'handler',
+         'BatchRunner': 'handler', 'Visualize': 'visualizer', 'DirectorySource': 'sources', 'VideoSource': 'sources',
+         'StreamSource': 'sources', 'PoseWriter': 'pose_store', 'PoseStore': 'pose_store', 'TrackWriter': 'pose_store',
+         'TrackStore': 'pose_store', 'StereoRig': 'stereo', 'StereoOdometry': 'stereo', 'default_metrics': 'metrics',
+         'configure_logging': 'log_config'}
+
+__all__ = sorted(_LAZY)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def __getattr__(name: str) -> object:
+    if name not in _LAZY:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_LAZY[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,4 +1,718 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Algorithms module for visual odometry package
+# Description   :-> Feature tracking front end, motion estimation and sliding-window bundle adjustment
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import time
+import logging
+import cv2 as cv
+import numpy as np
+from collections import deque
+from typing import List, Tuple
+from .metrics import default_metrics
+from .data_preprocessor import TIMINGS_KEPT
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class FeatureTracker:
+    """
+    KLT feature tracker with grid-bucketed detection.
+
+    Features live in preallocated arrays (points, ids, ages) compacted in place as tracks are lost; new features are
+    only detected when the number of tracks drops below min_features, spread over a grid so they cover the image.
+    """
+
+    def __init__(self, max_features: int = 1000, min_features: int = 500, grid: Tuple[int, int] = (8, 8),
+                 detector: str = 'gftt', min_distance: int = 10, quality: float = 0.01, win_size: int = 21,
+                 max_level: int = 3):
+        """
+        Args:
+            max_features: int
+                capacity of the feature arrays
+            min_features: int
+                the tracker replenishes features when fewer tracks survive
+            grid: tuple
+                (rows, cols) of the detection buckets
+            detector: string
+                'gftt' (Shi-Tomasi corners), 'fast' or 'orb'
+            min_distance: int
+                minimum distance in pixels between features
+            quality: float
+                minimal accepted corner quality of gftt, relative to the best corner
+            win_size: int
+                KLT search window size
+            max_level: int
+                KLT pyramid levels
+        """
+        if detector not in ('gftt', 'fast', 'orb'):
+            raise ValueError(f'Unknown detector {detector!r}, expected gftt, fast or orb')
+        self.max_features = max_features
+        self.min_features = min(min_features, max_features)
+        self.grid = grid
+        self.detector = detector
+        self.min_distance = min_distance
+        self.quality = quality
+        self.lk_params = dict(winSize=(win_size, win_size), maxLevel=max_level,
+                              criteria=(cv.TERM_CRITERIA_EPS | cv.TERM_CRITERIA_COUNT, 30, 0.01))
+        if detector == 'fast':
+            self._keypoint_detector = cv.FastFeatureDetector_create(threshold=20)
+        elif detector == 'orb':
+            self._keypoint_detector = cv.ORB_create(nfeatures=4 * max_features)
+
+        self.points = np.empty((max_features, 2), np.float32)  # current feature positions
+        self.previous = np.empty((max_features, 2), np.float32)  # positions in the previous frame
+        self.ids = np.empty(max_features, np.int64)  # track id of each feature
+        self.ages = np.empty(max_features, np.int32)  # number of frames each feature has been tracked
+        self.count = 0
+        self.next_id = 0
+        self.frame_times = deque(maxlen=TIMINGS_KEPT)  # latest per-frame latencies in seconds
+        self.frames = 0  # total number of frames tracked
+        self.elapsed = 0.0  # total tracking time in seconds
+        self.tracked = 0  # total number of feature-to-feature tracks
+        self._previous_image = None
+        self._gray = [None, None]  # double buffered grayscale frames, the input frames may be recycled buffers
+        self._flip = 0
+
+    def reset(self) -> None:
+        """
+        Drops every track, the next frame is detected from scratch.
+        """
+        self.count = 0
+        self._previous_image = None
+
+    @default_metrics.timed('track')
+    def track(self, image: np.array) -> Tuple[np.array, np.array, np.array]:
+        """
+        Tracks the features into a new frame and replenishes them if needed.
+
+        Args:
+            image: np.array
+                grayscale (m, n) or bgr (m, n, 3) frame, or an ImagePyramid of the frame whose grayscale level is used
+                as is
+
+        Returns: Tuple
+            (previous, current, ids) of the features tracked from the previous frame, arrays of shape (k, 2), (k, 2)
+            and (k,). These are views into the tracker arrays and are overwritten by the next call.
+        """
+        start = time.perf_counter()
+        levels = getattr(image, 'levels', None)
+        if levels is not None:
+            image = levels[0]
+        gray = self._gray[self._flip]
+        if gray is None or gray.shape != image.shape[:2]:
+            gray = self._gray[self._flip] = np.empty(image.shape[:2], np.uint8)
+        if image.ndim == 2:
+            np.copyto(gray, image)
+        else:
+            cv.cvtColor(image, cv.COLOR_BGR2GRAY, dst=gray)
+        self._flip ^= 1
+        tracked = 0
+        if self._previous_image is not None and self.count:
+            count = self.count
+            current, status, _ = cv.calcOpticalFlowPyrLK(self._previous_image, gray, self.points[:count], None,
+                                                         **self.lk_params)
+            height, width = gray.shape
+            keep = status.ravel().astype(bool)
+            keep &= (current[:, 0] >= 0) & (current[:, 0] < width) & (current[:, 1] >= 0) & (current[:, 1] < height)
+            tracked = int(keep.sum())
+            self.previous[:tracked] = self.points[:count][keep]
+            self.points[:tracked] = current[keep]
+            self.ids[:tracked] = self.ids[:count][keep]
+            self.ages[:tracked] = self.ages[:count][keep] + 1
+            self.count = tracked
+
+        if self.count < self.min_features:
+            self._replenish(gray)
+        self._previous_image = gray
+        self.tracked += tracked
+        latency = time.perf_counter() - start
+        self.frame_times.append(latency)
+        self.frames += 1
+        self.elapsed += latency
+        return self.previous[:tracked], self.points[:tracked], self.ids[:tracked]
+
+    def _replenish(self, gray: np.array) -> None:
+        """
+        Detects new features away from the existing ones and appends the best of each grid cell.
+        """
+        mask = np.full(gray.shape, 255, np.uint8)
+        if self.count:
+            existing = np.round(self.points[:self.count]).astype(np.intp)
+            # ---> A point tracked into the last half pixel of the frame rounds onto the border <--- #
+            np.clip(existing, 0, (gray.shape[1] - 1, gray.shape[0] - 1), out=existing)
+            mask[existing[:, 1], existing[:, 0]] = 0
+            mask = cv.erode(mask, np.ones((2 * self.min_distance + 1,) * 2, np.uint8))
+
+        candidates, scores = self._detect(gray, mask)
+        free = self.max_features - self.count
+        if not len(candidates) or not free:
+            return
+        selected = bucket_select(candidates, scores, gray.shape, self.grid, free)
+        new = len(selected)
+        self.points[self.count:self.count + new] = selected
+        self.ids[self.count:self.count + new] = np.arange(self.next_id, self.next_id + new)
+        self.ages[self.count:self.count + new] = 0
+        self.count += new
+        self.next_id += new
+
+    def _detect(self, gray: np.array, mask: np.array) -> Tuple[np.array, np.array]:
+        """
+        Returns: Tuple
+            candidate positions (k, 2) float32 and their scores (k,), higher is better
+        """
+        if self.detector == 'gftt':
+            corners = cv.goodFeaturesToTrack(gray, 4 * self.max_features, self.quality, self.min_distance, mask=mask)
+            if corners is None:
+                return np.empty((0, 2), np.float32), np.empty(0)
+            corners = corners.reshape(-1, 2)
+            return corners, -np.arange(len(corners), dtype=np.float64)  # returned strongest first
+        keypoints = self._keypoint_detector.detect(gray, mask)
+        if not keypoints:
+            return np.empty((0, 2), np.float32), np.empty(0)
+        return (np.array([keypoint.pt for keypoint in keypoints], np.float32),
+                np.array([keypoint.response for keypoint in keypoints], np.float64))
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            frames processed, live tracks, tracks/sec and the mean / max per-frame latency in milliseconds of the
+            latest TIMINGS_KEPT frames
+        """
+        times = np.asarray(self.frame_times)
+        return {'frames': self.frames, 'features': self.count,
+                'tracks_per_sec': self.tracked / self.elapsed if self.elapsed else 0.0,
+                'latency_ms_mean': float(times.mean() * 1e3) if times.size else 0.0,
+                'latency_ms_max': float(times.max() * 1e3) if times.size else 0.0}
+
+
+class MotionEstimator:
+    """
+    Relative pose from matched points via an essential matrix estimated with batched RANSAC.
+
+    Hypotheses are generated with the linear 8-point algorithm and scored batch_size at a time as NumPy array
+    operations (Sampson distance of every point under every hypothesis); each new best hypothesis is refitted on its
+    inliers. The number of iterations adapts to the best inlier ratio seen so far, and an optional wall-clock budget
+    caps the time spent per frame.
+    """
+
+    def __init__(self, camera: object, threshold: float = 1.0, confidence: float = 0.999, max_iterations: int = 2000,
+                 batch_size: int = 64, time_budget: float = None, seed: int = None):
+        """
+        Args:
+            camera: Camera
+                camera with fx, fy, cx, cy read
+            threshold: float
+                inlier threshold on the Sampson distance in pixels
+            confidence: float
+                probability of drawing at least one outlier free sample
+            max_iterations: int
+                maximum number of hypotheses per frame
+            batch_size: int
+                number of hypotheses scored at once
+            time_budget: float
+                optional wall-clock cap in seconds per estimate, at least one batch is always scored
+            seed: int
+                random generator seed
+        """
+        self.K = np.array([[camera.fx, 0, camera.cx], [0, camera.fy, camera.cy], [0, 0, 1]], np.float64)
+        self.threshold = threshold / ((camera.fx + camera.fy) / 2)  # in normalized image coordinates
+        self.confidence = confidence
+        self.max_iterations = max_iterations
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.rng = np.random.default_rng(seed)
+        self.iterations = 0  # hypotheses scored by the last estimate
+        self.elapsed = 0.0  # seconds spent by the last estimate
+        self.timed_out = False  # whether the last estimate stopped on the time budget
+
+    def _normalize(self, points: np.array) -> np.array:
+        points = np.asarray(points, np.float64)
+        normalized = np.ones((len(points), 3))
+        normalized[:, 0] = (points[:, 0] - self.K[0, 2]) / self.K[0, 0]
+        normalized[:, 1] = (points[:, 1] - self.K[1, 2]) / self.K[1, 1]
+        return normalized
+
+    @default_metrics.timed('pose')
+    def estimate(self, previous: np.array, current: np.array) -> Tuple[np.array, np.array, np.array]:
+        """
+        Estimates the motion between two frames.
+
+        Args:
+            previous: np.array
+                pixel positions (n, 2) in the previous frame
+            current: np.array
+                matching pixel positions (n, 2) in the current frame
+
+        Returns: Tuple
+            (R, t, inliers): rotation (3, 3) and unit translation (3, 1) of the current camera with respect to the
+            previous one (x_current = R x_previous + t), and the boolean inlier mask (n,). R and t are None when
+            fewer than 8 matches or no valid model are found.
+        """
+        start = time.perf_counter()
+        n = len(previous)
+        self.iterations, self.timed_out = 0, False
+        inliers = np.zeros(n, bool)
+        if n < 8:
+            self.elapsed = time.perf_counter() - start
+            return None, None, inliers
+
+        x1, x2 = self._normalize(previous), self._normalize(current)
+        threshold = self.threshold ** 2
+        best_count, required = 0, self.max_iterations
+        while self.iterations < required:
+            batch = min(self.batch_size, required - self.iterations)
+            samples = self.rng.integers(0, n, (batch, 8))  # a repeated index only yields a poorly scoring hypothesis
+            hypotheses = essential_eight_point(x1[samples], x2[samples])
+            errors = sampson_distance(hypotheses, x1, x2)
+            counts = (errors < threshold).sum(axis=1)
+            best = int(np.argmax(counts))
+            if counts[best] > best_count:
+                candidate, candidate_inliers = self._local_optimization(x1, x2, errors[best] < threshold, threshold)
+                if candidate is not None and candidate_inliers.sum() > best_count:
+                    essential, inliers = candidate, candidate_inliers
+                    best_count = int(inliers.sum())
+                    required = min(self.max_iterations, ransac_iterations(best_count / n, 8, self.confidence))
+            self.iterations += batch
+            if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                self.timed_out = self.iterations < required
+                break
+
+        if best_count < 8:
+            self.elapsed = time.perf_counter() - start
+            return None, None, np.zeros(n, bool)
+
+        mask = inliers.astype(np.uint8)[:, None]
+        _, rotation, translation, _ = cv.recoverPose(essential, np.ascontiguousarray(previous, np.float64),
+                                                     np.ascontiguousarray(current, np.float64), self.K, mask=mask)
+        self.elapsed = time.perf_counter() - start
+        return rotation, translation, inliers
+
+    @staticmethod
+    def _local_optimization(x1: np.array, x2: np.array, inliers: np.array,
+                            threshold: float, rounds: int = 3) -> Tuple[np.array, np.array]:
+        """
+        Refits a hypothesis by least squares on its inliers until the support stops growing (LO-RANSAC), minimal
+        8-point samples are too noisy to be used as the final model.
+        """
+        essential = None
+        for _ in range(rounds):
+            if inliers.sum() < 8:
+                break
+            refit = essential_eight_point(x1[inliers][None], x2[inliers][None])[0]
+            refit_inliers = sampson_distance(refit[None], x1, x2)[0] < threshold
+            if essential is not None and refit_inliers.sum() <= inliers.sum():
+                break
+            essential, inliers = refit, refit_inliers
+        return essential, inliers
+
+
+class Keyframe:
+    """
+    A frame promoted to keyframe: its index, camera to world pose and the tracked features seen in it.
+    """
+
+    def __init__(self, index: int, pose: np.array, ids: np.array, points: np.array):
+        self.index = index
+        self.pose = pose  # 4 x 4 camera to world
+        self.ids = ids  # (k,) track ids, sorted
+        self.points = points  # (k, 2) pixel positions matching ids
+
+
+class KeyframeManager:
+    """
+    Promotes frames to keyframes on parallax or track loss and keeps a sliding window of the latest keyframes.
+    """
+
+    def __init__(self, window: int = 10, min_parallax: float = 20.0, min_track_ratio: float = 0.6):
+        """
+        Args:
+            window: int
+                number of keyframes kept
+            min_parallax: float
+                median feature displacement in pixels since the last keyframe that promotes a frame
+            min_track_ratio: float
+                a frame is promoted when fewer than this fraction of the last keyframe features are still tracked
+        """
+        self.min_parallax = min_parallax
+        self.min_track_ratio = min_track_ratio
+        self.keyframes = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self.keyframes)
+
+    def __iter__(self):
+        return iter(self.keyframes)
+
+    def update(self, index: int, pose: np.array, ids: np.array, points: np.array) -> bool:
+        """
+        Checks a frame against the last keyframe and promotes it when needed.
+
+        Args:
+            index: int
+                frame index
+            pose: np.array
+                4 x 4 camera to world pose of the frame
+            ids: np.array
+                (k,) ids of the features tracked in the frame
+            points: np.array
+                (k, 2) pixel positions of the features
+
+        Returns: bool
+            True if the frame became a keyframe
+        """
+        if self.keyframes:
+            last = self.keyframes[-1]
+            _, in_last, in_frame = np.intersect1d(last.ids, ids, assume_unique=True, return_indices=True)
+            ratio = len(in_last) / max(len(last.ids), 1)
+            parallax = np.median(np.linalg.norm(points[in_frame] - last.points[in_last], axis=1)) \
+                if len(in_last) else np.inf
+            if parallax < self.min_parallax and ratio >= self.min_track_ratio:
+                return False
+        order = np.argsort(ids)
+        self.keyframes.append(Keyframe(index, pose.copy(), np.asarray(ids)[order], np.array(points)[order]))
+        return True
+
+
+class BundleAdjuster:
+    """
+    Sliding-window bundle adjustment of keyframe poses and the landmarks they share.
+
+    A Levenberg-Marquardt solver with analytic Jacobians eliminates the landmarks with the Schur complement, so each
+    iteration solves a dense system of 6 x (window - 1) pose parameters only: the cost grows with the window size and
+    the number of landmarks in it, not with the sequence length. Observations are weighted with a Huber loss and the
+    first keyframe of the window is held fixed as the gauge.
+    """
+
+    def __init__(self, camera: object, max_iterations: int = 20, huber: float = 2.0, min_observations: int = 2,
+                 tolerance: float = 1e-6):
+        """
+        Args:
+            camera: Camera
+                camera with fx, fy, cx, cy read
+            max_iterations: int
+                maximum number of Levenberg-Marquardt iterations per window
+            huber: float
+                Huber threshold on the reprojection error in pixels
+            min_observations: int
+                landmarks seen in fewer keyframes are left out
+            tolerance: float
+                relative cost decrease under which the solver stops
+        """
+        self.K = np.array([[camera.fx, 0, camera.cx], [0, camera.fy, camera.cy], [0, 0, 1]], np.float64)
+        self.max_iterations = max_iterations
+        self.huber = huber
+        self.min_observations = max(2, min_observations)
+        self.tolerance = tolerance
+        self.reports = deque(maxlen=1000)  # timing report of the latest adjusted windows, without the landmarks
+
+    @default_metrics.timed('bundle_adjust')
+    def adjust(self, keyframes: List[Keyframe]) -> dict:
+        """
+        Refines the keyframe poses in place.
+
+        Args:
+            keyframes: list
+                keyframes of the window, oldest first
+
+        Returns: dict
+            report with keyframes, landmarks, observations, seconds, iterations, initial and final rms reprojection
+            error in pixels, and the refined landmarks (ids, points 3D in the world frame)
+        """
+        start = time.perf_counter()
+        keyframes = list(keyframes)
+        report = {'keyframes': len(keyframes), 'landmarks': 0, 'observations': 0, 'seconds': 0.0, 'iterations': 0,
+                  'initial_rms': 0.0, 'final_rms': 0.0}
+        cameras, landmarks, pixels, ids = self._observations(keyframes) if len(keyframes) > 1 else [np.empty(0)] * 4
+        if not len(ids):
+            report['seconds'] = time.perf_counter() - start
+            self.reports.append(dict(report))
+            return report
+
+        world_to_camera = np.array([np.linalg.inv(keyframe.pose) for keyframe in keyframes])
+        rotations, translations = world_to_camera[:, :3, :3].copy(), world_to_camera[:, :3, 3].copy()
+        points = self._triangulate(world_to_camera, cameras, landmarks, pixels, len(ids))
+        valid = np.isfinite(points).all(axis=1)
+        observed = valid[landmarks]
+        cameras, pixels = cameras[observed], pixels[observed]
+        landmarks, points, ids = (np.cumsum(valid) - 1)[landmarks[observed]], points[valid], ids[valid]
+
+        residual = self._residuals(rotations, translations, points, cameras, landmarks, pixels)
+        cost = self._cost(residual)
+        initial_rms = float(np.sqrt(np.mean(residual ** 2)))
+        damping = 1e-3
+        iterations = 0
+        for iterations in range(1, self.max_iterations + 1):
+            step = self._step(rotations, translations, points, cameras, landmarks, residual, damping)
+            rotations_new = rodrigues(step[0]) @ rotations
+            translations_new = np.einsum('nij,nj->ni', rodrigues(step[0]), translations) + step[1]
+            points_new = points + step[2]
+            residual_new = self._residuals(rotations_new, translations_new, points_new, cameras, landmarks, pixels)
+            cost_new = self._cost(residual_new)
+            if cost_new < cost:
+                converged = cost - cost_new < self.tolerance * cost
+                rotations, translations, points = rotations_new, translations_new, points_new
+                residual, cost = residual_new, cost_new
+                damping = max(damping / 10, 1e-9)
+                if converged:
+                    break
+            else:
+                damping *= 10
+                if damping > 1e9:
+                    break
+
+        for keyframe, rotation, translation in zip(keyframes[1:], rotations[1:], translations[1:]):
+            keyframe.pose = np.eye(4)
+            keyframe.pose[:3, :3] = rotation.T
+            keyframe.pose[:3, 3] = -rotation.T @ translation
+        report.update(landmarks=len(points), observations=len(pixels), seconds=time.perf_counter() - start,
+                      iterations=iterations, initial_rms=initial_rms,
+                      final_rms=float(np.sqrt(np.mean(residual ** 2))))
+        self.reports.append(dict(report))
+        report.update(ids=ids, points=points)
+        log.debug(f' BundleAdjuster window of {len(keyframes)} keyframes solved in {report["seconds"]:.3f} s')
+        return report
+
+    def _observations(self, keyframes: List[Keyframe]) -> Tuple[np.array, np.array, np.array, np.array]:
+        """
+        Returns: Tuple
+            camera index, landmark index and pixel of every observation of the landmarks seen often enough, and the
+            landmark track ids
+        """
+        all_ids = np.concatenate([keyframe.ids for keyframe in keyframes])
+        cameras = np.concatenate([np.full(len(keyframe.ids), position) for position, keyframe in enumerate(keyframes)])
+        pixels = np.concatenate([keyframe.points for keyframe in keyframes]).astype(np.float64)
+        ids, landmarks, counts = np.unique(all_ids, return_inverse=True, return_counts=True)
+        keep = counts >= self.min_observations
+        observed = keep[landmarks]
+        return cameras[observed], (np.cumsum(keep) - 1)[landmarks[observed]], pixels[observed], ids[keep]
+
+    def _triangulate(self, world_to_camera: np.array, cameras: np.array, landmarks: np.array, pixels: np.array,
+                     count: int) -> np.array:
+        """
+        Triangulates every landmark from its first and last observation, points behind a camera are set to nan.
+        """
+        order = np.lexsort((cameras, landmarks))
+        cameras, landmarks, pixels = cameras[order], landmarks[order], pixels[order]
+        first = np.searchsorted(landmarks, np.arange(count), side='left')
+        last = np.searchsorted(landmarks, np.arange(count), side='right') - 1
+        points = np.full((count, 3), np.nan)
+        pairs = np.stack([cameras[first], cameras[last]], axis=1)
+        for a, b in np.unique(pairs, axis=0):
+            group = np.flatnonzero((pairs[:, 0] == a) & (pairs[:, 1] == b))
+            homogeneous = cv.triangulatePoints(self.K @ world_to_camera[a, :3], self.K @ world_to_camera[b, :3],
+                                               pixels[first[group]].T, pixels[last[group]].T)
+            group_points = (homogeneous[:3] / homogeneous[3]).T
+            depth_a = group_points @ world_to_camera[a, 2, :3] + world_to_camera[a, 2, 3]
+            depth_b = group_points @ world_to_camera[b, 2, :3] + world_to_camera[b, 2, 3]
+            group_points[(depth_a <= 0) | (depth_b <= 0)] = np.nan
+            points[group] = group_points
+        return points
+
+    def _residuals(self, rotations: np.array, translations: np.array, points: np.array, cameras: np.array,
+                   landmarks: np.array, pixels: np.array) -> np.array:
+        """
+        Reprojection residuals (n, 2) of every observation.
+        """
+        camera_points = np.einsum('nij,nj->ni', rotations[cameras], points[landmarks]) + translations[cameras]
+        projected = camera_points[:, :2] / camera_points[:, 2:]
+        return projected * self.K[[0, 1], [0, 1]] + self.K[:2, 2] - pixels
+
+    def _weights(self, residual: np.array) -> np.array:
+        norm = np.linalg.norm(residual, axis=1)
+        return np.where(norm <= self.huber, 1.0, self.huber / np.maximum(norm, 1e-12))
+
+    def _cost(self, residual: np.array) -> float:
+        norm = np.linalg.norm(residual, axis=1)
+        return float(np.sum(np.where(norm <= self.huber, norm ** 2, 2 * self.huber * norm - self.huber ** 2)))
+
+    def _step(self, rotations: np.array, translations: np.array, points: np.array, cameras: np.array,
+              landmarks: np.array, residual: np.array, damping: float) -> Tuple[np.array, np.array, np.array]:
+        """
+        One damped Gauss-Newton step with the landmarks eliminated by the Schur complement.
+
+        Returns: Tuple
+            rotation (left perturbation) and translation updates (m, 3), (m, 3) of every camera, camera 0 unchanged,
+            and the landmark updates (p, 3)
+        """
+        m, p = len(rotations), len(points)
+        camera_points = np.einsum('nij,nj->ni', rotations[cameras], points[landmarks]) + translations[cameras]
+        x, y, z = camera_points.T
+        projection = np.zeros((len(x), 2, 3))
+        projection[:, 0, 0] = self.K[0, 0] / z
+        projection[:, 0, 2] = -self.K[0, 0] * x / z ** 2
+        projection[:, 1, 1] = self.K[1, 1] / z
+        projection[:, 1, 2] = -self.K[1, 1] * y / z ** 2
+        skew = np.zeros((len(x), 3, 3))
+        skew[:, 0, 1], skew[:, 0, 2], skew[:, 1, 2] = -z, y, -x
+        skew = skew - skew.transpose(0, 2, 1)
+        jacobian_camera = np.concatenate([projection @ -skew, projection], axis=2)  # (n, 2, 6)
+        jacobian_point = projection @ rotations[cameras]  # (n, 2, 3)
+        weights = self._weights(residual)[:, None, None]
+
+        h_cc = np.zeros((m, 6, 6))
+        np.add.at(h_cc, cameras, jacobian_camera.transpose(0, 2, 1) @ (weights * jacobian_camera))
+        h_pp = np.zeros((p, 3, 3))
+        np.add.at(h_pp, landmarks, jacobian_point.transpose(0, 2, 1) @ (weights * jacobian_point))
+        g_c = np.zeros((m, 6))
+        np.add.at(g_c, cameras, -np.einsum('nji,nj->ni', jacobian_camera, weights[:, :, 0] * residual))
+        g_p = np.zeros((p, 3))
+        np.add.at(g_p, landmarks, -np.einsum('nji,nj->ni', jacobian_point, weights[:, :, 0] * residual))
+        h_cp = np.zeros((p, m, 6, 3))
+        np.add.at(h_cp, (landmarks, cameras), jacobian_camera.transpose(0, 2, 1) @ (weights * jacobian_point))
+
+        h_cc += damping * np.einsum('nii->ni', h_cc)[:, :, None] * np.eye(6) + 1e-9 * np.eye(6)
+        h_pp += damping * np.einsum('nii->ni', h_pp)[:, :, None] * np.eye(3) + 1e-9 * np.eye(3)
+        h_pp_inverse = np.linalg.inv(h_pp)
+
+        # ---> Reduced camera system, camera 0 is fixed <--- #
+        reduced = np.zeros((m, 6, m, 6))
+        reduced[np.arange(m), :, np.arange(m), :] = h_cc
+        reduced -= np.einsum('pcij,pjk,pdlk->cidl', h_cp, h_pp_inverse, h_cp)
+        rhs = g_c - np.einsum('pcij,pjk,pk->ci', h_cp, h_pp_inverse, g_p)
+        reduced = reduced[1:, :, 1:, :].reshape(6 * (m - 1), 6 * (m - 1))
+        delta_camera = np.zeros((m, 6))
+        delta_camera[1:] = np.linalg.solve(reduced, rhs[1:].ravel()).reshape(m - 1, 6)
+        delta_point = np.einsum('pij,pj->pi', h_pp_inverse, g_p - np.einsum('pcij,ci->pj', h_cp, delta_camera))
+        return delta_camera[:, :3], delta_camera[:, 3:], delta_point
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def rodrigues(vectors: np.array) -> np.array:
+    """
+    Batched conversion of rotation vectors (n, 3) to rotation matrices (n, 3, 3).
+    """
+    theta = np.linalg.norm(vectors, axis=1)
+    axis = vectors / np.where(theta > 1e-12, theta, 1.0)[:, None]
+    skew = np.zeros((len(vectors), 3, 3))
+    skew[:, 0, 1], skew[:, 0, 2], skew[:, 1, 2] = -axis[:, 2], axis[:, 1], -axis[:, 0]
+    skew = skew - skew.transpose(0, 2, 1)
+    sin, cos = np.sin(theta)[:, None, None], np.cos(theta)[:, None, None]
+    return np.eye(3) + sin * skew + (1 - cos) * skew @ skew
+
+
+def essential_eight_point(x1: np.array, x2: np.array) -> np.array:
+    """
+    Batched linear 8-point essential matrix estimation.
+
+    Args:
+        x1: np.array
+            normalized homogeneous points (b, k, 3) in the first view, k >= 8
+        x2: np.array
+            matching points (b, k, 3) in the second view
+
+    Returns: np.array
+        essential matrices (b, 3, 3) with x2^T E x1 = 0 and singular values projected to (1, 1, 0)
+    """
+    t1, t2 = _hartley(x1), _hartley(x2)
+    y1, y2 = x1 @ t1.transpose(0, 2, 1), x2 @ t2.transpose(0, 2, 1)
+    a = (y2[:, :, :, None] * y1[:, :, None, :]).reshape(x1.shape[0], x1.shape[1], 9)
+    if a.shape[1] > 9:  # least squares over many points, only the normal equations matter
+        a = a.transpose(0, 2, 1) @ a
+    essential = t2.transpose(0, 2, 1) @ np.linalg.svd(a)[2][:, -1].reshape(-1, 3, 3) @ t1
+    u, _, vt = np.linalg.svd(essential)
+    return u @ np.diag([1.0, 1.0, 0.0]) @ vt
+
+
+def _hartley(x: np.array) -> np.array:
+    """
+    Batched Hartley normalizing transforms (b, 3, 3): centroid to the origin, mean distance sqrt(2).
+    """
+    centroid = x[:, :, :2].mean(axis=1)
+    scale = np.sqrt(2) / (np.linalg.norm(x[:, :, :2] - centroid[:, None], axis=2).mean(axis=1) + 1e-12)
+    transform = np.zeros((x.shape[0], 3, 3))
+    transform[:, 0, 0] = transform[:, 1, 1] = scale
+    transform[:, :2, 2] = -scale[:, None] * centroid
+    transform[:, 2, 2] = 1
+    return transform
+
+
+def sampson_distance(essential: np.array, x1: np.array, x2: np.array) -> np.array:
+    """
+    Squared Sampson distance of every point pair under every hypothesis.
+
+    Args:
+        essential: np.array
+            essential matrices (b, 3, 3)
+        x1, x2: np.array
+            normalized homogeneous points (n, 3)
+
+    Returns: np.array
+        distances (b, n)
+    """
+    ex1 = essential @ x1.T  # (b, 3, n)
+    etx2 = essential.transpose(0, 2, 1) @ x2.T
+    numerator = (ex1 * x2.T).sum(axis=1) ** 2
+    return numerator / (ex1[:, 0] ** 2 + ex1[:, 1] ** 2 + etx2[:, 0] ** 2 + etx2[:, 1] ** 2 + 1e-300)
+
+
+def ransac_iterations(inlier_ratio: float, sample_size: int, confidence: float) -> int:
+    """
+    Number of RANSAC iterations needed to draw an all-inlier sample with the given confidence.
+    """
+    good = inlier_ratio ** sample_size
+    if good <= 0:
+        return np.iinfo(np.int32).max
+    if good >= 1:
+        return 1
+    return int(np.ceil(np.log(1 - confidence) / np.log(1 - good)))
+
+
+def bucket_select(points: np.array, scores: np.array, shape: Tuple[int, int], grid: Tuple[int, int],
+                  count: int) -> np.array:
+    """
+    Selects up to count points spread over a grid, keeping the highest scores in each cell.
+
+    Args:
+        points: np.array
+            candidate (x, y) positions of shape (k, 2)
+        scores: np.array
+            candidate scores of shape (k,), higher is better
+        shape: tuple
+            (height, width) of the image
+        grid: tuple
+            (rows, cols) of the buckets
+        count: int
+            number of points to select
+
+    Returns: np.array
+        selected points of shape (<= count, 2), best first within a cell
+    """
+    rows, cols = grid
+    row = np.minimum((points[:, 1] * rows / shape[0]).astype(np.intp), rows - 1)
+    col = np.minimum((points[:, 0] * cols / shape[1]).astype(np.intp), cols - 1)
+    cell = row * cols + col
+    order = np.lexsort((-scores, cell))
+    cell = cell[order]
+    starts = np.searchsorted(cell, cell, side='left')
+    rank = np.arange(len(cell)) - starts  # position of each candidate within its cell
+    per_cell = max(1, -(-count // (rows * cols)))
+    chosen = order[rank < per_cell]
+    if len(chosen) < count:  # sparse cells leave room for the next best candidates
+        extra = order[rank >= per_cell]
+        extra = extra[np.argsort(-scores[extra], kind='stable')][:count - len(chosen)]
+        chosen = np.concatenate([chosen, extra])
+    else:
+        chosen = chosen[np.argsort(-scores[chosen], kind='stable')][:count]
+    return points[chosen]
+
 
 if __name__ == '__main__':
     msg = 'Algorithm Module of Visual odometry package.'
-    print(f'{msg}')
\ No newline at end of file
+    print(f'{msg}')
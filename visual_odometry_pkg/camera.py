@@ -11,33 +11,21 @@
 # ==================================================================================================================== #
 # Import Section
 # ==================================================================================================================== #
+import os
+import json
+import hashlib
 import logging
+import threading
 import numpy as np
-from typing import Any, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from .metrics import default_metrics
 
 # ==================================================================================================================== #
 # Logger setup section
 # ==================================================================================================================== #
 log = logging.getLogger(__name__)
 
-file_handler = logging.FileHandler('./logs/camera.log')
-log_formatter = logging.Formatter('%(asctime)s : %(levelname)s : %(name)s :->%(message)s')
-
-stream_formatter = logging.Formatter('%(levelname)s: %(name)s :->%(message)s')
-stream_handler = logging.StreamHandler()
-stream_handler.setFormatter(stream_formatter)
-
-log.addHandler(file_handler)
-log.addHandler(stream_handler)
-
-log.setLevel(logging.DEBUG)
-
-log.info('\n# -------------------------------- #')
-log.info('# -----> *** New Record *** <----- #')
-log.info('# -------------------------------- #')
-
-file_handler.setFormatter(log_formatter)
-
 
 # ==================================================================================================================== #
 # Class Definition
@@ -57,9 +45,13 @@ class Camera:
         self.cy = None  # vertical principal point in pixels
         self.LUT = None  # undistortion lookup table
         self.G_camera_image = None
+        self.model_hash = None  # content hash of the model files, set when read through a cache
+        self.cache_dir = None  # on-disk cache folder of this model, if any
 
+    @default_metrics.timed('read_camera_model')
     def read_camera_model(self, model_dir: str, intrinsic_filename: str = 'intrinsic_parameters.txt',
-                          lut_filename: str = 'lut.bin') -> Tuple[Any, Any, Any, Any, Any, Any]:
+                          lut_filename: str = 'lut.bin', mmap: bool = False,
+                          cache_dir: str = None) -> Tuple[Any, Any, Any, Any, Any, Any]:
         """
         Reads the camera parameters from text file/ bin
 
@@ -68,6 +60,12 @@ class Camera:
             intrinsic_filename: string
             model_dir: string
                 Path to the model folder from root of the project.
+            mmap: bool
+                memory-map lut.bin read-only instead of reading it into memory
+            cache_dir: string
+                folder of the camera model cache. The LUT is stored there once in a contiguous (w x h, 2) .npy,
+                keyed by a content hash of the intrinsic and LUT files, and memory-mapped on every later read so
+                all the processes share one page-cache copy.
 
         Returns: list
             returns a list of internal camera parameters
@@ -85,26 +83,28 @@ class Camera:
 
         """
 
-        log.debug(f' Camera.read_camera_model() invoked ..!')
         # ---> Stage 01: Read Intrinsic Parameters <--- #
         intrinsics = np.loadtxt(model_dir + intrinsic_filename)
         self.fx = intrinsics[0, 0]
         self.fy = intrinsics[0, 1]
         self.cx = intrinsics[0, 2]
         self.cy = intrinsics[0, 3]
-        log.debug(f' Stage 01: Completed Successfully..!')
 
         # Stage 02: 4x4 matrix that transforms x-forward coordinate frames at camera origin and
         #           image frame for specific lens
         self.G_camera_image = intrinsics[1:5, 0:4]
-        log.debug(f' Stage 02: Completed Successfully..!')
 
         # ---> Stage 03: Read LUT for undistort the image <--- #
-        lut = np.fromfile(model_dir + lut_filename, np.double)
-        lut = lut.reshape([2, lut.size // 2])
-        self.LUT = lut.T
-        log.debug(f' Stage 03: Completed Successfully..!')
-        log.debug(f' Exiting read_camera_model()..!')
+        if cache_dir is not None:
+            self.LUT = self._read_cached_lut(model_dir + intrinsic_filename, model_dir + lut_filename, cache_dir)
+        else:
+            self.model_hash = self.cache_dir = None
+            if mmap:
+                lut = np.memmap(model_dir + lut_filename, np.double, mode='r')
+            else:
+                lut = np.fromfile(model_dir + lut_filename, np.double)
+            lut = lut.reshape([2, lut.size // 2])
+            self.LUT = lut.T
         return self.fx, self.fy, self.cx, self.cy, self.G_camera_image, self.LUT
 
     def get_camera_model(self) -> Tuple[Any, Any, Any, Any, Any, Any]:
@@ -115,9 +115,231 @@ class Camera:
             Returns the intrinsic parameters and undistortion lookup table (LUT)
 
         """
-        log.debug(f' Camera.get_camera_model() invoked ..!')
         return self.fx, self.fy, self.cx, self.cy, self.G_camera_image, self.LUT
 
+    def _read_cached_lut(self, intrinsic_path: str, lut_path: str, cache_dir: str) -> np.array:
+        """
+        Memory-maps the contiguous LUT from the cache, building the cache entry first if it is missing or stale.
+        """
+        self.model_hash = model_hash(intrinsic_path, lut_path, cache_dir)
+        self.cache_dir = os.path.join(cache_dir, self.model_hash)
+        cached = os.path.join(self.cache_dir, 'lut.npy')
+        if not os.path.isfile(cached):
+            log.debug(f' Building camera model cache {self.cache_dir}')
+            lut = np.fromfile(lut_path, np.double)
+            _atomic_save(cached, np.ascontiguousarray(lut.reshape([2, lut.size // 2]).T))
+        return np.load(cached, mmap_mode='r')
+
+    def remap_tables(self, shape: Tuple[int, int]) -> Tuple[np.array, np.array]:
+        """
+        Returns the fixed-point cv.remap() tables (map1, map2) of the LUT for frames of the given shape.
+
+        When the model was read through a cache the tables are stored next to the cached LUT on first use and
+        memory-mapped afterwards, otherwise they are computed on every call.
+
+        Args:
+            shape: tuple
+                (height, width) of the frames
+
+        Returns: Tuple
+            map1 (h, w, 2) int16 and map2 (h, w) uint16 tables
+        """
+        if self.LUT is None:
+            raise ValueError('Camera model is not read yet, call read_camera_model() first')
+        from .data_preprocessor import lut_to_maps
+        if self.cache_dir is None:
+            return lut_to_maps(self.LUT, shape)
+
+        paths = [os.path.join(self.cache_dir, f'{name}_{shape[0]}x{shape[1]}.npy') for name in ('map1', 'map2')]
+        if not all(os.path.isfile(path) for path in paths):
+            for path, table in zip(paths, lut_to_maps(self.LUT, shape)):
+                _atomic_save(path, table)
+        return tuple(np.load(path, mmap_mode='r') for path in paths)
+
+
+class CameraRegistry:
+    """
+    A thread-safe registry of the camera models of a rig, shared by every pipeline of the process.
+
+    Models are read lazily on first use and returned as the same Camera object afterwards. The in-memory LUTs are kept
+    under a memory budget by evicting the least recently used models; memory-mapped LUTs live in the page cache and
+    are not counted.
+    """
+
+    def __init__(self, memory_budget: int = None, mmap: bool = False, cache_dir: str = None):
+        """
+        Args:
+            memory_budget: int
+                maximum bytes of in-memory LUTs kept by the registry, unlimited if None
+            mmap: bool
+                memory-map the LUTs (see Camera.read_camera_model)
+            cache_dir: string
+                camera model cache folder (see Camera.read_camera_model)
+        """
+        self.memory_budget = memory_budget
+        self.mmap = mmap
+        self.cache_dir = cache_dir
+        self._models = {}  # name -> (model_dir, intrinsic_filename, lut_filename)
+        self._cameras = OrderedDict()  # name -> Camera, least recently used first
+        self._lock = threading.RLock()
+        self._loading = {}  # name -> lock held while the model is read
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, name: str, model_dir: str, intrinsic_filename: str = 'intrinsic_parameters.txt',
+                 lut_filename: str = 'lut.bin') -> None:
+        """
+        Registers a camera model folder under a name, nothing is read until the camera is requested.
+        """
+        with self._lock:
+            if name in self._models and self._models[name] != (model_dir, intrinsic_filename, lut_filename):
+                self._cameras.pop(name, None)
+            self._models[name] = (model_dir, intrinsic_filename, lut_filename)
+
+    def names(self) -> list:
+        """
+        Returns: list
+            names of the registered cameras
+        """
+        with self._lock:
+            return list(self._models)
+
+    def get(self, name: str) -> Camera:
+        """
+        Returns the camera of a registered name, or of a model folder path which is registered under its own path.
+        The model is read on the first request and shared afterwards.
+        """
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = (name, 'intrinsic_parameters.txt', 'lut.bin')
+            if name in self._cameras:
+                self._cameras.move_to_end(name)
+                return self._cameras[name]
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            with self._lock:
+                if name in self._cameras:
+                    self._cameras.move_to_end(name)
+                    return self._cameras[name]
+                model_dir, intrinsic_filename, lut_filename = self._models[name]
+            log.debug(f' CameraRegistry loading {name}')
+            camera = Camera()
+            camera.read_camera_model(model_dir, intrinsic_filename, lut_filename, self.mmap, self.cache_dir)
+            with self._lock:
+                self._cameras[name] = camera
+                self._loading.pop(name, None)
+                self.loads += 1
+                self._evict(keep=name)
+            default_metrics.increment('camera_loads')
+        return camera
+
+    def extrinsics(self) -> Dict[str, np.array]:
+        """
+        Returns: dict
+            G_camera_image of every registered camera, read from the intrinsic files without loading the LUTs
+        """
+        with self._lock:
+            models = dict(self._models)
+            cameras = dict(self._cameras)
+        return {name: cameras[name].G_camera_image if name in cameras
+                else np.loadtxt(model_dir + intrinsic_filename)[1:5, 0:4]
+                for name, (model_dir, intrinsic_filename, _) in models.items()}
+
+    def memory_used(self) -> int:
+        """
+        Returns: int
+            bytes of in-memory (not memory-mapped) LUTs held by the registry
+        """
+        with self._lock:
+            return sum(_lut_bytes(camera) for camera in self._cameras.values())
+
+    def evict(self, name: str) -> None:
+        """
+        Drops the loaded model of a camera, it is read again on the next request.
+        """
+        with self._lock:
+            if self._cameras.pop(name, None) is not None:
+                self.evictions += 1
+                default_metrics.increment('camera_evictions')
+
+    def _evict(self, keep: str) -> None:
+        if self.memory_budget is None:
+            return
+        for name in list(self._cameras):
+            if self.memory_used() <= self.memory_budget:
+                break
+            if name != keep:
+                log.debug(f' CameraRegistry evicting {name}')
+                self.evict(name)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def _lut_bytes(camera: Camera) -> int:
+    """
+    Bytes of the LUT of a camera held in memory, 0 when it is memory-mapped.
+    """
+    lut = camera.LUT
+    if lut is None or isinstance(lut, np.memmap) or isinstance(lut.base, np.memmap):
+        return 0
+    return lut.nbytes
+
+
+def model_hash(intrinsic_path: str, lut_path: str, cache_dir: str = None) -> str:
+    """
+    Content hash (sha1) of the intrinsic parameters and LUT files.
+
+    Hashing a large LUT on every start is avoided with a sources.json in cache_dir that remembers the hash of each
+    file pair along with their sizes and modification times; the files are re-hashed only when these change.
+
+    Args:
+        intrinsic_path: string
+        lut_path: string
+        cache_dir: string
+            optional cache folder holding sources.json
+
+    Returns: string
+        hex digest
+    """
+    stamp = [[os.path.getsize(path), os.stat(path).st_mtime_ns] for path in (intrinsic_path, lut_path)]
+    key = os.path.abspath(intrinsic_path) + '|' + os.path.abspath(lut_path)
+    sources_path = os.path.join(cache_dir, 'sources.json') if cache_dir is not None else None
+    sources = {}
+    if sources_path is not None and os.path.isfile(sources_path):
+        try:
+            with open(sources_path) as file:
+                sources = json.load(file)
+        except ValueError:
+            sources = {}
+        if key in sources and sources[key]['stamp'] == stamp:
+            return sources[key]['hash']
+
+    digest = hashlib.sha1()
+    for path in (intrinsic_path, lut_path):
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+    if sources_path is not None:
+        sources[key] = {'stamp': stamp, 'hash': digest.hexdigest()}
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = f'{sources_path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(sources, file)
+        os.replace(temporary, sources_path)
+    return digest.hexdigest()
+
+
+def _atomic_save(path: str, array: np.array) -> None:
+    """
+    Saves an array as .npy through a temporary file so concurrent readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp.npy'
+    np.save(temporary, array)
+    os.replace(temporary, path)
+
 
 if __name__ == '__main__':
     msg = 'Camera Module of Visual odometry package.'
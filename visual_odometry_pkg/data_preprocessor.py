@@ -11,36 +11,29 @@
 # ==================================================================================================================== #
 # Import Section
 # ==================================================================================================================== #
-import glob
+import time
+import queue
 import logging
+import threading
 import cv2 as cv
 import numpy as np
 import concurrent.futures as cf
-from collections import Iterator
-from scipy.ndimage import map_coordinates as interp2
+from collections import deque
+from typing import Any, Callable, Iterator, Tuple
+from .metrics import default_metrics
+from .manifest import list_frames
 
 # ==================================================================================================================== #
 # Logger setup section
 # ==================================================================================================================== #
 log = logging.getLogger(__name__)
 
-file_handler = logging.FileHandler('./logs/data_preprocessor.log')
-log_formatter = logging.Formatter('%(asctime)s : %(levelname)s : %(name)s :->%(message)s')
-
-stream_formatter = logging.Formatter('%(levelname)s: %(name)s :->%(message)s')
-stream_handler = logging.StreamHandler()
-stream_handler.setFormatter(stream_formatter)
-
-log.addHandler(file_handler)
-log.addHandler(stream_handler)
-
-log.setLevel(logging.DEBUG)
-
-log.info('\n# -------------------------------- #')
-log.info('# -----> *** New Record *** <----- #')
-log.info('# -------------------------------- #')
-
-file_handler.setFormatter(log_formatter)
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+BAYER_CODES = {'bg': cv.COLOR_BAYER_BG2BGR, 'gb': cv.COLOR_BAYER_GB2BGR,
+               'rg': cv.COLOR_BAYER_RG2BGR, 'gr': cv.COLOR_BAYER_GR2BGR}
+TIMINGS_KEPT = 1024  # latest per-frame timings kept for the stats, so long streams run in bounded memory
 
 
 # ==================================================================================================================== #
@@ -57,7 +50,9 @@ class DataPreprocessor:
         pass
 
     @staticmethod
-    def undistort_image(image: np.array, lut: np.array) -> np.array:
+    @default_metrics.timed('undistort')
+    def undistort_image(image: np.array, lut: np.array, out: np.array = None, workers: int = 1,
+                        roi: Tuple[int, int, int, int] = None) -> np.array:
         """
 
         Takes an distorted image and undistort it.
@@ -67,56 +62,129 @@ class DataPreprocessor:
                 Undistortion lookup table
             image: np.array
                 input color image of shape (m, n, 3)
+            out: np.array
+                optional output buffer of the output shape and the image dtype, allocated when not given
+            workers: int
+                number of threads, the output is split into as many row bands, each interpolated on its own thread
+                (scipy releases the GIL while interpolating)
+            roi: tuple
+                (x, y, width, height) crop of the undistorted image to compute, the whole image if None
 
         Returns: np.array
+            The undistorted image (or its roi crop), which is out when it is given
 
+        Note:
+            The LUT is re-interpreted on every call, use Undistorter when the same camera undistorts many frames.
+
+        """
+        from scipy.ndimage import map_coordinates as interp2  # deferred, scipy.ndimage is slow to import
+        rows, columns = _roi_slices(roi, image.shape[:2])
+        reshaped_lut = lut[:, 1::-1].T.reshape((2, image.shape[0], image.shape[1]))[:, rows, columns]
+        shape = reshaped_lut.shape[1:] + image.shape[2:]
+        if out is None:
+            out = np.empty(shape, image.dtype)
+        elif out.shape != shape or out.dtype != image.dtype:
+            raise ValueError(f'Output buffer {out.shape}, {out.dtype} does not match the output {shape}, {image.dtype}')
+
+        def band(job: Tuple[int, int, int]) -> None:
+            start, stop, channel = job
+            interp2(image[:, :, channel], reshaped_lut[:, start:stop], output=out[start:stop, :, channel], order=1)
+
+        jobs = [(start, stop, channel) for start, stop in row_bands(shape[0], workers)
+                for channel in range(0, image.shape[2])]
+        if workers > 1:
+            list(_band_executor(workers).map(band, jobs))
+        else:
+            for job in jobs:
+                band(job)
+        return out
+
+    @staticmethod
+    @default_metrics.timed('decode')
+    def imread(file: str, flags: int = 0, out: np.array = None) -> np.array:
+        """
+        Reads an image file, decoding it straight into out when the image fits it
+        Args:
+            file: string
+                image filename
+            flags: int
+                cv.imread() flags, 0 reads the raw single channel (bayer) image
+            out: np.array
+                optional buffer to decode into, a new array is returned when the image does not match its shape
+        Returns: np.array
+            The decoded image (out when it was used), None if the file cannot be read
         """
-        log.debug(f' DataPreprocessor.undistort_image() invoked..!')
-        reshaped_lut = lut[:, 1::-1].T.reshape((2, image.shape[0], image.shape[1]))
-        undistorted = np.rollaxis(np.array([interp2(image[:, :, channel], reshaped_lut, order=1)
-                                            for channel in range(0, image.shape[2])]), 0, 3)
-        log.debug(f' Exiting undistort_image()..!')
-        return undistorted.astype(image.dtype)
+        return imread(file, flags, out)
 
     @staticmethod
-    def load_frames(files: list) -> Iterator:
+    def load_frames(files: list, read_ahead: int = 8, workers: int = 4, pool: 'FramePool' = None) -> Iterator:
         """
         Loads the frames from the files list
         Args:
             files: list
                 list of filenames
-        Returns: list
-            Returns a list of keyframes
+            read_ahead: int
+                maximum number of decoded frames held ahead of the consumer
+            workers: int
+                number of decode threads
+            pool: FramePool
+                optional buffer pool, frames are then decoded into recycled buffers
+        Returns: FrameStream
+            Returns a lazy iterator over the keyframes, decoded in the background with bounded memory
         """
-        log.debug(f' DataProcessor.load_frames() invoked..!')
-        with cf.ThreadPoolExecutor() as executor:
-            frames_array = executor.map(lambda x: cv.imread(x, 0), files)
-        log.debug(f' Exiting load_frames() successfully..!')
-        return frames_array
+        return FrameStream(files, read_ahead=read_ahead, workers=workers, pool=pool)
 
     @staticmethod
-    def frames_to_video(source: str, destination: str, file_format: str = 'DIVX', fps: int = 12) -> None:
+    @default_metrics.timed('frames_to_video')
+    def frames_to_video(source: str, destination: str, file_format: str = 'DIVX', fps: int = 12,
+                        bayer_pattern: str = 'gr', undistorter: 'Undistorter' = None, start: int = 0, stop: int = None,
+                        stride: int = 1, workers: Tuple = (2, 2, 2), buffers: int = 8,
+                        pool: 'FramePool' = None) -> dict:
         """
         If a data is presented in frames it can be converted into a video file.
 
+        The frames are streamed through a PreprocessPipeline, so decoding, demosaicing and the optional undistortion
+        overlap with the video writer and at most buffers frames are held in memory.
+
         Args:
             fps: int
                 number of frames per second for output video
             file_format: string
                 file format specifier (supports .divx alone at the moment)
-            source: string
-                source folder path
+            source: string or FrameManifest
+                source folder path, or manifest of the source folder
             destination: string
                 desired destination folder path
+            bayer_pattern: string
+                bayer pattern of the frames ('bg', 'gb', 'rg', 'gr')
+            undistorter: Undistorter
+                optional undistorter, frames are written undistorted (at its output size, e.g. its roi) when given.
+                Frames are resized first for an undistorter built for reduced frames (from_camera(scale=...)).
+            start, stop, stride: int
+                frame range and step, e.g. stride=10 writes every 10th frame for a subsampled preview
+            workers: tuple
+                number of worker threads for the decode, demosaic and undistort stages
+            buffers: int
+                number of frames in flight
+            pool: FramePool
+                optional buffer pool the pipeline buffers are taken from and returned to
 
-        Returns: None
+        Returns: dict
+            frames written, elapsed seconds, frames/sec and the per-stage timings, None if the format is not supported
         """
-        log.debug(f' DataPreprocessor.frames_to_video() invoked..!')
         # ---> Step 01: Load file names and extract image details <--- #
-        files = sorted(glob.glob(source + '*.png'))
+        files = list_frames(source)[start:stop:stride]
         height, width = cv.imread(files[0], 0).shape
+        scale = None
+        if undistorter is not None:
+            # ---> Undistorters built for reduced frames get the frames resized first, roi crops shrink it <--- #
+            if undistorter.shape != (height, width):
+                scale = undistorter.shape[0] / height
+                if scaled_shape((height, width), scale) != undistorter.shape:
+                    raise ValueError(f'Undistorter of shape {undistorter.shape} does not fit frames of shape '
+                                     f'{(height, width)}')
+            height, width = undistorter.output_shape
         size = (width, height)
-        log.debug(f' Step 01: Completed Successfully..!')
 
         # ---> Step 02: Setup the video writer <--- #
         if file_format == 'DIVX' or file_format == 'divx':
@@ -127,75 +195,1034 @@ class DataPreprocessor:
             video_out = cv.VideoWriter(destination + 'out.mp4', cv.VideoWriter_fourcc(*'MJPG'), fps, size)
         else:
             log.info('Video Format provided is not supported at the moment.')
-            return
-        log.debug(f' Step 02: Completed Successfully..!')
+            return None
 
-        # ---> Step 03: Load the Images using threading <--- #
-        with cf.ThreadPoolExecutor() as executor:
-            frames_array = executor.map(lambda x: cv.cvtColor(cv.imread(x, 0), cv.COLOR_BAYER_GR2BGR), files)
-        log.debug(f' Step 03: Completed Successfully..!')
+        # ---> Step 03: Stream the frames through the preprocessing pipeline <--- #
+        pipeline = PreprocessPipeline.from_config(undistorter, bayer_pattern, workers, buffers, pool, scale)
 
-        # ---> Step 04: Convert and write frames to video <--- #
-        for keyframe in frames_array:
-            video_out.write(keyframe)
-        video_out.release()
-        log.debug(f' Step 04: Completed Successfully..!')
-        log.debug(f' Exiting DataPreprocessor.frames_to_video()..!')
+        # ---> Step 04: Write frames to video as they come out of the pipeline <--- #
+        begin = time.perf_counter()
+        try:
+            for keyframe in pipeline.run(files):
+                if keyframe.shape[:2] != (height, width):
+                    # ---> OpenCV silently drops frames that do not match the writer size <--- #
+                    raise ValueError(f'Frame of shape {keyframe.shape[:2]} does not match the video size '
+                                     f'{(height, width)}')
+                with default_metrics.timer('encode'):
+                    video_out.write(keyframe)
+        finally:
+            video_out.release()
+        elapsed = time.perf_counter() - begin
+        return {'frames': pipeline.frames, 'seconds': elapsed, 'fps': pipeline.frames / elapsed if elapsed else 0.0,
+                'stage_ms': pipeline.stats()['stage_ms']}
 
     @staticmethod
-    def convert_bayer_bg2bgr(bayer_image: np.array) -> np.array:
+    @default_metrics.timed('demosaic')
+    def convert_bayer(bayer_image: np.array, pattern: str = 'gr', out: np.array = None) -> np.array:
+        """
+        Convert a Bayer image of the given pattern to bgr
+        Args:
+            bayer_image: np.array
+                input bayer image
+            pattern: string
+                bayer pattern, one of 'bg', 'gb', 'rg' or 'gr'
+            out: np.array
+                optional (m, n, 3) output buffer of the bayer image dtype
+        Returns:
+            BGR Image
+        """
+        return cv.cvtColor(bayer_image, bayer_code(pattern), dst=out)
+
+    @staticmethod
+    @default_metrics.timed('demosaic')
+    def convert_bayer_bg2bgr(bayer_image: np.array, out: np.array = None) -> np.array:
         """
         Convert Bayer BG image to bgr
         Args:
             bayer_image: np.array
                 input bayer image
+            out: np.array
+                optional (m, n, 3) output buffer of the bayer image dtype
         Returns:
             BGR Image
         """
-        log.debug(f' DataPreprocessor.convert_bayer_bg2bgr() invoked..!')
-        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_BG2BGR)
+        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_BG2BGR, dst=out)
 
     @staticmethod
-    def convert_bayer_gb2bgr(bayer_image: np.array) -> np.array:
+    @default_metrics.timed('demosaic')
+    def convert_bayer_gb2bgr(bayer_image: np.array, out: np.array = None) -> np.array:
         """
         Convert Bayer GB image to bgr
         Args:
             bayer_image: np.array
                 input bayer array
+            out: np.array
+                optional (m, n, 3) output buffer of the bayer image dtype
 
         Returns:
             BGR Image
         """
-        log.debug(f' DataPreprocessor.convert_bayer_gb2bgr() invoked..!')
-        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_GB2BGR)
+        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_GB2BGR, dst=out)
 
     @staticmethod
-    def convert_bayer_rg2bgr(bayer_image: np.array) -> np.array:
+    @default_metrics.timed('demosaic')
+    def convert_bayer_rg2bgr(bayer_image: np.array, out: np.array = None) -> np.array:
         """
         Convert Bayer RG image to bgr
         Args:
             bayer_image: np.array
                 input bayer array
+            out: np.array
+                optional (m, n, 3) output buffer of the bayer image dtype
 
         Returns:
             BGR Image
         """
-        log.debug(f' DataPreprocessor.convert_bayer_RG2bgr() invoked..!')
-        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_RG2BGR)
+        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_RG2BGR, dst=out)
 
     @staticmethod
-    def convert_bayer_gr2bgr(bayer_image: np.array) -> np.array:
+    @default_metrics.timed('demosaic')
+    def convert_bayer_gr2bgr(bayer_image: np.array, out: np.array = None) -> np.array:
         """
         Convert Bayer GR image to bgr
         Args:
             bayer_image: np.array
                 input bayer array
+            out: np.array
+                optional (m, n, 3) output buffer of the bayer image dtype
 
         Returns:
             BGR Image
         """
-        log.debug(f' DataPreprocessor.convert_bayer_GR2bgr() invoked..!')
-        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_GR2BGR)
+        return cv.cvtColor(bayer_image, cv.COLOR_BAYER_GR2BGR, dst=out)
+
+
+def bayer_code(pattern: str) -> int:
+    """
+    Maps a bayer pattern name ('bg', 'gb', 'rg', 'gr', case insensitive) to its OpenCV demosaic conversion code.
+    """
+    try:
+        return BAYER_CODES[pattern.lower()]
+    except KeyError:
+        raise ValueError(f'Unknown bayer pattern {pattern!r}, expected one of {sorted(BAYER_CODES)}') from None
+
+
+def lut_to_maps(lut: np.array, shape: Tuple[int, int], fixed_point: bool = True) -> Tuple[np.array, np.array]:
+    """
+    Converts an undistortion LUT of shape (w x h, 2) into cv.remap() tables for frames of shape (height, width).
+
+    Returns: Tuple
+        fixed-point (map1 int16 (h, w, 2), map2 uint16 (h, w)) tables, or float32 (map_x, map_y) when fixed_point is
+        False
+    """
+    height, width = shape[0], shape[1]
+    if lut.shape[0] != height * width:
+        raise ValueError(f'LUT of {lut.shape[0]} entries does not match a frame of shape {(height, width)}')
+    map_x = lut[:, 0].reshape((height, width)).astype(np.float32)
+    map_y = lut[:, 1].reshape((height, width)).astype(np.float32)
+    if fixed_point:
+        return cv.convertMaps(map_x, map_y, cv.CV_16SC2)
+    return map_x, map_y
+
+
+def scaled_shape(shape: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    """
+    Returns the (height, width) of a frame of shape (height, width) resized by scale, at least one pixel each.
+    """
+    return max(1, int(round(shape[0] * scale))), max(1, int(round(shape[1] * scale)))
+
+
+def downscale_lut(lut: np.array, shape: Tuple[int, int], scale: float) -> Tuple[np.array, Tuple[int, int]]:
+    """
+    Derives the LUT undistorting frames resized by scale from the LUT of full resolution frames of shape
+    (height, width). Each output pixel takes the mean source coordinate of the full resolution pixels it covers,
+    mapped into the resized frame.
+
+    Returns: Tuple
+        (LUT of shape (w x h, 2) of the resized frames, (height, width) of the resized frames)
+    """
+    height, width = shape[0], shape[1]
+    if lut.shape[0] != height * width:
+        raise ValueError(f'LUT of {lut.shape[0]} entries does not match a frame of shape {(height, width)}')
+    if not 0 < scale <= 1:
+        raise ValueError(f'LUT scale must be in (0, 1], got {scale}')
+    small = scaled_shape(shape, scale)
+    coordinates = [cv.resize(lut[:, axis].reshape((height, width)).astype(np.float32), (small[1], small[0]),
+                             interpolation=cv.INTER_AREA) for axis in range(2)]
+    # ---> Pixel centres: full resolution u maps to (u + 0.5) * s - 0.5 in the resized frame <--- #
+    ratios = (small[1] / width, small[0] / height)
+    small_lut = np.stack([(coordinates[axis] + 0.5) * ratios[axis] - 0.5 for axis in range(2)], axis=-1)
+    return small_lut.reshape(-1, 2), small
+
+
+def row_bands(height: int, count: int) -> list:
+    """
+    Splits the rows [0, height) into count contiguous (start, stop) bands of near equal height.
+    """
+    edges = np.linspace(0, height, max(1, min(count, height)) + 1).astype(int)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def central_roi(shape: Tuple[int, int], fraction: float = 0.5) -> Tuple[int, int, int, int]:
+    """
+    Returns the (x, y, width, height) roi covering the central fraction of the width and height of a frame.
+    """
+    height, width = max(1, int(shape[0] * fraction)), max(1, int(shape[1] * fraction))
+    return (shape[1] - width) // 2, (shape[0] - height) // 2, width, height
+
+
+def _roi_slices(roi: Tuple[int, int, int, int], shape: Tuple[int, int]) -> Tuple[slice, slice]:
+    if roi is None:
+        return slice(0, shape[0]), slice(0, shape[1])
+    x, y, width, height = roi
+    if x < 0 or y < 0 or width < 1 or height < 1 or x + width > shape[1] or y + height > shape[0]:
+        raise ValueError(f'ROI {tuple(roi)} does not fit a frame of shape {tuple(shape[:2])}')
+    return slice(y, y + height), slice(x, x + width)
+
+
+_band_executors = {}
+_band_lock = threading.Lock()
+
+
+def _band_executor(workers: int) -> cf.ThreadPoolExecutor:
+    """
+    Process-wide thread pool of the given size for the row band jobs, created on first use.
+    """
+    with _band_lock:
+        if workers not in _band_executors:
+            _band_executors[workers] = cf.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='undistort')
+        return _band_executors[workers]
+
+
+def video_frames(path: str) -> Iterator[np.array]:
+    """
+    Yields the frames of a video file in order, decoded one at a time.
+
+    Args:
+        path: string
+            path to the video file
+
+    Returns: Iterator
+        bgr frames
+    """
+    video = cv.VideoCapture(path)
+    if not video.isOpened():
+        raise IOError(f'Cannot open video file {path}')
+    try:
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                return
+            yield frame
+    finally:
+        video.release()
+
+
+def imread(file: str, flags: int = 0, out: np.array = None) -> np.array:
+    """
+    cv.imread() decoding straight into out when the image fits it, untimed; see DataPreprocessor.imread().
+    """
+    if out is None:
+        return cv.imread(file, flags)
+    if not cv.haveImageReader(file):  # cv.imread() would leave out untouched instead of failing
+        return None
+    try:
+        return cv.imread(file, out, flags)
+    except cv.error:  # the image does not fit the buffer
+        return cv.imread(file, flags)
+
+
+class FramePool:
+    """
+
+    Thread-safe pool of reusable frame buffers, keyed by shape and dtype.
+
+    Streaming loaders acquire the buffer of a frame from the pool and release it once the frame is consumed, so after
+    the first few frames of a sequence no frame memory is allocated any more. New buffers are touched on allocation, so
+    their pages are faulted in once instead of in the middle of a decode.
+
+    """
+
+    def __init__(self, max_free: int = 64):
+        """
+        Args:
+            max_free: int
+                maximum number of idle buffers kept per (shape, dtype), extra released buffers are dropped
+        """
+        self.max_free = max_free
+        self.requests = 0
+        self.hits = 0
+        self.allocations = 0
+        self.in_use = 0
+        self.high_water = 0
+        self._free = {}
+        self._outstanding = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: tuple, dtype: np.dtype = np.uint8) -> np.array:
+        """
+        Returns an idle buffer of the given shape and dtype, allocating one when none is free. The content is undefined.
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            self.requests += 1
+            free = self._free.get(key)
+            buffer = free.pop() if free else None
+            if buffer is not None:
+                self.hits += 1
+            else:
+                self.allocations += 1
+            self.in_use += 1
+            self.high_water = max(self.high_water, self.in_use)
+        if buffer is None:
+            buffer = np.empty(key[0], key[1])
+            buffer.fill(0)
+        with self._lock:
+            self._outstanding.add(id(buffer))
+        return buffer
+
+    def release(self, buffer: np.array) -> None:
+        """
+        Returns a buffer to the pool. Buffers not acquired from the pool (e.g. decoded by cv.imread()) are adopted, so
+        they serve later requests of the same shape and dtype.
+        """
+        if buffer is None or not isinstance(buffer, np.ndarray) or not buffer.flags.c_contiguous or \
+                buffer.base is not None:
+            return
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            if id(buffer) in self._outstanding:
+                self._outstanding.discard(id(buffer))
+                self.in_use -= 1
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free and all(item is not buffer for item in free):
+                free.append(buffer)
+
+    def clear(self) -> None:
+        """
+        Drops every idle buffer.
+        """
+        with self._lock:
+            self._free.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            requests, hit rate, allocations made and avoided, buffers in use, their high-water mark, and the idle
+            buffers and bytes held
+        """
+        with self._lock:
+            idle = [buffer for free in self._free.values() for buffer in free]
+            return {'requests': self.requests, 'hits': self.hits,
+                    'hit_rate': self.hits / self.requests if self.requests else 0.0,
+                    'allocations': self.allocations, 'allocations_avoided': self.hits, 'in_use': self.in_use,
+                    'high_water': self.high_water, 'idle': len(idle),
+                    'idle_bytes': int(sum(buffer.nbytes for buffer in idle))}
+
+
+class FrameStream:
+    """
+
+    Streaming frame source that yields decoded frames in file order.
+
+    At most read_ahead frames are decoded ahead of the consumer by a fixed pool of decode threads, new decodes are only
+    scheduled as frames are consumed, so memory stays bounded and decoding overlaps with the downstream processing.
+
+    With a FramePool the frames are decoded into pooled buffers and a yielded frame is recycled when the next one is
+    requested (or the stream is closed), so copy it to keep it.
+
+    """
+
+    def __init__(self, files: list, read_ahead: int = 8, workers: int = 4, flags: int = 0,
+                 loader: Callable[[str], np.array] = None, pool: FramePool = None):
+        """
+        Args:
+            files: list
+                list of filenames in the order they are yielded
+            read_ahead: int
+                maximum number of frames decoded or in flight ahead of the consumer
+            workers: int
+                number of decode threads
+            flags: int
+                cv.imread() flags, 0 reads the raw single channel (bayer) image
+            loader: callable
+                optional replacement for cv.imread(file, flags)
+            pool: FramePool
+                optional pool the frames are decoded into and recycled through, needs the default loader
+        """
+        if read_ahead < 1 or workers < 1:
+            raise ValueError('read_ahead and workers must be at least 1')
+        if pool is not None and loader is not None:
+            raise ValueError('A frame pool decodes with cv.imread() and cannot be combined with a custom loader')
+        self.files = list(files)
+        self.read_ahead = read_ahead
+        self.flags = flags
+        self.pool = pool
+        self.loader = loader if loader is not None else (lambda file: cv.imread(file, flags))
+        self.decode_times = deque(maxlen=TIMINGS_KEPT)  # latest per-frame decode latencies in seconds, in yield order
+        self.frames = 0  # frames yielded
+        self._next_index = 0
+        self._pending = deque()
+        self._closed = False
+        self._spec = None  # (shape, dtype) of the last decoded frame, the shape pooled buffers are acquired with
+        self._yielded = None
+        self._executor = cf.ThreadPoolExecutor(max_workers=min(workers, read_ahead))
+
+    def _decode(self, file: str) -> Tuple[np.array, float]:
+        start = time.perf_counter()
+        if self.pool is None:
+            frame = self.loader(file)
+        elif self._spec is None:
+            frame = imread(file, self.flags)
+        else:
+            buffer = self.pool.acquire(*self._spec)
+            frame = imread(file, self.flags, buffer)
+            if frame is not buffer:
+                self.pool.release(buffer)
+        if self.pool is not None and frame is not None:
+            self._spec = (frame.shape, frame.dtype)
+        latency = time.perf_counter() - start
+        default_metrics.observe('decode', latency)
+        return frame, latency
+
+    def _fill(self) -> None:
+        while len(self._pending) < self.read_ahead and self._next_index < len(self.files):
+            self._pending.append(self._executor.submit(self._decode, self.files[self._next_index]))
+            self._next_index += 1
+
+    def __iter__(self) -> 'FrameStream':
+        return self
+
+    def __next__(self) -> np.array:
+        if self._closed:
+            raise StopIteration
+        self._fill()
+        if not self._pending:
+            self.close()
+            raise StopIteration
+        future = self._pending.popleft()
+        try:
+            frame, latency = future.result()
+        except BaseException:
+            self.close()
+            raise
+        self.decode_times.append(latency)
+        self.frames += 1
+        if self.pool is not None:
+            self.pool.release(self._yielded)
+            self._yielded = frame
+        self._fill()
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __enter__(self) -> 'FrameStream':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Cancels the scheduled decodes and releases the decode threads, safe to call more than once.
+        """
+        if getattr(self, '_closed', True):
+            return
+        self._closed = True
+        for future in self._pending:
+            if not future.cancel() and self.pool is not None:
+                future.add_done_callback(self._recycle)
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.pool is not None:
+            self.pool.release(self._yielded)
+            self._yielded = None
+
+    def _recycle(self, future: cf.Future) -> None:
+        if future.exception() is None:
+            self.pool.release(future.result()[0])
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            frames yielded, frames still buffered and the mean / max per-frame decode latency in milliseconds of the
+            latest TIMINGS_KEPT frames
+        """
+        times = np.asarray(self.decode_times)
+        return {'frames': self.frames, 'buffered': len(self._pending),
+                'decode_ms_mean': float(times.mean() * 1e3) if times.size else 0.0,
+                'decode_ms_max': float(times.max() * 1e3) if times.size else 0.0}
+
+
+class Undistorter:
+    """
+
+    Undistortion engine built once from a camera LUT.
+
+    The LUT is converted into OpenCV remap tables (fixed-point map1/map2 by default) at construction, so each frame is
+    undistorted with a single bilinear cv.remap() call over all the channels, written into a caller-supplied buffer.
+    High-resolution frames can be split into row bands remapped in parallel (cv.remap() releases the GIL), and a roi
+    restricts the tables to the crop that is actually needed.
+
+    """
+
+    def __init__(self, lut: np.array, shape: Tuple[int, int], fixed_point: bool = True, maps: Tuple = None,
+                 bands: int = 1, roi: Tuple[int, int, int, int] = None):
+        """
+        Converts the LUT into remap tables
+
+        Args:
+            lut: np.array
+                Undistortion lookup table of shape (w x h, 2) with a (u, v) pair for each pixel
+            shape: tuple
+                (height, width) of the frames to undistort
+            fixed_point: bool
+                converts the maps into the fixed-point (CV_16SC2, CV_16UC1) form if True, keeps float32 maps otherwise
+            maps: tuple
+                already computed (map1, map2) remap tables of the whole frame, the LUT is not used when given
+            bands: int
+                number of row bands of the output remapped in parallel, one thread per band
+            roi: tuple
+                (x, y, width, height) crop of the undistorted frame to produce, the whole frame if None
+        """
+        height, width = shape[0], shape[1]
+        if bands < 1:
+            raise ValueError('An undistorter needs at least one band')
+        if maps is None:
+            maps = lut_to_maps(lut, shape, fixed_point)
+        rows, columns = _roi_slices(roi, (height, width))
+        if roi is not None:
+            maps = tuple(np.ascontiguousarray(table[rows, columns]) for table in maps)
+        self.map1, self.map2 = maps
+        self.shape = (height, width)
+        self.roi = tuple(roi) if roi is not None else None
+        self.output_shape = (rows.stop - rows.start, columns.stop - columns.start)
+        self.fixed_point = fixed_point
+        self.bands = row_bands(self.output_shape[0], bands)
+
+    @classmethod
+    def from_camera(cls, camera: object, shape: Tuple[int, int], fixed_point: bool = True, bands: int = 1,
+                    roi: Tuple[int, int, int, int] = None, scale: float = 1.0) -> 'Undistorter':
+        """
+        Builds an undistorter from the LUT of an already read camera model
+
+        Args:
+            camera: Camera
+                camera object with the camera model read
+            shape: tuple
+                (height, width) of the full resolution frames of the camera
+            fixed_point: bool
+                use fixed-point remap tables
+            bands: int
+                number of row bands remapped in parallel
+            roi: tuple
+                (x, y, width, height) crop of the undistorted frame to produce, in the scaled frame
+            scale: float
+                undistorts frames resized by scale (see scaled_shape()) with a LUT downscaled from the camera LUT
+
+        Returns: Undistorter
+        """
+        if camera.LUT is None:
+            raise ValueError('Camera model is not read yet, call read_camera_model() first')
+        if scale != 1.0:
+            lut, small = downscale_lut(camera.LUT, shape, scale)
+            return cls(lut, small, fixed_point, bands=bands, roi=roi)
+        if fixed_point and getattr(camera, 'cache_dir', None) is not None:
+            return cls(camera.LUT, shape, fixed_point, maps=camera.remap_tables(shape), bands=bands, roi=roi)
+        return cls(camera.LUT, shape, fixed_point, bands=bands, roi=roi)
+
+    def undistort(self, image: np.array, out: np.array = None) -> np.array:
+        """
+        Undistort an image of shape (m, n) or (m, n, c) with all the channels in one pass.
+
+        Args:
+            image: np.array
+                input distorted image
+            out: np.array
+                optional output buffer of the output shape (the roi shape if one is set) and the image dtype,
+                allocated when not given
+
+        Returns: np.array
+            The undistorted image, which is out when it is given
+        """
+        if image.shape[:2] != self.shape:
+            raise ValueError(f'Image of shape {image.shape[:2]} does not match the undistorter shape {self.shape}')
+        shape = self.output_shape + image.shape[2:]
+        if out is None:
+            out = np.empty(shape, image.dtype)
+        elif out.shape != shape or out.dtype != image.dtype:
+            raise ValueError(f'Output buffer {out.shape}, {out.dtype} does not match the output {shape}, {image.dtype}')
+        with default_metrics.timer('undistort'):
+            if len(self.bands) == 1:
+                cv.remap(image, self.map1, self.map2, cv.INTER_LINEAR, dst=out, borderMode=cv.BORDER_CONSTANT,
+                         borderValue=0)
+            else:
+                # ---> Each band writes its own rows of the shared output <--- #
+                futures = [_band_executor(len(self.bands)).submit(
+                    cv.remap, image, self.map1[start:stop], self.map2[start:stop], cv.INTER_LINEAR, dst=out[start:stop],
+                    borderMode=cv.BORDER_CONSTANT, borderValue=0) for start, stop in self.bands]
+                for future in futures:
+                    future.result()
+        return out
+
+
+class ImagePyramid:
+    """
+
+    Multi-level grayscale image pyramid built once per frame into preallocated buffers.
+
+    Level 0 is the grayscale frame and each following level is cv.pyrDown() of the previous one. The buffers are
+    allocated for a frame shape and overwritten by every build(), the levels are exposed as read-only views so the
+    consumers of a frame (tracking, detection, visualisation) share one pyramid instead of each building its own.
+
+    """
+
+    def __init__(self, shape: Tuple[int, int], levels: int = 4):
+        """
+        Args:
+            shape: tuple
+                (height, width) of the frames
+            levels: int
+                number of levels including the full resolution one, fewer when the frame gets down to one pixel
+        """
+        if levels < 1:
+            raise ValueError('A pyramid needs at least one level')
+        height, width = shape[0], shape[1]
+        self.shape = (height, width)
+        self.max_levels = levels
+        self._buffers = [np.empty((height, width), np.uint8)]
+        while len(self._buffers) < levels and min(height, width) > 1:
+            height, width = (height + 1) // 2, (width + 1) // 2
+            self._buffers.append(np.empty((height, width), np.uint8))
+        self.levels = []
+        for buffer in self._buffers:
+            view = buffer.view()
+            view.flags.writeable = False
+            self.levels.append(view)
+        self.image = None  # frame the pyramid was last built from
+        self.builds = 0
+
+    def build(self, image: np.array) -> 'ImagePyramid':
+        """
+        Builds the pyramid of a grayscale (m, n) or bgr (m, n, 3) uint8 frame.
+
+        Args:
+            image: np.array
+                frame of the pyramid shape
+
+        Returns: ImagePyramid
+            self, with image set to the input frame
+        """
+        if image.shape[:2] != self.shape:
+            raise ValueError(f'Image of shape {image.shape[:2]} does not match the pyramid shape {self.shape}')
+        with default_metrics.timer('pyramid'):
+            if image.ndim == 2:
+                np.copyto(self._buffers[0], image)
+            else:
+                cv.cvtColor(image, cv.COLOR_BGR2GRAY, dst=self._buffers[0])
+            for previous, buffer in zip(self._buffers, self._buffers[1:]):
+                cv.pyrDown(previous, dst=buffer, dstsize=(buffer.shape[1], buffer.shape[0]))
+        self.image = image
+        self.builds += 1
+        return self
+
+    def __getitem__(self, level: int) -> np.array:
+        return self.levels[level]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class SkippedFrame(Exception):
+    """
+    Raised by a pipeline stage to drop a frame from the later stages, the pipeline yields None in its place.
+    """
+
+
+class MotionGate:
+    """
+
+    Cheap motion pre-check deciding which frames are worth a full undistortion and tracking.
+
+    Each frame is reduced to a small INTER_AREA thumbnail and compared with the thumbnail of the last frame let
+    through by their mean absolute difference. Frames below the threshold (vehicle stopped or crawling) are skipped,
+    and every max_skip consecutive skips a frame is let through anyway so the tracks stay fresh. Frames have to be
+    checked in order, the pipeline runs its gate stage on one ordered worker.
+
+    """
+
+    def __init__(self, threshold: float = 1.0, width: int = 64, max_skip: int = 30):
+        """
+        Args:
+            threshold: float
+                mean absolute thumbnail difference, in intensity levels, below which a frame is skipped
+            width: int
+                thumbnail width in pixels, the height follows the frame aspect ratio
+            max_skip: int
+                maximum number of consecutive frames skipped, None for no limit
+        """
+        if width < 1:
+            raise ValueError('A motion gate needs a thumbnail of at least one pixel')
+        self.threshold = threshold
+        self.width = width
+        self.max_skip = max_skip
+        self._thumbnails = [None, None]  # last frame let through, scratch
+        self._skipped = 0
+        self.frames = 0
+        self.skipped = 0
+        self.difference = None  # difference of the last frame checked
+
+    def check(self, frame: np.array) -> bool:
+        """
+        Compares a frame with the last frame let through.
+
+        Args:
+            frame: np.array
+                raw, grayscale or bgr frame, all the frames checked by a gate are expected to be of one kind
+
+        Returns: bool
+            True when the frame moved enough to be processed, False when it can be skipped
+        """
+        height = max(1, int(round(frame.shape[0] * self.width / frame.shape[1])))
+        shape = (height, self.width) + frame.shape[2:]
+        reference, thumbnail = self._thumbnails
+        if thumbnail is None or thumbnail.shape != shape or thumbnail.dtype != frame.dtype:
+            thumbnail = np.empty(shape, frame.dtype)
+        cv.resize(frame, (self.width, height), dst=thumbnail, interpolation=cv.INTER_AREA)
+        self.frames += 1
+        if reference is None or reference.shape != shape or reference.dtype != frame.dtype:
+            self.difference = None
+        else:
+            self.difference = cv.norm(thumbnail, reference, cv.NORM_L1) / thumbnail.size
+            if self.difference < self.threshold and (self.max_skip is None or self._skipped < self.max_skip):
+                self._thumbnails[1] = thumbnail
+                self._skipped += 1
+                self.skipped += 1
+                return False
+        self._thumbnails = [thumbnail, reference]
+        self._skipped = 0
+        return True
+
+    def reset(self) -> None:
+        """
+        Forgets the last frame let through and the counts, before a new sequence.
+        """
+        self._thumbnails = [None, None]
+        self._skipped = 0
+        self.frames = 0
+        self.skipped = 0
+        self.difference = None
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            frames checked, frames skipped and the skip rate
+        """
+        return {'frames': self.frames, 'skipped': self.skipped,
+                'skip_rate': self.skipped / self.frames if self.frames else 0.0}
+
+
+class PipelineStage:
+    """
+
+    A named preprocessing step run by its own pool of worker threads.
+
+    The function takes the frame coming out of the previous stage and the per-slot buffer dict, and returns the frame
+    passed to the next stage. Stages reuse their output arrays through buffers[name] so no frame is allocated twice.
+    An ordered stage runs on a single worker which gets the frames in input order.
+
+    """
+
+    def __init__(self, name: str, function: Callable[[Any, dict], Any], workers: int = 1, ordered: bool = False):
+        """
+        Args:
+            name: string
+                stage name used for the buffers key and the timings
+            function: callable
+                function(frame, buffers) -> frame, raising SkippedFrame to drop the frame
+            workers: int
+                number of worker threads running this stage
+            ordered: bool
+                runs the function on the frames in input order, for stages keeping state between frames
+        """
+        if workers < 1:
+            raise ValueError('A stage needs at least one worker')
+        if ordered and workers != 1:
+            raise ValueError('An ordered stage runs on exactly one worker')
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.ordered = ordered
+
+
+class PreprocessPipeline:
+    """
+
+    Fused frame preprocessing pipeline, by default decode -> demosaic -> undistort.
+
+    Each stage runs on its own thread pool (OpenCV releases the GIL, so the stages use every core) and the stages are
+    connected by bounded queues. A fixed number of buffer slots is preallocated on first use and recycled, which bounds
+    memory and provides the backpressure. Frames are yielded in input order. With a FramePool the slot buffers are
+    taken from the pool and handed back at the end of a run, also one left early, so later runs (and other pool users)
+    reuse them.
+
+    """
+
+    def __init__(self, stages: list, buffers: int = 8, pool: FramePool = None):
+        """
+        Args:
+            stages: list
+                list of PipelineStage, the first one receives the file names
+            buffers: int
+                number of frame slots in flight, each with its own stage buffers
+            pool: FramePool
+                optional pool the stage buffers are acquired from and released to
+        """
+        if not stages:
+            raise ValueError('A pipeline needs at least one stage')
+        if buffers < 1:
+            raise ValueError('A pipeline needs at least one buffer slot')
+        self.stages = list(stages)
+        self.buffers = buffers
+        self.pool = pool
+        self.stage_times = {stage.name: deque(maxlen=TIMINGS_KEPT) for stage in self.stages}  # latest, per stage
+        self.frames = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def from_config(cls, undistorter: 'Undistorter' = None, bayer_pattern: str = 'gr', workers: Tuple = (2, 2, 2),
+                    buffers: int = 8, pool: FramePool = None, scale: float = None, pyramid_levels: int = None,
+                    gate: MotionGate = None) -> 'PreprocessPipeline':
+        """
+        Builds the default decode -> demosaic -> undistort pipeline, optionally with a motion gate after the decode,
+        a resize stage before the undistortion and a pyramid stage after it
+
+        Args:
+            undistorter: Undistorter
+                undistorter for the camera, the undistort stage is skipped if None
+            bayer_pattern: string
+                bayer pattern of the raw frames ('bg', 'gb', 'rg', 'gr'), the demosaic stage is skipped if None
+            workers: tuple
+                number of worker threads for the decode, demosaic and undistort stages
+            buffers: int
+                number of frame slots in flight
+            pool: FramePool
+                optional pool of the stage buffers
+            scale: float
+                resizes the frames by scale before the undistortion, pair it with Undistorter.from_camera(scale=...)
+            pyramid_levels: int
+                builds an ImagePyramid of that many levels from each frame, which is then yielded instead of the frame
+            gate: MotionGate
+                skips the later stages of the frames the gate finds still, checked on the raw frames
+
+        Returns: PreprocessPipeline
+        """
+        stages = [PipelineStage('decode', _decode, workers[0])]
+        if gate is not None:
+            stages.append(PipelineStage('gate', lambda frame, slot: _gate(frame, gate), ordered=True))
+        if bayer_pattern is not None:
+            code = bayer_code(bayer_pattern)
+            stages.append(PipelineStage('demosaic', lambda frame, slot: _demosaic(frame, code, slot), workers[1]))
+        if scale is not None and scale != 1.0:
+            stages.append(PipelineStage('resize', lambda frame, slot: _resize(frame, scale, slot), workers[1]))
+        if undistorter is not None:
+            stages.append(PipelineStage('undistort', lambda frame, slot: _undistort(frame, undistorter, slot),
+                                        workers[2]))
+        if pyramid_levels is not None:
+            stages.append(PipelineStage('pyramid', lambda frame, slot: _pyramid(frame, pyramid_levels, slot),
+                                        workers[2]))
+        return cls(stages, buffers, pool)
+
+    def _worker(self, stage: PipelineStage, inbox: queue.Queue, outbox: queue.Queue) -> None:
+        times = self.stage_times[stage.name]
+        pending, expected = {}, 0
+        while True:
+            job = inbox.get()
+            if job is None:
+                # ---> Pass the frames held back on, so a run stopped early still finds their slots <--- #
+                for held in pending.values():
+                    outbox.put(held)
+                return
+            if not stage.ordered:
+                outbox.put(self._apply(stage, job, times))
+                continue
+            # ---> The previous stage finishes frames out of order, hold them back until it is their turn <--- #
+            pending[job[0]] = job
+            while expected in pending:
+                outbox.put(self._apply(stage, pending.pop(expected), times))
+                expected += 1
+
+    @staticmethod
+    def _apply(stage: PipelineStage, job: list, times: list) -> list:
+        if job[3] is None:
+            start = time.perf_counter()
+            try:
+                job[2] = stage.function(job[2], job[1])
+            except Exception as err:
+                job[3] = err
+            times.append(time.perf_counter() - start)
+        return job
+
+    def run(self, files: list) -> Iterator[np.array]:
+        """
+        Runs every file through the stages
+
+        Args:
+            files: list
+                input list of filenames, fed to the first stage
+
+        Returns: Iterator
+            frames in input order, None for the frames a stage skipped. A yielded frame lives in a recycled buffer and
+            is only valid until the next frame is requested, copy it to keep it.
+        """
+        files = list(files)
+        self.frames, self.skipped, self.elapsed = 0, 0, 0.0
+        for times in self.stage_times.values():
+            times.clear()
+        free = queue.Queue()
+        for _ in range(self.buffers):
+            free.put(_Slot(self.pool))
+        size = self.buffers + max(stage.workers for stage in self.stages)
+        queues = [queue.Queue(size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+
+        def feed() -> None:
+            for index, file in enumerate(files):
+                slot = free.get()
+                if stop.is_set():
+                    free.put(slot)
+                    return
+                queues[0].put([index, slot, file, None])
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for position, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._worker, args=(stage, queues[position], queues[position + 1]),
+                                         daemon=True) for _ in range(stage.workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        slot = None
+        try:
+            for index in range(len(files)):
+                while index not in pending:
+                    job = queues[-1].get()
+                    pending[job[0]] = job
+                job = pending.pop(index)
+                if slot is not None:
+                    free.put(slot)
+                slot = job[1]
+                if isinstance(job[3], SkippedFrame):
+                    self.skipped += 1
+                    yield None
+                    continue
+                if job[3] is not None:
+                    raise job[3]
+                self.frames += 1
+                self.elapsed = time.perf_counter() - start
+                yield job[2]
+        finally:
+            stop.set()
+            free.put(slot if slot is not None else _Slot(self.pool))
+            for position, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    queues[position].put(None)
+            if self.pool is not None:
+                # ---> Wait for the stages to stop writing, then hand back the slots idle, queued or held back <--- #
+                for thread in threads:
+                    thread.join()
+                slots = [job[1] for job in pending.values()]
+                for channel in queues:
+                    while not channel.empty():
+                        job = channel.get_nowait()
+                        if job is not None:
+                            slots.append(job[1])
+                while not free.empty():
+                    slots.append(free.get_nowait())
+                for held in slots:
+                    for buffer in held.values():
+                        self.pool.release(buffer)
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            frames processed and skipped by the last run, its sustained frames/sec and the mean per-frame time in
+            milliseconds of each stage over the latest TIMINGS_KEPT frames
+        """
+        return {'frames': self.frames, 'skipped': self.skipped,
+                'fps': self.frames / self.elapsed if self.elapsed else 0.0,
+                'stage_ms': {name: float(np.mean(times) * 1e3) if times else 0.0
+                             for name, times in self.stage_times.items()}}
+
+
+class _Slot(dict):
+    """
+    Stage buffers of one pipeline slot, with the pool new buffers are acquired from.
+    """
+
+    def __init__(self, pool: FramePool = None):
+        super().__init__()
+        self.pool = pool
+
+
+def _stage_buffer(slot: dict, name: str, shape: tuple, dtype: np.dtype) -> np.array:
+    """
+    Returns the buffer of a stage in a slot, (re)allocated when missing or of a different shape.
+    """
+    buffer = slot.get(name)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        pool = getattr(slot, 'pool', None)
+        if pool is None:
+            buffer = slot[name] = np.empty(shape, dtype)
+        else:
+            pool.release(buffer)
+            buffer = slot[name] = pool.acquire(shape, dtype)
+    return buffer
+
+
+def _decode(file: str, slot: dict) -> np.array:
+    with default_metrics.timer('decode'):
+        frame = imread(file, 0, slot.get('decode'))
+    if frame is not None:
+        slot['decode'] = frame
+    return frame
+
+
+def _demosaic(frame: np.array, code: int, slot: dict) -> np.array:
+    out = _stage_buffer(slot, 'demosaic', frame.shape[:2] + (3,), frame.dtype)
+    with default_metrics.timer('demosaic'):
+        return cv.cvtColor(frame, code, dst=out)
+
+
+def _undistort(frame: np.array, undistorter: 'Undistorter', slot: dict) -> np.array:
+    shape = undistorter.output_shape + frame.shape[2:]
+    return undistorter.undistort(frame, out=_stage_buffer(slot, 'undistort', shape, frame.dtype))
+
+
+def _gate(frame: np.array, gate: MotionGate) -> np.array:
+    if not gate.check(frame):
+        raise SkippedFrame
+    return frame
+
+
+def _resize(frame: np.array, scale: float, slot: dict) -> np.array:
+    height, width = scaled_shape(frame.shape, scale)
+    out = _stage_buffer(slot, 'resize', (height, width) + frame.shape[2:], frame.dtype)
+    with default_metrics.timer('resize'):
+        return cv.resize(frame, (width, height), dst=out, interpolation=cv.INTER_AREA)
+
+
+def _pyramid(frame: np.array, levels: int, slot: dict) -> 'ImagePyramid':
+    pyramid = slot.get('pyramid')
+    if pyramid is None or pyramid.shape != frame.shape[:2] or pyramid.max_levels != levels:
+        pyramid = slot['pyramid'] = ImagePyramid(frame.shape[:2], levels)
+    return pyramid.build(frame)
 
 
 if __name__ == '__main__':
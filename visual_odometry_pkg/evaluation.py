@@ -0,0 +1,270 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Trajectory evaluation (ATE / RPE) of visual_odometry_pkg poses against ground truth
+# Description   :-> Umeyama SE(3) / Sim(3) alignment, every error computed over all the poses at once with numpy
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import logging
+import numpy as np
+from typing import Sequence, Tuple
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+ALIGNMENTS = ('none', 'se3', 'sim3')
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def umeyama(source: np.array, target: np.array, with_scale: bool = False) -> Tuple[np.array, np.array, float]:
+    """
+    Least squares similarity (or rigid) transform between two point sets, target ~ scale * rotation @ source + t
+    (Umeyama, 1991).
+
+    Args:
+        source: np.array
+            (n, 3) points
+        target: np.array
+            (n, 3) corresponding points
+        with_scale: bool
+            estimates the scale (Sim(3)) if True, keeps it at 1 (SE(3)) otherwise
+
+    Returns: Tuple
+        (rotation (3, 3), translation (3,), scale)
+    """
+    source, target = np.asarray(source, np.double), np.asarray(target, np.double)
+    if source.shape != target.shape or source.ndim != 2 or len(source) < 3:
+        raise ValueError(f'Alignment needs two (n, 3) point sets with n >= 3, got {source.shape} and {target.shape}')
+    source_mean, target_mean = source.mean(axis=0), target.mean(axis=0)
+    source_centred, target_centred = source - source_mean, target - target_mean
+    covariance = target_centred.T @ source_centred / len(source)
+    u, singular, vt = np.linalg.svd(covariance)
+    sign = np.eye(3)
+    if np.linalg.det(u) * np.linalg.det(vt) < 0:
+        sign[2, 2] = -1
+    rotation = u @ sign @ vt
+    scale = 1.0
+    if with_scale:
+        variance = np.mean(np.sum(source_centred ** 2, axis=1))
+        scale = float(np.trace(np.diag(singular) @ sign) / variance) if variance > 0 else 1.0
+    translation = target_mean - scale * rotation @ source_mean
+    return rotation, translation, scale
+
+
+def align_trajectory(estimated: np.array, ground_truth: np.array, alignment: str = 'se3',
+                     count: int = None) -> Tuple[np.array, Tuple[np.array, np.array, float]]:
+    """
+    Aligns estimated camera to world poses to the ground truth frame by their positions.
+
+    Args:
+        estimated: np.array
+            (n, 4, 4) estimated poses
+        ground_truth: np.array
+            (n, 4, 4) ground truth poses of the same frames
+        alignment: str
+            'se3' rigid, 'sim3' rigid with scale (monocular VO), 'none' to keep the poses as they are
+        count: int
+            aligns on the first count poses only, all of them if None
+
+    Returns: Tuple
+        ((n, 4, 4) aligned poses, (rotation, translation, scale) of the alignment)
+    """
+    if alignment not in ALIGNMENTS:
+        raise ValueError(f'Unknown alignment {alignment!r}, expected one of {ALIGNMENTS}')
+    estimated, ground_truth = _check_poses(estimated, ground_truth)
+    if alignment == 'none':
+        return estimated.copy(), (np.eye(3), np.zeros(3), 1.0)
+    span = slice(0, count)
+    rotation, translation, scale = umeyama(estimated[span, :3, 3], ground_truth[span, :3, 3], alignment == 'sim3')
+    aligned = np.empty_like(estimated)
+    aligned[:, :3, :3] = rotation @ estimated[:, :3, :3]
+    aligned[:, :3, 3] = scale * estimated[:, :3, 3] @ rotation.T + translation
+    aligned[:, 3] = (0, 0, 0, 1)
+    return aligned, (rotation, translation, scale)
+
+
+def absolute_trajectory_error(estimated: np.array, ground_truth: np.array, alignment: str = 'se3') -> dict:
+    """
+    Absolute trajectory error: position and orientation error of every pose after aligning the trajectories.
+
+    Args:
+        estimated: np.array
+            (n, 4, 4) estimated camera to world poses
+        ground_truth: np.array
+            (n, 4, 4) ground truth poses of the same frames
+        alignment: str
+            'se3', 'sim3' or 'none', see align_trajectory()
+
+    Returns: dict
+        translation (metres) and rotation (degrees) error statistics, the per-pose errors in errors and the scale
+        of the alignment
+    """
+    aligned, (_, _, scale) = align_trajectory(estimated, ground_truth, alignment)
+    ground_truth = np.asarray(ground_truth, np.double)
+    translation = np.linalg.norm(aligned[:, :3, 3] - ground_truth[:, :3, 3], axis=1)
+    rotation = rotation_angles(np.swapaxes(ground_truth[:, :3, :3], 1, 2) @ aligned[:, :3, :3])
+    return {'translation': error_stats(translation), 'rotation': error_stats(np.degrees(rotation)), 'scale': scale,
+            'errors': translation}
+
+
+def relative_pose_error(estimated: np.array, ground_truth: np.array, deltas: Sequence[int] = (1, 10, 100),
+                        lengths: Sequence[float] = None, alignment: str = 'se3') -> dict:
+    """
+    Relative pose error: drift of the motion between poses some frames (or some distance) apart, for every pair at
+    once.
+
+    Args:
+        estimated: np.array
+            (n, 4, 4) estimated camera to world poses
+        ground_truth: np.array
+            (n, 4, 4) ground truth poses of the same frames
+        deltas: list
+            frame separations of the pose pairs, used when lengths is None
+        lengths: list
+            path lengths in metres of the segments (KITTI style), each pose paired with the first pose at least that
+            far along the ground truth path
+        alignment: str
+            'sim3' rescales the estimated translations by the Sim(3) scale first (monocular VO), the other alignments
+            leave the relative motions unchanged
+
+    Returns: dict
+        per delta (or length): number of pairs, translation error statistics (metres, and percent of the segment
+        length for lengths) and rotation error statistics (degrees, and degrees per metre for lengths)
+    """
+    estimated, ground_truth = _check_poses(estimated, ground_truth)
+    if alignment == 'sim3':
+        _, (_, _, scale) = align_trajectory(estimated, ground_truth, 'sim3')
+        estimated = estimated.copy()
+        estimated[:, :3, 3] *= scale
+    elif alignment not in ALIGNMENTS:
+        raise ValueError(f'Unknown alignment {alignment!r}, expected one of {ALIGNMENTS}')
+    count = len(ground_truth)
+    results = {}
+    if lengths is None:
+        for delta in deltas:
+            first = np.arange(max(0, count - delta))
+            translation, rotation = _pair_errors(estimated, ground_truth, first, first + delta)
+            results[int(delta)] = {'pairs': len(first), 'translation': error_stats(translation),
+                                   'rotation': error_stats(rotation)}
+        return results
+    steps = np.linalg.norm(np.diff(ground_truth[:, :3, 3], axis=0), axis=1)
+    distance = np.concatenate([[0.0], np.cumsum(steps)])
+    for length in lengths:
+        second = np.searchsorted(distance, distance + length, 'left')
+        first = np.flatnonzero(second < count)
+        second = second[first]
+        translation, rotation = _pair_errors(estimated, ground_truth, first, second)
+        span = np.maximum(distance[second] - distance[first], 1e-12)
+        results[float(length)] = {'pairs': len(first), 'translation': error_stats(translation),
+                                  'rotation': error_stats(rotation),
+                                  'translation_percent': error_stats(100 * translation / span),
+                                  'rotation_per_metre': error_stats(rotation / span)}
+    return results
+
+
+def associate(estimated_times: np.array, ground_truth_times: np.array,
+              max_difference: float = 0.02) -> Tuple[np.array, np.array]:
+    """
+    Pairs every estimated timestamp with the nearest ground truth timestamp.
+
+    Args:
+        estimated_times: np.array
+            (n,) timestamps of the estimated poses
+        ground_truth_times: np.array
+            (m,) sorted timestamps of the ground truth poses
+        max_difference: float
+            largest time difference of a pair in seconds
+
+    Returns: Tuple
+        (indices into the estimated poses, indices into the ground truth) of the pairs
+    """
+    estimated_times = np.asarray(estimated_times, np.double)
+    ground_truth_times = np.asarray(ground_truth_times, np.double)
+    if not len(ground_truth_times):
+        return np.zeros(0, int), np.zeros(0, int)
+    right = np.clip(np.searchsorted(ground_truth_times, estimated_times), 1, len(ground_truth_times) - 1)
+    left = right - 1 if len(ground_truth_times) > 1 else right
+    nearest = np.where(np.abs(ground_truth_times[left] - estimated_times) <=
+                       np.abs(ground_truth_times[right] - estimated_times), left, right)
+    keep = np.flatnonzero(np.abs(ground_truth_times[nearest] - estimated_times) <= max_difference)
+    return keep, nearest[keep]
+
+
+def evaluate(estimated: np.array, ground_truth: np.array, alignment: str = 'se3', deltas: Sequence[int] = (1, 10, 100),
+             lengths: Sequence[float] = None) -> dict:
+    """
+    ATE and RPE of a trajectory, as a JSON serialisable dict (without the per-pose errors).
+    """
+    ate = absolute_trajectory_error(estimated, ground_truth, alignment)
+    ate.pop('errors')
+    return {'poses': len(ground_truth), 'alignment': alignment, 'ate': ate,
+            'rpe': {str(key): value for key, value in
+                    relative_pose_error(estimated, ground_truth, deltas, lengths, alignment).items()}}
+
+
+def rotation_angles(rotations: np.array) -> np.array:
+    """
+    Angles in radians of (n, 3, 3) rotation matrices.
+    """
+    trace = np.trace(rotations, axis1=-2, axis2=-1)
+    return np.arccos(np.clip((trace - 1) / 2, -1.0, 1.0))
+
+
+def error_stats(errors: np.array) -> dict:
+    """
+    RMSE, mean, median, standard deviation and max of a set of errors.
+    """
+    if not len(errors):
+        return {'rmse': 0.0, 'mean': 0.0, 'median': 0.0, 'std': 0.0, 'max': 0.0}
+    return {'rmse': float(np.sqrt(np.mean(errors * errors))), 'mean': float(np.mean(errors)),
+            'median': float(np.median(errors)), 'std': float(np.std(errors)), 'max': float(np.max(errors))}
+
+
+def _check_poses(estimated: np.array, ground_truth: np.array) -> Tuple[np.array, np.array]:
+    estimated, ground_truth = np.asarray(estimated, np.double), np.asarray(ground_truth, np.double)
+    if estimated.shape != ground_truth.shape or estimated.shape[1:] != (4, 4):
+        raise ValueError(f'Expected two (n, 4, 4) pose arrays, got {estimated.shape} and {ground_truth.shape}')
+    return estimated, ground_truth
+
+
+def _relative(poses: np.array, first: np.array, second: np.array) -> np.array:
+    """
+    Motions inv(poses[first]) @ poses[second] of rigid poses, with the closed form inverse.
+    """
+    rotation_t = np.swapaxes(poses[first, :3, :3], 1, 2)
+    relative = np.zeros((len(first), 4, 4))
+    relative[:, :3, :3] = rotation_t @ poses[second, :3, :3]
+    relative[:, :3, 3] = (rotation_t @ (poses[second, :3, 3] - poses[first, :3, 3])[:, :, None])[:, :, 0]
+    relative[:, 3, 3] = 1.0
+    return relative
+
+
+def _pair_errors(estimated: np.array, ground_truth: np.array, first: np.array,
+                 second: np.array) -> Tuple[np.array, np.array]:
+    """
+    Translation (metres) and rotation (degrees) errors of the motions between the pose pairs.
+    """
+    truth, motion = _relative(ground_truth, first, second), _relative(estimated, first, second)
+    # ---> Error motion inv(truth) @ motion <--- #
+    truth_t = np.swapaxes(truth[:, :3, :3], 1, 2)
+    rotation = np.degrees(rotation_angles(truth_t @ motion[:, :3, :3]))
+    translation = np.linalg.norm((truth_t @ (motion[:, :3, 3] - truth[:, :3, 3])[:, :, None])[:, :, 0], axis=1)
+    return translation, rotation
+
+
+if __name__ == '__main__':
+    msg = 'Evaluation Module of Visual odometry package.'
+    print(f'{msg}')
@@ -0,0 +1,227 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> On-disk cache of preprocessed (demosaiced, undistorted) frames for visual_odometry_pkg
+# Description   :-> Each cached sequence is a flat .npy memmap of shape (n, h, w, 3) with O(1) random access
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import shutil
+import hashlib
+import logging
+import numpy as np
+from typing import Iterator
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class CachedFrames:
+    """
+    Read-only, memory-mapped preprocessed frames of one sequence, indexable by frame index.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: string
+                cache entry folder holding frames.npy
+        """
+        self.path = path
+        self.frames = np.load(os.path.join(path, 'frames.npy'), mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> np.array:
+        return self.frames[index]
+
+    def __iter__(self) -> Iterator[np.array]:
+        return iter(self.frames)
+
+
+class FrameCache:
+    """
+    Cache of preprocessed frame sequences keyed by the source files, the camera model and the bayer pattern.
+
+    Entries are built once through a PreprocessPipeline and memory-mapped afterwards, so repeated runs over the same
+    sequence skip decoding, demosaicing and undistortion. The least recently used entries are deleted when the cache
+    grows beyond max_bytes, and the partial entries of failed or killed builds are deleted as well.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = None):
+        """
+        Args:
+            cache_dir: string
+                cache folder
+            max_bytes: int
+                disk budget of the cache, unlimited if None
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.sweep()
+
+    @staticmethod
+    def key(files: list, camera: object = None, bayer_pattern: str = 'gr') -> str:
+        """
+        Cache key of a sequence: sha1 of the file paths, sizes and modification times, the camera model (its content
+        hash when read through the camera cache, the LUT bytes otherwise) and the bayer pattern.
+        """
+        digest = hashlib.sha1(str(bayer_pattern).encode())
+        for file in files:
+            status = os.stat(file)
+            digest.update(f'{os.path.abspath(file)}|{status.st_size}|{status.st_mtime_ns}\n'.encode())
+        if camera is not None and camera.LUT is not None:
+            if getattr(camera, 'model_hash', None) is not None:
+                digest.update(camera.model_hash.encode())
+            else:
+                digest.update(np.ascontiguousarray(camera.LUT).tobytes())
+        return digest.hexdigest()
+
+    def open(self, files: list, camera: object = None, bayer_pattern: str = 'gr') -> CachedFrames:
+        """
+        Returns the cached frames of a sequence, preprocessing and storing them first on a miss.
+
+        Args:
+            files: list
+                ordered list of raw bayer frame files
+            camera: Camera
+                camera whose LUT undistorts the frames, frames are not undistorted if None
+            bayer_pattern: string
+                bayer pattern of the frames, None caches the frames as read without demosaicing
+
+        Returns: CachedFrames
+        """
+        path = os.path.join(self.cache_dir, self.key(files, camera, bayer_pattern))
+        if not os.path.isfile(os.path.join(path, 'frames.npy')):
+            self._build(path, files, camera, bayer_pattern)
+            self.evict(keep=path)
+        os.utime(path)  # the folder mtime is the LRU access time
+        return CachedFrames(path)
+
+    def _build(self, path: str, files: list, camera: object, bayer_pattern: str) -> None:
+        from .data_preprocessor import PreprocessPipeline, Undistorter, FrameStream  # readers never need OpenCV
+        log.debug(f' FrameCache building {path}')
+        with FrameStream(files[:1], read_ahead=1, workers=1) as probe:
+            probed = next(probe).shape
+        undistorter = Undistorter.from_camera(camera, probed[:2]) if camera is not None and camera.LUT is not None \
+            else None
+        # ---> Bayer frames are demosaiced to 3 channels, the others keep the channels they are read with <--- #
+        channels = probed[2:] if bayer_pattern is None else (3,)
+        shape = (undistorter.output_shape if undistorter is not None else probed[:2]) + channels
+        temporary = f'{path}.{os.getpid()}.tmp'
+        os.makedirs(temporary, exist_ok=True)
+        try:
+            frames = np.lib.format.open_memmap(os.path.join(temporary, 'frames.npy'), mode='w+', dtype=np.uint8,
+                                               shape=(len(files),) + shape)
+            for index, frame in enumerate(PreprocessPipeline.from_config(undistorter, bayer_pattern).run(files)):
+                frames[index] = frame
+            frames.flush()
+            del frames
+        except BaseException:
+            # ---> A partial entry is outside the LRU budget, it must not stay on the disk <--- #
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        try:
+            os.rename(temporary, path)
+        except OSError:  # built concurrently by another process
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def sweep(self) -> int:
+        """
+        Deletes the partial entries left behind by builder processes that are no longer running.
+
+        Returns: int
+            number of partial entries deleted
+        """
+        swept = 0
+        for name in os.listdir(self.cache_dir):
+            parts = name.split('.')
+            if len(parts) != 3 or parts[2] != 'tmp' or not parts[1].isdigit() or _running(int(parts[1])):
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            swept += 1
+        return swept
+
+    def entries(self) -> list:
+        """
+        Returns: list
+            (path, bytes, last access time) of every complete entry, least recently used first
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            frames = os.path.join(path, 'frames.npy')
+            if name.endswith('.tmp') or not os.path.isfile(frames):
+                continue
+            entries.append((path, os.path.getsize(frames), os.stat(path).st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self) -> int:
+        """
+        Returns: int
+            bytes used by the complete entries
+        """
+        return sum(entry[1] for entry in self.entries())
+
+    def evict(self, keep: str = None) -> int:
+        """
+        Deletes least recently used entries until the cache fits max_bytes.
+
+        Args:
+            keep: string
+                entry path never evicted (the one just opened)
+
+        Returns: int
+            number of evicted entries
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = self.entries()
+        total = sum(entry[1] for entry in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            log.debug(f' FrameCache evicting {path}')
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted += 1
+        return evicted
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def _running(pid: int) -> bool:
+    """
+    True when a process of that pid is running (or not ours to signal), so its partial entry may still be written.
+    """
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+if __name__ == '__main__':
+    msg = 'Frame cache Module of Visual odometry package.'
+    print(f'{msg}')
@@ -1,6 +1,24 @@
-from .camera import Camera
+import os
+import time
+import asyncio
+import hashlib
+import threading
+import numpy as np
+import concurrent.futures as cf
+from typing import AsyncIterator, Iterator, List, Tuple, Union
+from collections import deque
+from .camera import Camera, CameraRegistry, model_hash
+from .metrics import default_metrics
 from .visualizer import Visualize
-from .data_preprocessor import DataPreprocessor
+from .frame_cache import FrameCache
+from .algorithms import BundleAdjuster, FeatureTracker, KeyframeManager, MotionEstimator
+from .data_preprocessor import DataPreprocessor, FramePool, FrameStream, MotionGate, PreprocessPipeline, Undistorter, \
+    video_frames
+from .sources import FrameSource, TimedFrame
+from .manifest import FrameManifest, list_frames
+from .stereo import StereoOdometry, StereoRig
+
+default_registry = CameraRegistry()  # process-wide registry shared by the pipelines
 
 
 class ImplementVO:
@@ -8,10 +26,19 @@ class ImplementVO:
     A default implementation pipeline for VO
     """
 
-    def __init__(self, camera: object, data_processor: object, visualize: object):
-        self.cam = Camera()
-        self.data_preprocessor = DataPreprocessor()
-        self.visualize = Visualize()
+    def __init__(self, camera: object = None, data_processor: object = None, visualize: object = None,
+                 registry: CameraRegistry = None, frame_cache: FrameCache = None, frame_pool: FramePool = None):
+        self.cam = camera if camera is not None else Camera()
+        self.data_preprocessor = data_processor if data_processor is not None else DataPreprocessor()
+        self.visualize = visualize if visualize is not None else Visualize()
+        self.registry = registry if registry is not None else default_registry
+        self.frame_cache = frame_cache  # optional cache of preprocessed frames
+        self.frame_pool = frame_pool  # optional buffer pool shared by the preprocessing pipelines of every run
+        self.data_dir = None
+        self.poses = deque()  # sliding window of the latest camera poses (4 x 4, camera to world)
+        self.drops = []  # indices of the frames dropped to meet the deadline
+        self.skips = []  # indices of the frames skipped by the motion gate
+        self.stats = {}
 
     def import_data(self, cam_model_dir: str, data_dir: str) -> None:
         """
@@ -24,11 +51,568 @@ class ImplementVO:
 
         Returns:
 
+        The camera model is taken from the registry, so pipelines switching between sequences of the same rig share
+        one already read model.
         """
 
-        self.cam.read_camera_model(cam_model_dir)
+        self.cam = self.registry.get(cam_model_dir)
+        self.data_dir = data_dir
         print('Camera Model Read Successfully...!')
 
+    def frames(self, source: Union[str, list] = None, bayer_pattern: str = 'gr', undistort: bool = True,
+               gate: MotionGate = None) -> Iterator[np.array]:
+        """
+        Streams preprocessed frames from a directory of bayer png frames, a list of such files or a video file.
+
+        Args:
+            source: str, list or FrameManifest
+                frames directory, list of frame files, frame manifest or video file, defaults to the imported data_dir
+            bayer_pattern: str
+                bayer pattern of the png frames
+            undistort: bool
+                undistort the frames with the camera LUT when it is read
+            gate: MotionGate
+                optional motion pre-check, the frames it skips are neither demosaiced nor undistorted
+
+        Returns: Iterator
+            bgr frames, valid until the next frame is requested, None for the frames skipped by the gate. Frame files
+            are read through the frame cache when one is set, the gate then checks the cached frames.
+        """
+        source = source if source is not None else self.data_dir
+        if source is None:
+            raise ValueError('No data source given, pass one or call import_data() first')
+        if isinstance(source, (list, tuple, FrameManifest)) or os.path.isdir(source):
+            files = list_frames(source)
+            if not files:
+                return
+            if self.frame_cache is not None:
+                for frame in self.frame_cache.open(files, self.cam if undistort else None, bayer_pattern):
+                    yield frame if gate is None or gate.check(frame) else None
+                return
+            undistorter = None
+            if undistort and self.cam.LUT is not None:
+                with FrameStream(files[:1], read_ahead=1, workers=1) as probe:
+                    shape = next(probe).shape
+                undistorter = Undistorter.from_camera(self.cam, shape)
+            yield from PreprocessPipeline.from_config(undistorter, bayer_pattern, pool=self.frame_pool,
+                                                      gate=gate).run(files)
+        else:
+            undistorter, out = None, None
+            for frame in video_frames(source):
+                if gate is not None and not gate.check(frame):
+                    yield None
+                    continue
+                if undistort and self.cam.LUT is not None:
+                    if undistorter is None:
+                        undistorter, out = Undistorter.from_camera(self.cam, frame.shape[:2]), np.empty_like(frame)
+                    frame = undistorter.undistort(frame, out=out)
+                yield frame
+
+    def run(self, source: Union[str, list] = None, deadline: float = None, window: int = 100, bayer_pattern: str = 'gr',
+            undistort: bool = True, tracker: FeatureTracker = None, estimator: MotionEstimator = None,
+            keyframes: KeyframeManager = None, adjuster: BundleAdjuster = None,
+            gate: MotionGate = None) -> Iterator[dict]:
+        """
+        Runs monocular VO over a frame directory or video file and yields the poses as they are estimated.
+
+        When a frame takes longer than the deadline, the overrun is carried over and the following frames are dropped
+        until it is paid back, so the latency stays bounded on slow frames. The drops are decided with the motion gate,
+        right after the decode, so a dropped frame is neither demosaiced nor undistorted; only the frames already read
+        ahead when the overrun happened are dropped after their preprocessing. Each dropped frame index is recorded in
+        self.drops. With a motion gate the frames that barely moved are skipped before the demosaic, undistortion and
+        tracking, keeping the last pose, and recorded in self.skips. Only the last window poses are kept in self.poses.
+
+        Args:
+            source: str, list or FrameManifest
+                frames directory, list of frame files, frame manifest or video file, defaults to the imported data_dir
+            deadline: float
+                per-frame processing budget in seconds, None processes every frame
+            window: int
+                number of poses kept in self.poses
+            bayer_pattern: str
+                bayer pattern of the png frames
+            undistort: bool
+                undistort the frames with the camera LUT when it is read
+            tracker: FeatureTracker
+                optional configured tracker
+            estimator: MotionEstimator
+                optional configured motion estimator, by default its time budget is half the deadline
+            keyframes: KeyframeManager
+                optional keyframe manager, created by default when an adjuster is given
+            adjuster: BundleAdjuster
+                optional bundle adjuster, run over the keyframe window each time a keyframe is promoted; its per
+                window reports are kept in adjuster.reports
+            gate: MotionGate
+                optional motion pre-check skipping the frames with too little motion, reset at the start of the run
+
+        Returns: Iterator
+            dict per processed frame with frame (index), pose (4 x 4 camera to world, unit translation per frame as
+            monocular VO has no scale), tracks, inliers, keyframe (bool) and latency (seconds)
+        """
+        if self.cam.fx is None:
+            raise ValueError('Camera model is not read yet, call import_data() first')
+        session = self._session(window, tracker, estimator, keyframes, adjuster, deadline, gate)
+        budget = _DeadlineGate(deadline, gate) if deadline is not None else None
+
+        for index, frame in enumerate(self.frames(source, bayer_pattern, undistort, budget or gate)):
+            if frame is None and (budget is None or not budget.was_dropped(index)):
+                self.skips.append(index)
+                default_metrics.increment('frames_skipped')
+                continue
+            if frame is None or budget is not None and budget.drop():
+                self.drops.append(index)
+                default_metrics.increment('frames_dropped')
+                continue
+            result = self._track(index, frame, session)
+            if budget is not None:
+                budget.charge(result['latency'])
+            yield result
+        self._finish(session)
+
+    async def run_async(self, source: FrameSource, window: int = 100, undistort: bool = True,
+                        tracker: FeatureTracker = None, estimator: MotionEstimator = None,
+                        keyframes: KeyframeManager = None, adjuster: BundleAdjuster = None, gate: MotionGate = None,
+                        executor: cf.Executor = None, read_ahead: int = 2) -> AsyncIterator[dict]:
+        """
+        Runs monocular VO over an asyncio frame source (directory, video, socket or pipe) and yields the poses as they
+        are estimated, without blocking the event loop.
+
+        The source is read by its own task up to read_ahead frames ahead, while the undistortion and tracking of each
+        frame run in the executor, so the loop stays free for the capture and any other coroutine. A slow consumer
+        pushes back on the source rather than dropping frames.
+
+        Args:
+            source: FrameSource
+                source of timestamped bgr frames, see visual_odometry_pkg.sources
+            window: int
+                number of poses kept in self.poses
+            undistort: bool
+                undistort the frames with the camera LUT when it is read
+            tracker, estimator, keyframes, adjuster, gate:
+                as in run()
+            executor: Executor
+                executor of the per-frame work, the loop default executor if None. Frames are processed one at a
+                time, in order.
+            read_ahead: int
+                number of frames read ahead of the one being processed
+
+        Returns: AsyncIterator
+            dict per processed frame as in run(), with the source frame index and the frame timestamp (seconds)
+        """
+        if self.cam.fx is None:
+            raise ValueError('Camera model is not read yet, call import_data() first')
+        session = self._session(window, tracker, estimator, keyframes, adjuster, None, gate)
+        loop = asyncio.get_running_loop()
+        frames = asyncio.Queue(max(1, read_ahead))
+        reader = asyncio.create_task(_read_frames(source, frames))
+        try:
+            while True:
+                timed = await frames.get()
+                if timed is None:
+                    break
+                if isinstance(timed, BaseException):
+                    raise timed
+                result = await loop.run_in_executor(executor, self._process, timed, session, gate, undistort)
+                if result is None:
+                    self.skips.append(timed.index)
+                    default_metrics.increment('frames_skipped')
+                    continue
+                yield result
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+        self._finish(session)
+
+    def run_stereo(self, right_model_dir: str, right_source: Union[str, list], source: Union[str, list] = None,
+                   window: int = 100, bayer_pattern: str = 'gr', odometry: StereoOdometry = None,
+                   alpha: float = 0.0) -> Iterator[dict]:
+        """
+        Runs metric stereo VO over the frames of a left / right camera pair and yields the poses as they are estimated.
+
+        The imported camera is the left lens and the right camera model is taken from the registry. Both are built
+        into a StereoRig once, and each stream is decoded, demosaiced, undistorted and rectified by its own
+        preprocessing pipeline with a single remap per frame; see StereoOdometry for the tracking.
+
+        Args:
+            right_model_dir: str
+                Path to the right camera model dir
+            right_source: str, list or FrameManifest
+                right frames directory, list of frame files or frame manifest, paired with the left frames in order
+            source: str, list or FrameManifest
+                left frames directory, list of frame files or frame manifest, defaults to the imported data_dir
+            window: int
+                number of poses kept in self.poses
+            bayer_pattern: str
+                bayer pattern of the png frames
+            odometry: StereoOdometry
+                optional configured stereo odometry, built on the rig of the two cameras if None
+            alpha: float
+                rectification scaling of the rig built when no odometry is given
+
+        Returns: Iterator
+            dict per frame pair with frame (index), pose (4 x 4 left camera to world, in the units of the baseline),
+            tracks, matched, inliers, landmarks and latency (seconds)
+        """
+        if self.cam.fx is None:
+            raise ValueError('Camera model is not read yet, call import_data() first')
+        source = source if source is not None else self.data_dir
+        if source is None:
+            raise ValueError('No data source given, pass one or call import_data() first')
+        files = [list_frames(source), list_frames(right_source)]
+        if len(files[0]) != len(files[1]):
+            raise ValueError(f'{len(files[0])} left frames do not pair with {len(files[1])} right frames')
+        if not files[0]:
+            return
+        if odometry is None:
+            with FrameStream(files[0][:1], read_ahead=1, workers=1) as probe:
+                shape = next(probe).shape[:2]
+            odometry = StereoOdometry(StereoRig(self.cam, self.registry.get(right_model_dir), shape, alpha))
+        else:
+            odometry.reset()
+        self.poses = deque([odometry.pose], maxlen=window)
+        self.drops = []
+        self.skips = []
+        session = {'processed': 0, 'start': time.perf_counter()}
+        pipelines = [PreprocessPipeline.from_config(undistorter, bayer_pattern, pool=self.frame_pool)
+                     for undistorter in (odometry.rig.left, odometry.rig.right)]
+
+        for index, (left, right) in enumerate(zip(pipelines[0].run(files[0]), pipelines[1].run(files[1]))):
+            result = odometry.track(left, right)
+            pose = result['pose']
+            if result['inliers']:
+                self.poses.append(pose)
+            session['processed'] += 1
+            default_metrics.increment('frames')
+            if self.visualize.running:
+                self.visualize.update(pose, left, odometry.tracker.points[:odometry.tracker.count])
+            yield dict(frame=index, **result)
+        self._finish(session)
+
+    def _session(self, window: int, tracker: FeatureTracker, estimator: MotionEstimator, keyframes: KeyframeManager,
+                 adjuster: BundleAdjuster, deadline: float, gate: MotionGate) -> dict:
+        """
+        Resets the run state and returns the per-run components and pose.
+        """
+        tracker = tracker if tracker is not None else FeatureTracker()
+        if estimator is None:
+            estimator = MotionEstimator(self.cam, time_budget=deadline / 2 if deadline is not None else None)
+        if adjuster is not None and keyframes is None:
+            keyframes = KeyframeManager()
+        if gate is not None:
+            gate.reset()
+        pose = np.eye(4)
+        self.poses = deque([pose], maxlen=window)
+        self.drops = []
+        self.skips = []
+        return {'tracker': tracker, 'estimator': estimator, 'keyframes': keyframes, 'adjuster': adjuster, 'pose': pose,
+                'processed': 0, 'start': time.perf_counter()}
+
+    def _process(self, timed: TimedFrame, session: dict, gate: MotionGate, undistort: bool) -> Union[dict, None]:
+        """
+        Gates, undistorts and tracks a timestamped frame, None when the gate skips it.
+        """
+        frame = timed.image
+        if gate is not None and not gate.check(frame):
+            return None
+        if undistort and self.cam.LUT is not None:
+            undistorter = session.get('undistorter')
+            if undistorter is None or undistorter.shape != frame.shape[:2]:
+                undistorter = session['undistorter'] = Undistorter.from_camera(self.cam, frame.shape[:2])
+                session['undistorted'] = np.empty(undistorter.output_shape + frame.shape[2:], frame.dtype)
+            frame = undistorter.undistort(frame, out=session['undistorted'])
+        result = self._track(timed.index, frame, session)
+        result['timestamp'] = timed.timestamp
+        return result
+
+    def _track(self, index: int, frame: np.array, session: dict) -> dict:
+        """
+        Tracks one frame, updates the pose, the keyframes and the visualizer, and returns the frame result.
+        """
+        tracker, estimator = session['tracker'], session['estimator']
+        keyframes, adjuster = session['keyframes'], session['adjuster']
+        pose = session['pose']
+        begin = time.perf_counter()
+        previous, current, _ = tracker.track(frame)
+        rotation, translation, inliers = None, None, np.zeros(0, bool)
+        if len(current) >= 8:
+            rotation, translation, inliers = estimator.estimate(previous, current)
+        if rotation is not None:
+            motion = np.eye(4)  # previous camera to current camera inverted: current to previous
+            motion[:3, :3] = rotation.T
+            motion[:3, 3] = -rotation.T @ translation.ravel()
+            pose = pose @ motion
+            self.poses.append(pose)
+        promoted = False
+        if keyframes is not None:
+            promoted = keyframes.update(index, pose, tracker.ids[:tracker.count], tracker.points[:tracker.count])
+            if promoted and adjuster is not None and len(keyframes) >= 3:
+                adjuster.adjust(keyframes)
+                pose = keyframes.keyframes[-1].pose
+                self.poses[-1] = pose
+        latency = time.perf_counter() - begin
+        session['pose'] = pose
+        session['processed'] += 1
+        default_metrics.observe('frame', latency)
+        default_metrics.increment('frames')
+        if self.visualize.running:
+            self.visualize.update(pose, frame, current, previous)
+        return {'frame': index, 'pose': pose, 'tracks': len(current), 'inliers': int(inliers.sum()),
+                'keyframe': promoted, 'latency': latency}
+
+    def _finish(self, session: dict) -> None:
+        elapsed = time.perf_counter() - session['start']
+        processed = session['processed']
+        frames = processed + len(self.drops) + len(self.skips)
+        self.stats = {'processed': processed, 'dropped': len(self.drops), 'skipped': len(self.skips),
+                      'skip_rate': len(self.skips) / frames if frames else 0.0, 'seconds': elapsed,
+                      'fps': processed / elapsed if elapsed else 0.0}
+
+
+class _DeadlineGate:
+    """
+    Frame gate dropping the frames that overrun the deadline, ahead of their preprocessing, then asking the motion gate.
+    """
+
+    def __init__(self, deadline: float, gate: MotionGate = None):
+        self.deadline = deadline
+        self.gate = gate
+        self.overrun = 0.0  # tracking time beyond the deadline not paid back yet, in seconds
+        self.dropped = deque()  # indices dropped by check() not yet met by the consumer, at most the frames read ahead
+        self._checked = 0
+        self._lock = threading.Lock()  # check() runs on a pipeline thread, charge() on the consumer
+
+    def check(self, frame: np.array) -> bool:
+        index, self._checked = self._checked, self._checked + 1
+        if self.drop():
+            self.dropped.append(index)
+            return False
+        return self.gate is None or self.gate.check(frame)
+
+    def was_dropped(self, index: int) -> bool:
+        """
+        Returns: bool
+            True when check() dropped the frame of that index, asked in frame order for the frames it held back
+        """
+        if self.dropped and self.dropped[0] == index:
+            self.dropped.popleft()
+            return True
+        return False
+
+    def drop(self) -> bool:
+        """
+        Returns: bool
+            True when the next frame must be dropped, paying back one deadline of the overrun
+        """
+        with self._lock:
+            if self.overrun < self.deadline:
+                return False
+            self.overrun -= self.deadline
+            return True
+
+    def charge(self, latency: float) -> None:
+        with self._lock:
+            self.overrun = max(0.0, self.overrun + latency - self.deadline)
+
+
+class BatchRunner:
+    """
+    Offline VO over long sequences, sharded into overlapping chunks run on a process pool.
+
+    Each worker process reads its own chunk of frames from disk and memory-maps the camera model from the shared
+    camera cache, so neither frames nor LUTs are copied between processes. The chunk trajectories are stitched at the
+    overlaps and every finished chunk is checkpointed, so a crashed batch resumes with the missing chunks only; the
+    checkpoints are keyed by the camera model, the chunk geometry and the run options as well as by the frames.
+    """
+
+    def __init__(self, cam_model_dir: str, chunk_size: int = 500, overlap: int = 20, workers: int = None,
+                 checkpoint_dir: str = None, cache_dir: str = None, run_options: dict = None):
+        """
+        Args:
+            cam_model_dir: str
+                Path to the camera model dir
+            chunk_size: int
+                frames per chunk, overlap included
+            overlap: int
+                frames shared by consecutive chunks, used to align them (at least 2)
+            workers: int
+                number of processes, os.cpu_count() by default
+            checkpoint_dir: str
+                folder of the per-chunk checkpoints, nothing is checkpointed if None
+            cache_dir: str
+                camera model cache folder, the LUT is memory-mapped from it by every worker
+            run_options: dict
+                keyword arguments of ImplementVO.run() for every chunk
+        """
+        if not 2 <= overlap < chunk_size:
+            raise ValueError('overlap must be at least 2 and smaller than chunk_size')
+        self.cam_model_dir = cam_model_dir
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.workers = workers
+        self.checkpoint_dir = checkpoint_dir
+        self.cache_dir = cache_dir
+        self.run_options = dict(run_options or {})
+        self.stats = {}
+
+    def chunks(self, count: int) -> List[Tuple[int, int]]:
+        """
+        Returns: list
+            (start, stop) frame ranges covering count frames, consecutive ranges sharing overlap frames
+        """
+        step = self.chunk_size - self.overlap
+        ranges = []
+        start = 0
+        while True:
+            stop = min(start + self.chunk_size, count)
+            ranges.append((start, stop))
+            if stop >= count:
+                return ranges
+            start += step
+
+    def run(self, source: Union[str, list, FrameManifest]) -> dict:
+        """
+        Runs VO over a frame directory or list of frame files.
+
+        Args:
+            source: str, list or FrameManifest
+                frames directory, ordered list of frame files or frame manifest
+
+        Returns: dict
+            poses (n, 4, 4) camera to world of every frame in the first chunk frame, chunks, resumed (chunks read from
+            checkpoints) and seconds
+        """
+        start_time = time.perf_counter()
+        files = list_frames(source)
+        if not files:
+            self.stats = {'chunks': 0, 'resumed': 0, 'seconds': time.perf_counter() - start_time}
+            return dict(poses=np.empty((0, 4, 4)), **self.stats)
+        ranges = self.chunks(len(files))
+        configuration = self._configuration()
+        results = [None] * len(ranges)
+        pending = {}
+        for position, (start, stop) in enumerate(ranges):
+            results[position] = self._load_checkpoint(files[start:stop], position, configuration)
+        resumed = sum(result is not None for result in results)
+
+        with cf.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for position, (start, stop) in enumerate(ranges):
+                if results[position] is None:
+                    future = executor.submit(run_chunk, self.cam_model_dir, files[start:stop], self.cache_dir,
+                                             self.run_options)
+                    pending[future] = position
+            for future in cf.as_completed(pending):
+                position = pending[future]
+                results[position] = future.result()
+                start, stop = ranges[position]
+                self._save_checkpoint(files[start:stop], position, configuration, results[position])
+
+        poses = stitch_chunks(ranges, results, len(files))
+        self.stats = {'chunks': len(ranges), 'resumed': resumed, 'seconds': time.perf_counter() - start_time}
+        return dict(poses=poses, **self.stats)
+
+    def _configuration(self) -> str:
+        """
+        Digest of what a chunk trajectory depends on besides its frames: the camera model content, the chunk geometry
+        and the run options (options without a stable repr never match, so their chunks are always run again).
+        """
+        if self.checkpoint_dir is None:
+            return ''
+        model = model_hash(os.path.join(self.cam_model_dir, 'intrinsic_parameters.txt'),
+                           os.path.join(self.cam_model_dir, 'lut.bin'), self.cache_dir)
+        options = repr(sorted(self.run_options.items()))
+        return hashlib.sha1(f'{model}|{self.chunk_size}|{self.overlap}|{options}'.encode()).hexdigest()
+
+    def _checkpoint_path(self, files: list, position: int, configuration: str) -> str:
+        digest = hashlib.sha1('\n'.join([configuration] + files).encode()).hexdigest()[:16]
+        return os.path.join(self.checkpoint_dir, f'chunk_{position:05d}_{digest}.npy')
+
+    def _load_checkpoint(self, files: list, position: int, configuration: str) -> np.array:
+        if self.checkpoint_dir is None:
+            return None
+        path = self._checkpoint_path(files, position, configuration)
+        return np.load(path) if os.path.isfile(path) else None
+
+    def _save_checkpoint(self, files: list, position: int, configuration: str, poses: np.array) -> None:
+        if self.checkpoint_dir is None:
+            return
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path(files, position, configuration)
+        temporary = f'{path}.{os.getpid()}.tmp.npy'
+        np.save(temporary, poses)
+        os.replace(temporary, path)
+
+
+async def _read_frames(source: FrameSource, frames: asyncio.Queue) -> None:
+    """
+    Moves the frames of a source into a bounded queue, then None at its end, or the error it raised.
+    """
+    try:
+        async for timed in source:
+            await frames.put(timed)
+        await frames.put(None)
+    except asyncio.CancelledError:
+        raise
+    except Exception as err:
+        await frames.put(err)
+
+
+def run_chunk(cam_model_dir: str, files: list, cache_dir: str = None, run_options: dict = None) -> np.array:
+    """
+    Runs VO over one chunk of frames, the worker function of BatchRunner.
+
+    Returns: np.array
+        (k, 4, 4) camera to world poses of every chunk frame relative to the first one; frames dropped on a deadline
+        keep the last pose
+    """
+    if not files:
+        return np.empty((0, 4, 4))
+    vo = ImplementVO(registry=CameraRegistry(mmap=True, cache_dir=cache_dir))
+    vo.cam = vo.registry.get(cam_model_dir)
+    poses = np.empty((len(files), 4, 4))
+    poses[0] = np.eye(4)
+    last = 0
+    for result in vo.run(files, **(run_options or {})):
+        poses[last + 1:result['frame']] = poses[last]
+        poses[result['frame']] = result['pose']
+        last = result['frame']
+    poses[last + 1:] = poses[last]
+    return poses
+
+
+def stitch_chunks(ranges: List[Tuple[int, int]], chunk_poses: List[np.array], count: int) -> np.array:
+    """
+    Chains the chunk trajectories into one.
+
+    Each chunk starts at identity on its first frame, which is an overlap frame of the previous chunk: it is anchored
+    on the stitched pose of that frame and its translations are rescaled by the ratio of the path lengths of the two
+    chunks over the overlap, as monocular chunks have independent scales.
+
+    Args:
+        ranges: list
+            (start, stop) frame range of each chunk
+        chunk_poses: list
+            (stop - start, 4, 4) camera to world poses of each chunk relative to its first frame
+        count: int
+            number of frames
+
+    Returns: np.array
+        (count, 4, 4) poses
+    """
+    poses = np.empty((count, 4, 4))
+    start, stop = ranges[0]
+    poses[start:stop] = chunk_poses[0]
+    previous_stop = stop
+    for (start, stop), local in zip(ranges[1:], chunk_poses[1:]):
+        shared = previous_stop - start
+        stitched_length = np.linalg.norm(np.diff(poses[start:previous_stop, :3, 3], axis=0), axis=1).sum()
+        local_length = np.linalg.norm(np.diff(local[:shared, :3, 3], axis=0), axis=1).sum()
+        scale = stitched_length / local_length if local_length > 1e-12 else 1.0
+        scaled = local[shared:].copy()
+        scaled[:, :3, 3] *= scale
+        poses[previous_stop:stop] = poses[start] @ scaled
+        previous_stop = stop
+    return poses
+
 
 if __name__ == '__main__':
     msg = 'handler Module of Visual odometry package.'
@@ -0,0 +1,78 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Deferred logging configuration for visual_odometry_pkg
+# Description   :-> The package modules only create their loggers, applications opt in to the log files here
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import logging
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+LOG_FORMAT = '%(asctime)s : %(levelname)s : %(name)s :->%(message)s'
+STREAM_FORMAT = '%(levelname)s: %(name)s :->%(message)s'
+_handlers = []  # (logger, handler) pairs installed by configure_logging()
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def configure_logging(log_dir: str = './logs', level: int = logging.DEBUG, modules: tuple = ('camera',
+                      'data_preprocessor'), stream: bool = True) -> None:
+    """
+    Sets up the package log files, one <module>.log per module in log_dir, and a console handler. Calling it again
+    replaces the previous configuration.
+
+    Args:
+        log_dir: string
+            folder of the log files, created if missing, no log files are written if None
+        level: int
+            level of the package loggers
+        modules: tuple
+            package modules logging into their own file
+        stream: bool
+            also log to the console
+    """
+    reset_logging()
+    package = logging.getLogger('visual_odometry_pkg')
+    package.setLevel(level)
+    if stream:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(STREAM_FORMAT))
+        package.addHandler(stream_handler)
+        _handlers.append((package, stream_handler))
+    if log_dir is None:
+        return
+    os.makedirs(log_dir, exist_ok=True)
+    for module in modules:
+        log = logging.getLogger(f'visual_odometry_pkg.{module}')
+        file_handler = logging.FileHandler(os.path.join(log_dir, f'{module}.log'))
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log.addHandler(file_handler)
+        _handlers.append((log, file_handler))
+        log.info('\n# -------------------------------- #')
+        log.info('# -----> *** New Record *** <----- #')
+        log.info('# -------------------------------- #')
+
+
+def reset_logging() -> None:
+    """
+    Removes and closes the handlers installed by configure_logging().
+    """
+    while _handlers:
+        log, handler = _handlers.pop()
+        log.removeHandler(handler)
+        handler.close()
+
+
+if __name__ == '__main__':
+    msg = 'Logging configuration Module of Visual odometry package.'
+    print(f'{msg}')
@@ -0,0 +1,446 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Frame manifest (ordered, checked index of a sequence directory) for visual_odometry_pkg
+# Description   :-> Scanned once in parallel, stored as a compact binary index read back without listing the folder
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import re
+import zlib
+import glob
+import struct
+import fnmatch
+import logging
+import numpy as np
+import concurrent.futures as cf
+from typing import List, Tuple, Union
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+# ---> A manifest is a 64 byte header, the frame records in frame order, then the '\n' joined utf-8 file names <--- #
+HEADER = struct.Struct('<8sIIQqQ')  # magic, version, record size, frames, folder mtime (ns), names size
+HEADER_SIZE = 64
+VERSION = 1
+MANIFEST_MAGIC = b'VOFRAMES'
+MANIFEST_NAME = 'frames.manifest'
+FRAME_DTYPE = np.dtype([('timestamp', '<f8'), ('number', '<i8'), ('mtime', '<f8'), ('size', '<i8'),
+                        ('checksum', '<u4'), ('height', '<u4'), ('width', '<u4'), ('channels', 'u1'), ('depth', 'u1'),
+                        ('bayer', 'u1'), ('status', 'u1')])
+BAYER_PATTERNS = ('', 'bg', 'gb', 'rg', 'gr')  # bayer field values, 0 for the frames that are not raw bayer frames
+INSPECTED = ('mtime', 'size', 'checksum', 'height', 'width', 'channels', 'depth', 'status')  # from inspect_frame()
+STATUS = ('ok', 'unreadable', 'not_png', 'truncated', 'bad_crc', 'undecodable')  # status field values
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # by IHDR colour type
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class FrameManifest:
+    """
+
+    Ordered index of the frames of a sequence directory.
+
+    build() scans the directory once with a thread pool: every file is read a single time to checksum it, to parse its
+    PNG header (shape, bit depth) and to check its chunk structure and CRCs, so truncated or corrupted frames are
+    known before a run instead of showing up as a None from cv.imread() in the middle of it. Frames are ordered by
+    the numbers in their names (2.png before 10.png) or by the capture time encoded in the name. The manifest is saved
+    as a compact binary index next to the frames, and loaders start from it without listing the directory, seek by
+    frame number or time and skip the bad frames.
+
+    """
+
+    def __init__(self, directory: str, records: np.array, names: List[str], mtime_ns: int = 0):
+        """
+        Args:
+            directory: string
+                sequence directory
+            records: np.array
+                FRAME_DTYPE records in frame order
+            names: list
+                file name of each record
+            mtime_ns: int
+                modification time of the directory when it was scanned
+        """
+        if len(records) != len(names):
+            raise ValueError(f'{len(records)} frame records do not match {len(names)} file names')
+        self.directory = directory
+        self.records = records
+        self.names = names
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def build(cls, directory: str, pattern: str = '*.png', bayer_pattern: str = 'gr', fps: float = None,
+              time_scale: float = None, workers: int = 8, decode: bool = False,
+              previous: 'FrameManifest' = None) -> 'FrameManifest':
+        """
+        Scans a sequence directory.
+
+        Args:
+            directory: string
+                sequence directory
+            pattern: string
+                file name pattern of the frames
+            bayer_pattern: string
+                bayer pattern of the single channel frames, None if they are not raw bayer frames
+            fps: float
+                frame rate giving the timestamps position / fps
+            time_scale: float
+                the file names are capture times, a timestamp is the name number times time_scale (e.g. 1e-9 for
+                nanosecond names) and the frames are ordered by time. Used when fps is None; the file modification
+                times are the timestamps when both are None.
+            workers: int
+                number of scanning threads
+            decode: bool
+                also decodes every frame (requires OpenCV), catching corrupted image data behind valid chunk CRCs
+            previous: FrameManifest
+                earlier manifest of the directory, its records are reused for the files of unchanged size and
+                modification time
+
+        Returns: FrameManifest
+        """
+        if bayer_pattern is not None and bayer_pattern not in BAYER_PATTERNS[1:]:
+            raise ValueError(f'Unknown bayer pattern {bayer_pattern!r}, expected one of {BAYER_PATTERNS[1:]}')
+        mtime_ns = os.stat(directory).st_mtime_ns  # before the listing, a file added meanwhile makes the index stale
+        with os.scandir(directory) as entries:
+            names = [entry.name for entry in entries if fnmatch.fnmatch(entry.name, pattern) and entry.is_file()]
+        names.sort(key=natural_key)
+        known = {}
+        if previous is not None:
+            known = {name: record for name, record in zip(previous.names, previous.records)}
+        records = np.zeros(len(names), FRAME_DTYPE)
+
+        def scan(position: int) -> None:
+            path = os.path.join(directory, names[position])
+            record = known.get(names[position])
+            if record is not None and not decode:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    stat = None
+                if stat is not None and stat.st_size == record['size'] and stat.st_mtime == record['mtime']:
+                    records[position] = record
+                    return
+            record = records[position]
+            for name, value in zip(INSPECTED, inspect_frame(path, decode)):
+                record[name] = value
+
+        with cf.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(executor.map(scan, range(len(names))))
+
+        records['number'] = [frame_number(name) for name in names]
+        if bayer_pattern is not None:
+            bayer = (records['channels'] == 1) & (records['status'] == 0)
+            records['bayer'] = np.where(bayer, BAYER_PATTERNS.index(bayer_pattern), 0)
+        if fps:
+            records['timestamp'] = np.arange(len(names)) / fps
+        elif time_scale is not None:
+            records['timestamp'] = [name_time(name, time_scale) for name in names]
+            order = np.argsort(records['timestamp'], kind='stable')  # unparsable names (NaN) last, in name order
+            records = records[order]
+            names = [names[position] for position in order]
+        else:
+            records['timestamp'] = records['mtime']
+        manifest = cls(directory, records, names, mtime_ns)
+        bad = int(np.count_nonzero(records['status']))
+        if bad:
+            log.warning(f'{bad} of the {len(names)} frames of {directory} are unreadable or corrupted')
+        return manifest
+
+    @classmethod
+    def load(cls, path: str, directory: str = None) -> 'FrameManifest':
+        """
+        Reads a saved manifest.
+
+        Args:
+            path: string
+                manifest file
+            directory: string
+                sequence directory, the folder of the manifest file by default
+
+        Returns: FrameManifest
+        """
+        with open(path, 'rb') as file:
+            magic, version, record_size, count, mtime_ns, names_size = HEADER.unpack(file.read(HEADER.size))
+            if magic != MANIFEST_MAGIC:
+                raise ValueError(f'{path} is not a frame manifest')
+            if version != VERSION or record_size != FRAME_DTYPE.itemsize:
+                raise ValueError(f'{path} is a version {version} manifest of {record_size} byte records, expected '
+                                 f'version {VERSION} of {FRAME_DTYPE.itemsize} byte records')
+            file.seek(HEADER_SIZE)
+            records = np.fromfile(file, FRAME_DTYPE, count)
+            names = file.read(names_size).decode('utf-8')
+        if len(records) != count or len(names.encode('utf-8')) != names_size:
+            raise ValueError(f'Frame manifest {path} is truncated')
+        directory = directory if directory is not None else os.path.dirname(os.path.abspath(path))
+        return cls(directory, records, names.split('\n') if count else [], mtime_ns)
+
+    @classmethod
+    def open(cls, directory: str, path: str = None, **options) -> 'FrameManifest':
+        """
+        Loads the manifest of a directory, or builds and saves it when it is missing or the directory changed since
+        (the records of the unchanged files are reused).
+
+        Args:
+            directory: string
+                sequence directory
+            path: string
+                manifest file, directory/MANIFEST_NAME by default
+            options:
+                keyword arguments of build()
+
+        Returns: FrameManifest
+        """
+        path = path if path is not None else os.path.join(directory, MANIFEST_NAME)
+        previous = None
+        if os.path.isfile(path):
+            try:
+                previous = cls.load(path, directory)
+            except (OSError, ValueError) as err:
+                log.warning(f'Rebuilding frame manifest {path}: {err}')
+            else:
+                if previous.is_fresh():
+                    return previous
+        manifest = cls.build(directory, previous=previous, **options)
+        manifest.save(path)
+        return manifest
+
+    def save(self, path: str = None) -> str:
+        """
+        Writes the manifest atomically.
+
+        Returns: string
+            manifest file, directory/MANIFEST_NAME by default
+        """
+        path = path if path is not None else os.path.join(self.directory, MANIFEST_NAME)
+        names = '\n'.join(self.names).encode('utf-8')
+        inside = os.path.samefile(os.path.dirname(os.path.abspath(path)), self.directory)
+        unchanged = inside and self.is_fresh()
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(self._header(names).ljust(HEADER_SIZE, b'\x00'))
+            file.write(np.ascontiguousarray(self.records, FRAME_DTYPE).tobytes())
+            file.write(names)
+        os.replace(temporary, path)
+        if unchanged:
+            # ---> Writing the manifest into the directory changed its mtime, which must not make it look stale <--- #
+            self.mtime_ns = os.stat(self.directory).st_mtime_ns
+            with open(path, 'r+b') as file:
+                file.write(self._header(names))
+        return path
+
+    def _header(self, names: bytes) -> bytes:
+        return HEADER.pack(MANIFEST_MAGIC, VERSION, FRAME_DTYPE.itemsize, len(self.records), self.mtime_ns,
+                           len(names))
+
+    def is_fresh(self) -> bool:
+        """
+        Returns: bool
+            whether no file was added, removed or renamed in the directory since the scan
+        """
+        try:
+            return os.stat(self.directory).st_mtime_ns == self.mtime_ns
+        except OSError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def good(self) -> np.array:
+        """
+        Returns: np.array
+            boolean mask of the frames that passed the checks
+        """
+        return self.records['status'] == 0
+
+    def positions(self, start: int = None, stop: int = None, stride: int = 1, skip_bad: bool = True) -> np.array:
+        """
+        Returns: np.array
+            positions in frame order of the frames start:stop:stride, without the bad ones if skip_bad
+        """
+        positions = np.arange(len(self.records))[start:stop:stride]
+        return positions[self.good[positions]] if skip_bad else positions
+
+    def files(self, start: int = None, stop: int = None, stride: int = 1, skip_bad: bool = True) -> List[str]:
+        """
+        Returns: list
+            paths of the frames start:stop:stride in frame order, without the bad ones if skip_bad
+        """
+        return [os.path.join(self.directory, self.names[position])
+                for position in self.positions(start, stop, stride, skip_bad)]
+
+    def seek(self, frame: int = None, timestamp: float = None) -> int:
+        """
+        Finds a frame by the number in its file name or by time.
+
+        Args:
+            frame: int
+                frame number, e.g. 1500 for 001500.png
+            timestamp: float
+                time in seconds
+
+        Returns: int
+            position of the frame with that number, or of the first frame at or after timestamp (len(self) when
+            there is none)
+        """
+        if (frame is None) == (timestamp is None):
+            raise ValueError('Seek by either a frame number or a timestamp')
+        values, target = (self.records['number'], frame) if frame is not None else (self.records['timestamp'],
+                                                                                     timestamp)
+        if np.all(values[1:] >= values[:-1]):
+            position = int(np.searchsorted(values, target, 'left'))
+        else:
+            after = np.flatnonzero(values >= target)
+            position = int(after[np.argmin(values[after])]) if len(after) else len(values)
+        if frame is not None and (position == len(values) or values[position] != frame):
+            raise KeyError(f'No frame number {frame} in {self.directory}')
+        return position
+
+    def time_range(self, start: float, stop: float) -> Tuple[int, int]:
+        """
+        Returns: Tuple
+            (start, stop) positions of the frames with start <= timestamp < stop, for positions() and files()
+        """
+        return self.seek(timestamp=start), self.seek(timestamp=stop)
+
+    def stats(self) -> dict:
+        """
+        Returns: dict
+            number of frames, bytes, and number of frames of each status
+        """
+        counts = np.bincount(self.records['status'], minlength=len(STATUS))
+        return {'frames': len(self.records), 'bytes': int(self.records['size'].sum()),
+                **{status: int(count) for status, count in zip(STATUS, counts)}}
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def inspect_frame(path: str, decode: bool = False) -> Tuple:
+    """
+    Reads a frame file once and checks it.
+
+    Args:
+        path: string
+            frame file
+        decode: bool
+            also decodes the image with OpenCV
+
+    Returns: Tuple
+        values of the INSPECTED fields: mtime, size, checksum (crc32 of the file), height, width, channels, bit depth
+        and status
+    """
+    try:
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+    except OSError:
+        return 0.0, 0, 0, 0, 0, 0, 0, STATUS.index('unreadable')
+    height, width, channels, depth, status = png_info(data)
+    if decode and status == 0:
+        import cv2 as cv  # deferred, scanning without decode never needs OpenCV
+        if cv.imdecode(np.frombuffer(data, np.uint8), cv.IMREAD_UNCHANGED) is None:
+            status = STATUS.index('undecodable')
+    return stat.st_mtime, len(data), zlib.crc32(data), height, width, channels, depth, status
+
+
+def png_info(data: bytes) -> Tuple[int, int, int, int, int]:
+    """
+    Parses the header of a PNG file and checks the length and CRC of every chunk up to IEND.
+
+    Returns: Tuple
+        (height, width, channels, bit depth, status)
+    """
+    if len(data) < 33 or data[:8] != PNG_SIGNATURE or data[12:16] != b'IHDR':
+        return 0, 0, 0, 0, STATUS.index('not_png')
+    width, height, depth, colour = struct.unpack_from('>IIBB', data, 16)
+    info = (height, width, PNG_CHANNELS.get(colour, 0), depth)
+    view = memoryview(data)
+    position = len(PNG_SIGNATURE)
+    while True:
+        if position + 12 > len(data):
+            return info + (STATUS.index('truncated'),)
+        length, kind = struct.unpack_from('>I4s', data, position)
+        end = position + 12 + length
+        if end > len(data):
+            return info + (STATUS.index('truncated'),)
+        if zlib.crc32(view[position + 4:end - 4]) != struct.unpack_from('>I', data, end - 4)[0]:
+            return info + (STATUS.index('bad_crc'),)
+        if kind == b'IEND':
+            return info + (0,)
+        position = end
+
+
+def natural_key(name: str) -> list:
+    """
+    Sort key ordering the numbers in names by value, so 2.png comes before 10.png.
+    """
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'(\d+)', name) if part]
+
+
+def frame_number(name: str) -> int:
+    """
+    Returns the last number of a file name without its extension, -1 if there is none.
+    """
+    numbers = re.findall(r'\d+', os.path.splitext(name)[0])
+    return int(numbers[-1]) if numbers else -1
+
+
+def name_time(name: str, time_scale: float) -> float:
+    """
+    Returns the capture time encoded in a file name (the name without its extension is a number), NaN if it is not.
+    """
+    try:
+        return float(os.path.splitext(name)[0]) * time_scale
+    except ValueError:
+        return float('nan')
+
+
+def list_frames(source: Union[str, list, FrameManifest], pattern: str = '*.png') -> List[str]:
+    """
+    Frame files of a source in frame order.
+
+    Args:
+        source: str, list or FrameManifest
+            sequence directory, list of frame files (returned as is) or manifest (its good frames)
+        pattern: string
+            file name pattern of the frames of a directory
+
+    Returns: list
+        the good frames of the directory manifest when it has an up to date one, otherwise the files matching
+        pattern in natural order
+    """
+    if isinstance(source, FrameManifest):
+        return source.files()
+    if isinstance(source, (list, tuple)):
+        return list(source)
+    path = os.path.join(source, MANIFEST_NAME)
+    if os.path.isfile(path):
+        try:
+            manifest = FrameManifest.load(path, source)
+        except (OSError, ValueError) as err:
+            log.warning(f'Ignoring frame manifest {path}: {err}')
+        else:
+            if manifest.is_fresh():
+                return manifest.files()
+            log.warning(f'Frame manifest {path} is out of date, listing the directory')
+    return sorted(glob.glob(os.path.join(source, pattern)), key=lambda file: natural_key(os.path.basename(file)))
+
+
+if __name__ == '__main__':
+    msg = 'Frame manifest Module of Visual odometry package.'
+    print(f'{msg}')
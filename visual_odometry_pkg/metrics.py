@@ -0,0 +1,252 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Per-stage timers, counters and histograms for visual_odometry_pkg
+# Description   :-> Disabled by default (set VO_METRICS=1 or call enable()), exported as JSON or Prometheus text
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import re
+import json
+import time
+import bisect
+import functools
+import threading
+from collections import deque
+from typing import Callable
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class _NullTimer:
+    """
+    Timer handed out while the metrics are disabled, it does nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+
+
+class Histogram:
+    """
+    Latency histogram of one stage: bucket counts, count, sum and max, plus the latest samples for the quantiles.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, samples: int = 2048):
+        """
+        Args:
+            buckets: tuple
+                increasing bucket upper bounds in seconds
+            samples: int
+                number of latest samples kept for the p50 / p99 estimates
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns: float
+            q-quantile in seconds of the latest samples, 0 without samples
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        return {'count': self.count, 'sum_ms': self.sum * 1e3,
+                'mean_ms': self.sum / self.count * 1e3 if self.count else 0.0, 'max_ms': self.max * 1e3,
+                'p50_ms': self.quantile(0.5) * 1e3, 'p99_ms': self.quantile(0.99) * 1e3,
+                'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}}
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage timers and counters.
+
+    While disabled, timer() returns a shared no-op context manager and observe() / increment() return right away, so
+    the instrumented hot paths pay one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Args:
+            enabled: bool
+                record the measurements
+            buckets: tuple
+                histogram bucket upper bounds in seconds
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Drops every recorded measurement.
+        """
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def timer(self, name: str) -> object:
+        """
+        Context manager timing its block into the histogram of the named stage
+
+        Args:
+            name: string
+                stage name, e.g. 'decode', 'demosaic', 'undistort', 'track' or 'pose'
+
+        Returns: context manager
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable:
+        """
+        Decorator timing every call of the decorated function into the histogram of the named stage.
+        """
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a duration in seconds for the named stage.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Adds value to the named counter.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        Returns: dict
+            {'timers': {stage: count, sum / mean / max / p50 / p99 in ms and bucket counts}, 'counters': {name: value}}
+        """
+        with self._lock:
+            return {'timers': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+                    'counters': dict(sorted(self.counters.items()))}
+
+    def to_json(self, indent: int = None) -> str:
+        """
+        Returns: str
+            the snapshot as a JSON document
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = 'visual_odometry') -> str:
+        """
+        Renders the measurements in the Prometheus text exposition format, one `<prefix>_<stage>_seconds` histogram
+        per stage and one `<prefix>_<name>_total` counter per counter.
+
+        Returns: str
+        """
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = _metric_name(f'{prefix}_{name}_seconds')
+                lines.append(f'# TYPE {metric} histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum {histogram.sum!r}')
+                lines.append(f'{metric}_count {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                metric = _metric_name(f'{prefix}_{name}_total')
+                lines.append(f'# TYPE {metric} counter')
+                lines.append(f'{metric} {value}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_:]', '_', name)
+
+
+# Process-wide metrics the instrumented stages record into, enabled by the VO_METRICS environment variable
+default_metrics = Metrics(enabled=os.environ.get('VO_METRICS', '') not in ('', '0'))
+
+
+if __name__ == '__main__':
+    msg = 'Metrics Module of Visual odometry package.'
+    print(f'{msg}')
@@ -0,0 +1,439 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Compact binary pose and feature track logs for visual_odometry_pkg
+# Description   :-> Fixed-width records appended to a flat file, read back memory-mapped with range queries
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import struct
+import logging
+import numpy as np
+from typing import Tuple
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+# ---> A log file is a 64 byte header (magic, version, record size, flags) followed by the records, little endian <--- #
+HEADER = struct.Struct('<8sIII')
+HEADER_SIZE = 64
+VERSION = 1
+POSE_MAGIC = b'VOPOSES\x00'
+TRACK_MAGIC = b'VOTRACKS'
+# Upper triangle (row major) of the 6 x 6 pose covariance, in the (rotation, translation) order
+COVARIANCE_INDICES = np.triu_indices(6)
+POSE_DTYPE = np.dtype([('timestamp', '<f8'), ('frame', '<i8'), ('quaternion', '<f8', (4,)),
+                       ('translation', '<f8', (3,)), ('covariance', '<f4', (len(COVARIANCE_INDICES[0]),)),
+                       ('inliers', '<i4')])
+TRACK_DTYPE = np.dtype([('frame', '<i8'), ('track', '<i8'), ('point', '<f4', (2,))])
+# Fields usually written in increasing order, bit i of the header flags is set once ORDERED[magic][i] goes backwards
+ORDERED = {POSE_MAGIC: ('frame', 'timestamp'), TRACK_MAGIC: ('frame',)}
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class RecordWriter:
+    """
+
+    Append-only writer of fixed-width records.
+
+    Records are staged in a preallocated structured array and appended to the file in one write every flush_every
+    records (and on flush() / close()), so logging a frame costs a few field assignments. The header records whether
+    the frame index and time fields were written in order, which lets the readers binary search them in place.
+    Opening an existing log appends to it; a partial record left by a crash is cut off first.
+
+    """
+
+    def __init__(self, path: str, magic: bytes, dtype: np.dtype, flush_every: int = 256):
+        """
+        Args:
+            path: string
+                log file, created if missing
+            magic: bytes
+                8 byte magic of the log kind
+            dtype: np.dtype
+                record dtype
+            flush_every: int
+                number of staged records written at once
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.magic = magic
+        self._buffer = np.zeros(max(1, flush_every), self.dtype)
+        self._staged = 0
+        self._last = {name: -np.inf for name in ORDERED.get(magic, ())}  # last value of the ordered fields
+        if os.path.isfile(path) and os.path.getsize(path) >= HEADER_SIZE:
+            count, self.flags = _check_header(path, magic, self.dtype)
+            self._file = open(path, 'r+b')
+            self._file.truncate(HEADER_SIZE + count * self.dtype.itemsize)
+            if count:
+                self._file.seek(HEADER_SIZE + (count - 1) * self.dtype.itemsize)
+                last = np.frombuffer(self._file.read(self.dtype.itemsize), self.dtype)[0]
+                self._last = {name: last[name] for name in self._last}
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self.flags = 0
+            self._file = open(path, 'w+b')
+            self._write_header()
+        self.count = (self._file.tell() - HEADER_SIZE) // self.dtype.itemsize  # records written or staged
+
+    def _write_header(self) -> None:
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(HEADER.pack(self.magic, VERSION, self.dtype.itemsize, self.flags).ljust(HEADER_SIZE, b'\x00'))
+        self._file.seek(max(position, HEADER_SIZE))
+
+    def _write(self, records: np.array) -> None:
+        flags = self.flags
+        for bit, name in enumerate(self._last):
+            values = records[name]
+            # ---> NaN compares false, so a log with unknown times is flagged unordered too <--- #
+            if not (values[0] >= self._last[name] and np.all(values[1:] >= values[:-1])):
+                flags |= 1 << bit
+            self._last[name] = values[-1]
+        if flags != self.flags:
+            self.flags = flags
+            self._write_header()
+        self._file.write(records.tobytes())
+
+    def _next(self) -> np.void:
+        """
+        Returns the next staged record, flushing the stage first when it is full.
+        """
+        if self._staged == len(self._buffer):
+            self.flush()
+        record = self._buffer[self._staged]
+        self._staged += 1
+        self.count += 1
+        return record
+
+    def append_records(self, records: np.array) -> None:
+        """
+        Appends an array of records of the log dtype, staged like single records and written flush_every at a time.
+        """
+        records = np.asarray(records, self.dtype)
+        position = 0
+        while position < len(records):
+            if self._staged == len(self._buffer):
+                self.flush()
+            count = min(len(records) - position, len(self._buffer) - self._staged)
+            self._buffer[self._staged:self._staged + count] = records[position:position + count]
+            self._staged += count
+            position += count
+        self.count += len(records)
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Writes the staged records, and forces them to the disk when sync is True.
+        """
+        if self._staged:
+            self._write(self._buffer[:self._staged])
+            self._staged = 0
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class PoseWriter(RecordWriter):
+    """
+    Append-only writer of a pose log, one record per frame.
+    """
+
+    def __init__(self, path: str, flush_every: int = 256):
+        super().__init__(path, POSE_MAGIC, POSE_DTYPE, flush_every)
+
+    def append(self, timestamp: float, frame: int, pose: np.array, covariance: np.array = None,
+               inliers: int = 0) -> None:
+        """
+        Appends the pose of a frame.
+
+        Args:
+            timestamp: float
+                frame time in seconds, NaN if unknown
+            frame: int
+                frame index
+            pose: np.array
+                4 x 4 camera to world pose
+            covariance: np.array
+                optional 6 x 6 covariance of the (rotation, translation) pose error, zero if None
+            inliers: int
+                number of inlier matches of the motion estimate
+        """
+        record = self._next()
+        record['timestamp'] = timestamp
+        record['frame'] = frame
+        record['quaternion'] = rotation_to_quaternion(pose[:3, :3])
+        record['translation'] = pose[:3, 3]
+        record['covariance'] = 0.0 if covariance is None else np.asarray(covariance)[COVARIANCE_INDICES]
+        record['inliers'] = inliers
+
+    def append_result(self, result: dict) -> None:
+        """
+        Appends a result of ImplementVO.run() or run_async().
+        """
+        self.append(result.get('timestamp', np.nan), result['frame'], result['pose'], result.get('covariance'),
+                    result.get('inliers', 0))
+
+
+class TrackWriter(RecordWriter):
+    """
+    Append-only writer of a feature track log, one record per feature observation.
+    """
+
+    def __init__(self, path: str, flush_every: int = 4096):
+        super().__init__(path, TRACK_MAGIC, TRACK_DTYPE, flush_every)
+
+    def append(self, frame: int, ids: np.array, points: np.array) -> None:
+        """
+        Appends the features observed in a frame.
+
+        Args:
+            frame: int
+                frame index
+            ids: np.array
+                (k,) track ids
+            points: np.array
+                (k, 2) feature positions in pixels
+        """
+        records = np.empty(len(ids), self.dtype)
+        records['frame'] = frame
+        records['track'] = ids
+        records['point'] = points
+        self.append_records(records)
+
+
+class RecordStore:
+    """
+
+    Read-only, memory-mapped view of a record log.
+
+    Opening maps the file without reading it, so a multi-hour log opens in about the same time as a short one. The
+    records can be indexed and sliced like an array and their fields are column views. refresh() maps the records
+    appended since by a live writer.
+
+    """
+
+    def __init__(self, path: str, magic: bytes, dtype: np.dtype):
+        """
+        Args:
+            path: string
+                log file
+            magic: bytes
+                expected magic of the log kind
+            dtype: np.dtype
+                record dtype
+        """
+        self.path = path
+        self.magic = magic
+        self.dtype = np.dtype(dtype)
+        self.records = None
+        self.refresh()
+
+    def refresh(self) -> 'RecordStore':
+        """
+        Maps every complete record of the file.
+        """
+        count, self.flags = _check_header(self.path, self.magic, self.dtype)
+        if count == 0:
+            self.records = np.zeros(0, self.dtype)
+        else:
+            self.records = np.memmap(self.path, self.dtype, 'r', HEADER_SIZE, (count,))
+        self._sorted = {}
+        return self
+
+    def _search(self, name: str, low: float, high: float) -> np.array:
+        """
+        Indices of the records whose field lies in [low, high), in log order. A field the header marks as written in
+        order is binary searched in place, touching a few pages only, any other is argsorted once.
+        """
+        values = self.records[name]
+        if name not in self._sorted:
+            ordered = ORDERED.get(self.magic, ())
+            in_order = name in ordered and not self.flags >> ordered.index(name) & 1
+            self._sorted[name] = None if in_order else np.argsort(values, kind='stable')
+        order = self._sorted[name]
+        if order is None:
+            start, stop = np.searchsorted(values, [low, high], 'left')
+            return np.arange(start, stop)
+        start, stop = np.searchsorted(values[order], [low, high], 'left')
+        return np.sort(order[start:stop])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, item) -> np.array:
+        return self.records[item]
+
+
+class PoseStore(RecordStore):
+    """
+    Memory-mapped pose log with frame and time range queries.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path, POSE_MAGIC, POSE_DTYPE)
+
+    @property
+    def timestamps(self) -> np.array:
+        return self.records['timestamp']
+
+    @property
+    def frames(self) -> np.array:
+        return self.records['frame']
+
+    def frame_range(self, start: int, stop: int) -> np.array:
+        """
+        Returns: np.array
+            the records of the frames in [start, stop)
+        """
+        return self.records[self._search('frame', start, stop)]
+
+    def time_range(self, start: float, stop: float) -> np.array:
+        """
+        Returns: np.array
+            the records with a timestamp in [start, stop)
+        """
+        return self.records[self._search('timestamp', start, stop)]
+
+    def poses(self, records: np.array = None) -> np.array:
+        """
+        Returns: np.array
+            (k, 4, 4) camera to world poses of the records, of the whole log if None
+        """
+        return records_to_poses(self.records if records is None else records)
+
+    def covariances(self, records: np.array = None) -> np.array:
+        """
+        Returns: np.array
+            (k, 6, 6) pose covariances of the records, of the whole log if None
+        """
+        records = self.records if records is None else records
+        covariances = np.zeros((len(records), 6, 6))
+        covariances[:, COVARIANCE_INDICES[0], COVARIANCE_INDICES[1]] = records['covariance']
+        covariances[:, COVARIANCE_INDICES[1], COVARIANCE_INDICES[0]] = records['covariance']
+        return covariances
+
+
+class TrackStore(RecordStore):
+    """
+    Memory-mapped feature track log with frame range and per-track queries.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path, TRACK_MAGIC, TRACK_DTYPE)
+
+    def frame_range(self, start: int, stop: int) -> np.array:
+        """
+        Returns: np.array
+            the observations of the frames in [start, stop)
+        """
+        return self.records[self._search('frame', start, stop)]
+
+    def track(self, track: int) -> Tuple[np.array, np.array]:
+        """
+        Returns: Tuple
+            (frames (k,), points (k, 2)) of the observations of a track, in frame order
+        """
+        records = self.records[self._search('track', track, track + 1)]
+        return records['frame'], records['point']
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def _check_header(path: str, magic: bytes, dtype: np.dtype) -> Tuple[int, int]:
+    """
+    Checks the header of a log and returns its number of complete records and its flags.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f'{path} is not a log file, it is shorter than its header')
+    found, version, size, flags = HEADER.unpack(header)
+    if found != magic:
+        raise ValueError(f'{path} is a {found!r} log, expected {magic!r}')
+    if version != VERSION or size != dtype.itemsize:
+        raise ValueError(f'{path} has version {version} records of {size} bytes, expected version {VERSION} records '
+                         f'of {dtype.itemsize} bytes')
+    return max(0, os.path.getsize(path) - HEADER_SIZE) // size, flags
+
+
+def rotation_to_quaternion(rotation: np.array) -> np.array:
+    """
+    Converts rotation matrices of shape (3, 3) or (k, 3, 3) into unit quaternions (w, x, y, z) with w >= 0.
+    """
+    rotation = np.asarray(rotation, np.double)
+    matrices = rotation.reshape(-1, 3, 3)
+    trace = np.trace(matrices, axis1=1, axis2=2)
+    diagonal = np.diagonal(matrices, axis1=1, axis2=2)
+    # ---> Largest of 4 w^2, 4 x^2, 4 y^2, 4 z^2 picks the numerically stable branch <--- #
+    squares = np.column_stack([1 + trace, 1 + 2 * diagonal - trace[:, None]])
+    branch = np.argmax(squares, axis=1)
+    root = np.sqrt(np.maximum(squares[np.arange(len(matrices)), branch], 1e-300))
+    m = matrices
+    quaternions = np.empty((len(matrices), 4))
+    candidates = [
+        np.column_stack([root, (m[:, 2, 1] - m[:, 1, 2]) / root, (m[:, 0, 2] - m[:, 2, 0]) / root,
+                         (m[:, 1, 0] - m[:, 0, 1]) / root]),
+        np.column_stack([(m[:, 2, 1] - m[:, 1, 2]) / root, root, (m[:, 0, 1] + m[:, 1, 0]) / root,
+                         (m[:, 0, 2] + m[:, 2, 0]) / root]),
+        np.column_stack([(m[:, 0, 2] - m[:, 2, 0]) / root, (m[:, 0, 1] + m[:, 1, 0]) / root, root,
+                         (m[:, 1, 2] + m[:, 2, 1]) / root]),
+        np.column_stack([(m[:, 1, 0] - m[:, 0, 1]) / root, (m[:, 0, 2] + m[:, 2, 0]) / root,
+                         (m[:, 1, 2] + m[:, 2, 1]) / root, root])]
+    for index, candidate in enumerate(candidates):
+        quaternions[branch == index] = candidate[branch == index] / 2
+    quaternions *= np.where(quaternions[:, :1] < 0, -1.0, 1.0)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return quaternions.reshape(rotation.shape[:-2] + (4,))
+
+
+def quaternion_to_rotation(quaternion: np.array) -> np.array:
+    """
+    Converts quaternions (w, x, y, z) of shape (4,) or (k, 4) into rotation matrices of shape (3, 3) or (k, 3, 3).
+    """
+    quaternion = np.asarray(quaternion, np.double)
+    w, x, y, z = np.moveaxis(quaternion / np.linalg.norm(quaternion, axis=-1, keepdims=True), -1, 0)
+    rotation = np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+                         2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+                         2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1)
+    return rotation.reshape(quaternion.shape[:-1] + (3, 3))
+
+
+def records_to_poses(records: np.array) -> np.array:
+    """
+    Builds the (k, 4, 4) camera to world poses of pose records.
+    """
+    poses = np.zeros((len(records), 4, 4))
+    poses[:, :3, :3] = quaternion_to_rotation(records['quaternion'])
+    poses[:, :3, 3] = records['translation']
+    poses[:, 3, 3] = 1.0
+    return poses
+
+
+if __name__ == '__main__':
+    msg = 'Pose store Module of Visual odometry package.'
+    print(f'{msg}')
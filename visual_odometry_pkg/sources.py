@@ -0,0 +1,309 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Asyncio frame sources (frame directory, video file, socket or pipe) for visual_odometry_pkg
+# Description   :-> Frames come with their index and timestamp, decoding runs in an executor off the event loop
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import abc
+import struct
+import asyncio
+import logging
+import cv2 as cv
+import numpy as np
+import concurrent.futures as cf
+from typing import BinaryIO, NamedTuple, Union
+from .data_preprocessor import bayer_code, imread
+from .manifest import FrameManifest, list_frames
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+# ==================================================================================================================== #
+# Global Variable Section
+# ==================================================================================================================== #
+# ---> Wire format of a frame: magic, index, timestamp (seconds), height, width, channels, then the uint8 pixels <--- #
+FRAME_MAGIC = b'VOFR'
+FRAME_HEADER = struct.Struct('<4sQdIII')
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class TimedFrame(NamedTuple):
+    """
+    A frame with its index in the source and its capture timestamp in seconds.
+    """
+    index: int
+    timestamp: float
+    image: np.array
+
+
+class FrameSource(abc.ABC):
+    """
+
+    Base class of the asyncio frame sources.
+
+    A source is an async iterator of TimedFrame, subclasses implement read() returning the next frame or None at the
+    end of the stream. The blocking work (file decoding, video decoding) runs in an executor, so awaiting frames never
+    blocks the event loop. Sources are async context managers and close() releases what they hold.
+
+    """
+
+    def __init__(self, executor: cf.Executor = None):
+        """
+        Args:
+            executor: Executor
+                executor of the blocking reads, the loop default executor if None
+        """
+        self.executor = executor
+        self.frames = 0
+        self.closed = False
+
+    @abc.abstractmethod
+    async def read(self) -> Union[TimedFrame, None]:
+        """
+        Returns: TimedFrame
+            next frame of the stream, None at its end
+        """
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def _run(self, function, *args) -> object:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def __aiter__(self) -> 'FrameSource':
+        return self
+
+    async def __anext__(self) -> TimedFrame:
+        frame = await self.read() if not self.closed else None
+        if frame is None:
+            raise StopAsyncIteration
+        self.frames += 1
+        return frame
+
+    async def __aenter__(self) -> 'FrameSource':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+class DirectorySource(FrameSource):
+    """
+    Frames of a folder of png files (or a list of files, or a frame manifest), in frame order, decoded and demosaiced
+    in the executor.
+    """
+
+    def __init__(self, source: Union[str, list, FrameManifest], bayer_pattern: str = 'gr', fps: float = None,
+                 executor: cf.Executor = None):
+        """
+        Args:
+            source: str, list or FrameManifest
+                frames directory, list of frame files or frame manifest, whose bad frames are skipped
+            bayer_pattern: str
+                bayer pattern of the raw frames, the frames are yielded as read if None
+            fps: float
+                frame rate giving the timestamps index / fps, the manifest timestamps or else the file modification
+                times are used if None
+            executor: Executor
+                executor of the decoding
+        """
+        super().__init__(executor)
+        self.files = list_frames(source)
+        self.timestamps = None
+        if isinstance(source, FrameManifest):
+            self.timestamps = source.records['timestamp'][source.positions()]
+        self.code = bayer_code(bayer_pattern) if bayer_pattern is not None else None
+        self.fps = fps
+        self._position = 0
+
+    def _load(self, file: str) -> np.array:
+        image = imread(file, 0 if self.code is not None else cv.IMREAD_UNCHANGED)
+        if image is None:
+            raise FileNotFoundError(f'Could not read frame {file}')
+        return cv.cvtColor(image, self.code) if self.code is not None else image
+
+    async def read(self) -> Union[TimedFrame, None]:
+        if self._position >= len(self.files):
+            return None
+        index, file = self._position, self.files[self._position]
+        self._position += 1
+        image = await self._run(self._load, file)
+        if self.fps:
+            timestamp = index / self.fps
+        else:
+            timestamp = float(self.timestamps[index]) if self.timestamps is not None else os.path.getmtime(file)
+        return TimedFrame(index, timestamp, image)
+
+
+class VideoSource(FrameSource):
+    """
+    Frames of a video file, timestamped with the stream position of each frame.
+    """
+
+    def __init__(self, path: str, executor: cf.Executor = None):
+        """
+        Args:
+            path: string
+                path to the video file
+            executor: Executor
+                executor of the decoding, a single thread is enough as the capture decodes in order
+        """
+        super().__init__(executor)
+        self.path = path
+        self._capture = None
+        self._index = 0
+
+    def _next(self) -> Union[tuple, None]:
+        if self._capture is None:
+            self._capture = cv.VideoCapture(self.path)
+            if not self._capture.isOpened():
+                raise FileNotFoundError(f'Could not open video {self.path}')
+        ok, frame = self._capture.read()
+        # ---> After a read the position is the presentation time of the frame just decoded <--- #
+        return (self._capture.get(cv.CAP_PROP_POS_MSEC) / 1e3, frame) if ok else None
+
+    async def read(self) -> Union[TimedFrame, None]:
+        result = await self._run(self._next)
+        if result is None:
+            return None
+        self._index += 1
+        return TimedFrame(self._index - 1, result[0], result[1])
+
+    async def close(self) -> None:
+        if self._capture is not None:
+            await self._run(self._capture.release)
+            self._capture = None
+        await super().close()
+
+
+class StreamSource(FrameSource):
+    """
+
+    Frames sent over a byte stream (TCP or unix socket, pipe) by a capture process, see write_frame().
+
+    Each frame is a FRAME_HEADER (magic, index, timestamp, height, width, channels) followed by the raw uint8 pixels,
+    so a producer on the same host feeds the pipeline without temporary files or an encode / decode round trip.
+
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter = None):
+        """
+        Args:
+            reader: StreamReader
+                stream the frames are read from
+            writer: StreamWriter
+                writer of the connection, closed with the source
+        """
+        super().__init__()
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> 'StreamSource':
+        """
+        Opens a TCP connection to a frame producer.
+        """
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> 'StreamSource':
+        """
+        Opens a unix socket connection to a frame producer.
+        """
+        return cls(*await asyncio.open_unix_connection(path))
+
+    @classmethod
+    async def from_pipe(cls, pipe: BinaryIO) -> 'StreamSource':
+        """
+        Reads the frames from the read end of a pipe, e.g. the stdout of a producer process.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+        return cls(reader)
+
+    async def read(self) -> Union[TimedFrame, None]:
+        try:
+            header = await self.reader.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as err:
+            if err.partial:
+                raise ValueError('Frame stream ended inside a frame header') from None
+            return None
+        magic, index, timestamp, height, width, channels = FRAME_HEADER.unpack(header)
+        if magic != FRAME_MAGIC:
+            raise ValueError(f'Bad frame header magic {magic!r}')
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        try:
+            pixels = await self.reader.readexactly(height * width * channels)
+        except asyncio.IncompleteReadError:
+            raise ValueError(f'Frame stream ended inside frame {index}') from None
+        return TimedFrame(index, timestamp, np.frombuffer(pixels, np.uint8).reshape(shape))
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+        await super().close()
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def frame_header(index: int, timestamp: float, image: np.array) -> bytes:
+    """
+    Packs the wire header of a uint8 frame of shape (m, n) or (m, n, c).
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f'Only uint8 frames can be streamed, got {image.dtype}')
+    channels = image.shape[2] if image.ndim == 3 else 1
+    return FRAME_HEADER.pack(FRAME_MAGIC, index, timestamp, image.shape[0], image.shape[1], channels)
+
+
+def write_frame(stream: BinaryIO, index: int, timestamp: float, image: np.array) -> None:
+    """
+    Writes a frame to a binary stream (socket file, pipe, stdout.buffer) in the StreamSource wire format.
+
+    Args:
+        stream: BinaryIO
+            binary stream opened for writing
+        index: int
+            frame index
+        timestamp: float
+            capture time in seconds
+        image: np.array
+            uint8 frame
+    """
+    stream.write(frame_header(index, timestamp, image))
+    stream.write(memoryview(np.ascontiguousarray(image)).cast('B'))
+
+
+def open_source(source: Union[str, list, FrameManifest], bayer_pattern: str = 'gr', fps: float = None,
+                executor: cf.Executor = None) -> FrameSource:
+    """
+    Opens a frames directory, list of frame files or frame manifest as a DirectorySource, and anything else as a
+    VideoSource.
+    """
+    if isinstance(source, (list, tuple, FrameManifest)) or os.path.isdir(source):
+        return DirectorySource(source, bayer_pattern, fps, executor)
+    return VideoSource(source, executor)
+
+
+if __name__ == '__main__':
+    msg = 'Frame sources Module of Visual odometry package.'
+    print(f'{msg}')
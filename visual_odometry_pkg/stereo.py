@@ -0,0 +1,318 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Stereo visual odometry for visual_odometry_pkg
+# Description   :-> Rectification maps from the lens extrinsics, sparse disparity at the tracked features, 3D-2D PnP
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import time
+import logging
+import cv2 as cv
+import numpy as np
+from typing import Tuple
+from .metrics import default_metrics
+from .algorithms import FeatureTracker
+from .data_preprocessor import Undistorter, lut_to_maps
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class StereoRig:
+    """
+
+    Rectification of a left / right camera pair, built once from the two camera models.
+
+    The relative pose of the lenses comes from their G_camera_image transforms (image frame to the camera base frame,
+    the right lens translated by the baseline). The rectification maps are composed with the undistortion LUT of each
+    camera, so a raw frame is undistorted and rectified by a single remap through an Undistorter. In the rectified
+    frames the epipolar lines are the image rows and both views share the camera_matrix.
+
+    """
+
+    def __init__(self, left: object, right: object, shape: Tuple[int, int], alpha: float = 0.0,
+                 fixed_point: bool = True):
+        """
+        Args:
+            left: Camera
+                left camera with its model read
+            right: Camera
+                right camera with its model read
+            shape: tuple
+                (height, width) of the raw frames of both cameras
+            alpha: float
+                rectification scaling, 0 keeps only valid pixels, 1 keeps every source pixel
+            fixed_point: bool
+                use fixed-point remap tables
+        """
+        for camera in (left, right):
+            if camera.fx is None or camera.G_camera_image is None:
+                raise ValueError('Both camera models must be read before building a stereo rig')
+        height, width = shape[0], shape[1]
+        k_left, k_right = camera_matrix(left), camera_matrix(right)
+        # ---> Left image frame to right image frame: x_right = R x_left + T <--- #
+        relative = np.linalg.inv(np.asarray(right.G_camera_image, np.double)) @ np.asarray(left.G_camera_image,
+                                                                                            np.double)
+        r_left, r_right, p_left, p_right, self.Q, _, _ = cv.stereoRectify(
+            k_left, np.zeros(5), k_right, np.zeros(5), (width, height), relative[:3, :3], relative[:3, 3:],
+            flags=cv.CALIB_ZERO_DISPARITY, alpha=alpha)
+        if abs(p_right[1, 3]) > abs(p_right[0, 3]):
+            raise ValueError('Vertical stereo rigs are not supported, the lenses must be side by side')
+        self.shape = (height, width)
+        self.camera_matrix = p_left[:3, :3].copy()
+        self.baseline = float(-p_right[0, 3] / p_right[0, 0])  # in the units of the G_camera_image translation
+        if self.baseline <= 0:
+            raise ValueError('The right camera of the rig is on the left of the left camera')
+        self.left = Undistorter(None, shape, fixed_point, _rectify_maps(left, k_left, r_left, p_left, shape,
+                                                                        fixed_point))
+        self.right = Undistorter(None, shape, fixed_point, _rectify_maps(right, k_right, r_right, p_right, shape,
+                                                                         fixed_point))
+        self._outputs = [None, None]
+
+    def rectify(self, left: np.array, right: np.array) -> Tuple[np.array, np.array]:
+        """
+        Undistorts and rectifies a raw frame pair.
+
+        Returns: Tuple
+            (left, right) rectified frames, written into buffers owned by the rig and overwritten by the next call
+        """
+        frames = []
+        for side, (undistorter, frame) in enumerate(((self.left, left), (self.right, right))):
+            out = self._outputs[side]
+            if out is None or out.shape != undistorter.output_shape + frame.shape[2:] or out.dtype != frame.dtype:
+                out = self._outputs[side] = np.empty(undistorter.output_shape + frame.shape[2:], frame.dtype)
+            frames.append(undistorter.undistort(frame, out=out))
+        return frames[0], frames[1]
+
+
+class StereoOdometry:
+    """
+
+    Metric stereo VO over rectified frame pairs.
+
+    Features are tracked through the left frames with a FeatureTracker. Their disparity is measured at the feature
+    locations only, by tracking each feature from the left frame into the right one with a pyramidal KLT started at
+    the expected disparity and keeping the matches that stay on their row and track back to where they started, so
+    no dense disparity map is ever computed. The features with a disparity are triangulated into metric 3D points of
+    the left camera frame, and the pose of the next frame is estimated from these points and their tracked pixels with
+    RANSAC PnP. The scale comes from the baseline, so no scale estimation is needed.
+
+    """
+
+    def __init__(self, rig: StereoRig, tracker: FeatureTracker = None, min_disparity: float = 0.5,
+                 max_disparity: float = 256.0, max_row_error: float = 1.0, max_back_error: float = 0.5,
+                 threshold: float = 2.0, confidence: float = 0.999, max_iterations: int = 200, min_inliers: int = 10):
+        """
+        Args:
+            rig: StereoRig
+                rectification of the camera pair
+            tracker: FeatureTracker
+                optional configured tracker of the left frames
+            min_disparity: float
+                smallest accepted disparity in pixels, the farther points carry no usable depth
+            max_disparity: float
+                largest accepted disparity in pixels
+            max_row_error: float
+                largest accepted vertical offset in pixels of a left / right match
+            max_back_error: float
+                largest accepted distance in pixels between a feature and its match tracked back into the left frame
+            threshold: float
+                PnP inlier reprojection error in pixels
+            confidence: float
+                PnP RANSAC confidence
+            max_iterations: int
+                maximum number of PnP RANSAC iterations
+            min_inliers: int
+                minimum number of PnP inliers of an accepted pose
+        """
+        self.rig = rig
+        self.tracker = tracker if tracker is not None else FeatureTracker()
+        self.min_disparity = min_disparity
+        self.max_disparity = max_disparity
+        self.max_row_error = max_row_error
+        self.max_back_error = max_back_error
+        self.threshold = threshold
+        self.confidence = confidence
+        self.max_iterations = max_iterations
+        self.min_inliers = min_inliers
+        self.lk_params = dict(self.tracker.lk_params, flags=cv.OPTFLOW_USE_INITIAL_FLOW)
+        self.pose = np.eye(4)  # left camera to world
+        self.landmark_ids = np.empty(0, np.int64)  # track ids of the triangulated features of the last frame
+        self.landmarks = np.empty((0, 3))  # their 3D points in the last left camera frame
+        self.expected_disparity = 0.0  # median disparity of the last frame, the start of the next disparity search
+        self._gray = [None, None]
+
+    def reset(self) -> None:
+        """
+        Drops the tracks and landmarks and puts the camera back at the origin.
+        """
+        self.tracker.reset()
+        self.pose = np.eye(4)
+        self.landmark_ids = np.empty(0, np.int64)
+        self.landmarks = np.empty((0, 3))
+        self.expected_disparity = 0.0
+
+    @default_metrics.timed('disparity')
+    def disparity(self, left: np.array, right: np.array, points: np.array) -> Tuple[np.array, np.array]:
+        """
+        Measures the disparity of features of a rectified pair.
+
+        Args:
+            left: np.array
+                grayscale rectified left frame
+            right: np.array
+                grayscale rectified right frame
+            points: np.array
+                (k, 2) feature positions in the left frame
+
+        Returns: Tuple
+            (disparity (k,) in pixels, valid (k,) boolean mask of the features with a reliable disparity)
+        """
+        points = np.ascontiguousarray(points, np.float32)
+        count = len(points)
+        if not count:
+            return np.empty(0, np.float32), np.zeros(0, bool)
+        guess = points.copy()
+        guess[:, 0] -= self.expected_disparity
+        matches, status, _ = cv.calcOpticalFlowPyrLK(left, right, points, guess, **self.lk_params)
+        back, back_status, _ = cv.calcOpticalFlowPyrLK(right, left, matches, points.copy(), **self.lk_params)
+        disparity = points[:, 0] - matches[:, 0]
+        valid = status.ravel().astype(bool) & back_status.ravel().astype(bool)
+        valid &= np.abs(matches[:, 1] - points[:, 1]) <= self.max_row_error
+        valid &= np.sum((back - points) ** 2, axis=1) <= self.max_back_error ** 2
+        valid &= (disparity >= self.min_disparity) & (disparity <= self.max_disparity)
+        return disparity, valid
+
+    def triangulate(self, points: np.array, disparity: np.array) -> np.array:
+        """
+        Back-projects rectified left pixels with their disparity.
+
+        Returns: np.array
+            (k, 3) points in the left camera frame, in the units of the baseline
+        """
+        k = self.rig.camera_matrix
+        depth = k[0, 0] * self.rig.baseline / np.asarray(disparity, np.double)
+        xyz = np.empty((len(depth), 3))
+        xyz[:, 0] = (points[:, 0] - k[0, 2]) * depth / k[0, 0]
+        xyz[:, 1] = (points[:, 1] - k[1, 2]) * depth / k[1, 1]
+        xyz[:, 2] = depth
+        return xyz
+
+    def track(self, left: np.array, right: np.array) -> dict:
+        """
+        Tracks one rectified frame pair and updates the pose.
+
+        Args:
+            left: np.array
+                rectified left frame, grayscale or bgr
+            right: np.array
+                rectified right frame, grayscale or bgr
+
+        Returns: dict
+            pose (4 x 4 left camera to world, metric), tracks, matched (tracks with a landmark), inliers (PnP
+            inliers), landmarks (features triangulated in this frame) and latency (seconds). The pose is kept when
+            fewer than min_inliers landmarks agree on the motion.
+        """
+        begin = time.perf_counter()
+        left, right = self._to_gray(0, left), self._to_gray(1, right)
+        previous, current, ids = self.tracker.track(left)
+        matched, inliers = 0, 0
+        if len(ids) and len(self.landmark_ids):
+            order = np.argsort(self.landmark_ids)
+            position = np.searchsorted(self.landmark_ids, ids, sorter=order)
+            position = order[np.minimum(position, len(order) - 1)]
+            found = self.landmark_ids[position] == ids
+            matched = int(found.sum())
+            if matched >= max(self.min_inliers, 4):
+                motion, inliers = self._solve(self.landmarks[position[found]], current[found])
+                if motion is not None:
+                    self.pose = self.pose @ motion
+
+        count = self.tracker.count
+        points = self.tracker.points[:count]
+        disparity, valid = self.disparity(left, right, points)
+        if valid.any():
+            self.expected_disparity = float(np.median(disparity[valid]))
+        self.landmark_ids = self.tracker.ids[:count][valid].copy()
+        self.landmarks = self.triangulate(points[valid], disparity[valid])
+        latency = time.perf_counter() - begin
+        default_metrics.observe('stereo_frame', latency)
+        return {'pose': self.pose, 'tracks': len(ids), 'matched': matched, 'inliers': inliers,
+                'landmarks': len(self.landmarks), 'latency': latency}
+
+    @default_metrics.timed('pnp')
+    def _solve(self, landmarks: np.array, pixels: np.array) -> Tuple[np.array, int]:
+        """
+        Motion of the camera from the landmarks of the last frame to their pixels in the current one.
+
+        Returns: Tuple
+            (4 x 4 current camera to last camera transform or None, number of inliers)
+        """
+        ok, rvec, tvec, inliers = cv.solvePnPRansac(np.ascontiguousarray(landmarks, np.double),
+                                                    np.ascontiguousarray(pixels, np.double), self.rig.camera_matrix,
+                                                    None, iterationsCount=self.max_iterations,
+                                                    reprojectionError=self.threshold, confidence=self.confidence,
+                                                    flags=cv.SOLVEPNP_EPNP)
+        if not ok or inliers is None or len(inliers) < self.min_inliers:
+            return None, 0 if inliers is None else len(inliers)
+        # ---> Refine on the inliers, the RANSAC model is fitted on minimal samples <--- #
+        inliers = inliers.ravel()
+        rvec, tvec = cv.solvePnPRefineLM(np.ascontiguousarray(landmarks[inliers], np.double),
+                                         np.ascontiguousarray(pixels[inliers], np.double), self.rig.camera_matrix,
+                                         None, rvec, tvec)
+        rotation = cv.Rodrigues(rvec)[0]
+        motion = np.eye(4)  # last camera to current camera inverted: current to last
+        motion[:3, :3] = rotation.T
+        motion[:3, 3] = -rotation.T @ tvec.ravel()
+        return motion, len(inliers)
+
+    def _to_gray(self, side: int, image: np.array) -> np.array:
+        if image.ndim == 2:
+            return image
+        gray = self._gray[side]
+        if gray is None or gray.shape != image.shape[:2]:
+            gray = self._gray[side] = np.empty(image.shape[:2], np.uint8)
+        return cv.cvtColor(image, cv.COLOR_BGR2GRAY, dst=gray)
+
+
+# ==================================================================================================================== #
+# Function Definition
+# ==================================================================================================================== #
+def camera_matrix(camera: object) -> np.array:
+    """
+    Returns the 3 x 3 pinhole matrix of a camera with its intrinsics read.
+    """
+    return np.array([[camera.fx, 0, camera.cx], [0, camera.fy, camera.cy], [0, 0, 1]], np.double)
+
+
+def _rectify_maps(camera: object, matrix: np.array, rectification: np.array, projection: np.array,
+                  shape: Tuple[int, int], fixed_point: bool) -> Tuple[np.array, np.array]:
+    """
+    Remap tables from the raw frames of a camera to its rectified frames: rectified pixel -> undistorted pixel by
+    the rectification, then undistorted pixel -> raw pixel by the camera LUT when it is read.
+    """
+    size = (shape[1], shape[0])
+    map_x, map_y = cv.initUndistortRectifyMap(matrix, None, rectification, projection, size, cv.CV_32FC1)
+    if camera.LUT is not None:
+        lut_x, lut_y = lut_to_maps(camera.LUT, shape, fixed_point=False)
+        map_x, map_y = (cv.remap(table, map_x, map_y, cv.INTER_LINEAR, borderMode=cv.BORDER_CONSTANT,
+                                 borderValue=-1) for table in (lut_x, lut_y))
+    if fixed_point:
+        return cv.convertMaps(map_x, map_y, cv.CV_16SC2)
+    return map_x, map_y
+
+
+if __name__ == '__main__':
+    msg = 'Stereo Module of Visual odometry package.'
+    print(f'{msg}')
@@ -1,5 +1,292 @@
+# ==================================================================================================================== #
+# --------------------> Project Information <----------------------- #
+# ==================================================================================================================== #
+# Author(s)     :-> Sudharsan
+# E-mail        :-> sudharsansci@gmail.com
+# Project       :-> Visual odometry pkg
+# URL           :-> http://iamsudharsan.com/Visual-Odometry-pkg/
+# Module Desc   :-> Incremental trajectory and feature overlay visualizer for visual_odometry_pkg
+# Description   :-> Renders on its own thread from a bounded, decimated path, headless to PNG snapshots or a video
+
+# ==================================================================================================================== #
+# Import Section
+# ==================================================================================================================== #
+import os
+import logging
+import threading
+import cv2 as cv
+import numpy as np
+from collections import deque
+
+# ==================================================================================================================== #
+# Logger setup section
+# ==================================================================================================================== #
+log = logging.getLogger(__name__)
+
+
+# ==================================================================================================================== #
+# Class Definition
+# ==================================================================================================================== #
+class DecimatedPath:
+    """
+
+    Bounded history of 3-D positions with a level of detail decreasing with age.
+
+    The last recent points are kept at full resolution. The whole history is kept one point in stride, and when its
+    buffer is full every other point is dropped and the stride doubles, so a path of any length is drawn from at most
+    capacity + recent points while keeping its overall shape. Appending costs O(1) amortised.
+
+    """
+
+    def __init__(self, capacity: int = 2048, recent: int = 256):
+        """
+        Args:
+            capacity: int
+                maximum number of decimated history points
+            recent: int
+                number of latest points kept at full resolution
+        """
+        if capacity < 2:
+            raise ValueError('A decimated path needs a capacity of at least 2 points')
+        self.capacity = capacity
+        self.stride = 1
+        self._history = np.empty((capacity, 3))
+        self._recent = deque(maxlen=max(1, recent))
+        self.count = 0  # history points kept
+        self.total = 0  # points appended
+        self.low = np.full(3, np.inf)  # bounds of every point appended
+        self.high = np.full(3, -np.inf)
+
+    def append(self, position: np.array) -> None:
+        position = np.asarray(position, np.double)
+        if self.total % self.stride == 0:
+            if self.count == self.capacity:
+                kept = (self.capacity + 1) // 2
+                self._history[:kept] = self._history[:self.capacity:2]
+                self.count = kept
+                self.stride *= 2
+            if self.total % self.stride == 0:
+                self._history[self.count] = position
+                self.count += 1
+        self._recent.append(position)
+        self.total += 1
+        np.minimum(self.low, position, out=self.low)
+        np.maximum(self.high, position, out=self.high)
+
+    @property
+    def points(self) -> np.array:
+        """
+        Returns: np.array
+            the decimated history followed by the recent points, oldest first, of shape (k, 3)
+        """
+        if not self.total:
+            return np.empty((0, 3))
+        recent = np.array(self._recent)
+        # ---> History point j is the appended point j x stride, only the ones older than the recent points <--- #
+        older = min(self.count, -(-(self.total - len(recent)) // self.stride))
+        return np.concatenate([self._history[:older], recent])
+
+    def clear(self) -> None:
+        self.stride = 1
+        self.count = 0
+        self.total = 0
+        self._recent.clear()
+        self.low.fill(np.inf)
+        self.high.fill(-np.inf)
+
+
 class Visualize:
-    pass
+    """
+
+    Trajectory and feature overlay visualizer fed incrementally by ImplementVO.
+
+    update() only appends the camera position to a DecimatedPath and, when the renderer is idle, copies a reduced
+    copy of the frame and its tracks. Rendering (a top-down x / z trajectory view next to the frame with its tracks)
+    runs on a separate thread started by start(), so the VO loop is never held up by drawing and the drawing cost does
+    not grow with the length of the drive. Renders are written as PNG snapshots or to a video in headless mode, or
+    shown in a window.
+
+    """
+
+    def __init__(self, output: str = None, size: int = 480, capacity: int = 2048, every: int = 10,
+                 video: bool = False, fps: float = 10.0, show: bool = False):
+        """
+        Args:
+            output: string
+                folder the renders are written to, nothing is written if None
+            size: int
+                height in pixels of the render, the trajectory panel is square
+            capacity: int
+                maximum number of trajectory points drawn
+            every: int
+                renders one of every that many updates at most
+            video: bool
+                writes the renders to output/trajectory.avi instead of one PNG per render
+            fps: float
+                frame rate of the video
+            show: bool
+                shows the renders in an OpenCV window
+        """
+        self.output = output
+        self.size = size
+        self.every = max(1, every)
+        self.video = video
+        self.fps = fps
+        self.show = show
+        self.path = DecimatedPath(capacity)
+        self.updates = 0
+        self.renders = 0
+        self.canvas = None  # last render
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._writer = None
+        self._writer_size = None
+        self._overlay = None  # reduced frame and tracks of the next render
+        self._overlay_buffer = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> 'Visualize':
+        """
+        Starts the render thread.
+
+        Returns: Visualize
+            self
+        """
+        if self._thread is None:
+            if self.output is not None:
+                os.makedirs(self.output, exist_ok=True)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._render_loop, name='visualize', daemon=True)
+            self._thread.start()
+        return self
+
+    def update(self, pose: np.array, frame: np.array = None, points: np.array = None,
+               previous: np.array = None) -> None:
+        """
+        Records a new camera pose, and its frame and tracks for the next render. Never waits for the renderer.
+
+        Args:
+            pose: np.array
+                4 x 4 camera to world pose
+            frame: np.array
+                optional bgr or grayscale frame, only read during the call
+            points: np.array
+                optional (k, 2) feature positions in the frame
+            previous: np.array
+                optional (k, 2) positions of the same features in the previous frame
+        """
+        with self._lock:
+            self.path.append(pose[:3, 3])
+            self.updates += 1
+        if self._pending.is_set() or (self.updates % self.every and self.updates != 1):
+            return  # renderer busy, or not a frame to render
+        overlay = None
+        if frame is not None:
+            scale = self.size / frame.shape[0]
+            width = max(1, int(round(frame.shape[1] * scale)))
+            shape = (self.size, width) + frame.shape[2:]
+            if self._overlay_buffer is None or self._overlay_buffer.shape != shape:
+                self._overlay_buffer = np.empty(shape, np.uint8)
+            cv.resize(frame, (width, self.size), dst=self._overlay_buffer, interpolation=cv.INTER_AREA)
+            overlay = (self._overlay_buffer, None if points is None else np.asarray(points) * scale,
+                       None if previous is None else np.asarray(previous) * scale)
+        self._overlay = overlay
+        if self._thread is not None:
+            self._pending.set()
+
+    def render(self) -> np.array:
+        """
+        Draws the trajectory panel and, when a frame was given, the frame with its tracks on its right.
+
+        Returns: np.array
+            bgr render of height size
+        """
+        with self._lock:
+            points = self.path.points[:, [0, 2]]
+            low, high = self.path.low[[0, 2]], self.path.high[[0, 2]]
+        panel = np.full((self.size, self.size, 3), 255, np.uint8)
+        if len(points):
+            margin = 20
+            span = max(float(np.max(high - low)), 1e-9)
+            scale = (self.size - 2 * margin) / span
+            centre = (low + high) / 2
+            pixels = (points - centre) * scale + self.size / 2
+            pixels[:, 1] = self.size - pixels[:, 1]  # z forward points up
+            pixels = np.round(pixels).astype(np.int32)
+            cv.polylines(panel, [pixels.reshape(-1, 1, 2)], False, (200, 80, 0), 1, cv.LINE_AA)
+            cv.circle(panel, tuple(int(value) for value in pixels[-1]), 4, (0, 0, 255), -1, cv.LINE_AA)
+            cv.putText(panel, f'{self.path.total} poses', (margin, margin), cv.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1,
+                       cv.LINE_AA)
+        overlay = self._overlay
+        if overlay is None:
+            return panel
+        image, current, previous = overlay
+        image = cv.cvtColor(image, cv.COLOR_GRAY2BGR) if image.ndim == 2 else image.copy()
+        if current is not None:
+            if previous is not None:
+                for start, stop in zip(np.round(previous).astype(int), np.round(current).astype(int)):
+                    cv.line(image, tuple(start.tolist()), tuple(stop.tolist()), (0, 255, 255), 1)
+            for point in np.round(current).astype(int):
+                cv.circle(image, tuple(point.tolist()), 2, (0, 255, 0), -1)
+        return np.hstack([panel, image])
+
+    def close(self) -> None:
+        """
+        Stops the render thread after a final render and releases the video writer and window.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._pending.set()
+            self._thread.join()
+            self._thread = None
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self.show:
+            cv.destroyWindow('visual odometry')
+
+    def _render_loop(self) -> None:
+        while not self._stop.is_set():
+            self._pending.wait()
+            if self._stop.is_set():
+                break
+            self._emit()
+            # ---> update() only writes the overlay buffer again once this render is done <--- #
+            self._pending.clear()
+        self._emit()
+
+    def _emit(self) -> None:
+        try:
+            canvas = self.render()
+        except Exception:
+            log.exception('Rendering failed')
+            return
+        self.canvas = canvas
+        self.renders += 1
+        if self.output is not None and not self.video:
+            cv.imwrite(os.path.join(self.output, f'trajectory_{self.updates:06d}.png'), canvas)
+        elif self.output is not None:
+            if self._writer is None:
+                self._writer_size = canvas.shape[1::-1]
+                self._writer = cv.VideoWriter(os.path.join(self.output, 'trajectory.avi'),
+                                              cv.VideoWriter_fourcc(*'DIVX'), self.fps, self._writer_size)
+            if canvas.shape[1::-1] != self._writer_size:
+                canvas = cv.resize(canvas, self._writer_size, interpolation=cv.INTER_AREA)
+            self._writer.write(canvas)
+        if self.show:
+            cv.imshow('visual odometry', canvas)
+            cv.waitKey(1)
+
+    def __enter__(self) -> 'Visualize':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
 
 if __name__ == '__main__':